@@ -0,0 +1,213 @@
+"""Benchmarks reproducibles de generación, búsqueda y dibujo.
+
+Mide astar, Laberinto.hay_camino (la consulta con el TableroBits ya construido;
+la construcción se mide aparte), Laberinto.generar_laberinto_valido, el A* de
+8 vecinos de AStarMazeSolver (motor_astar.solve), las variantes bidireccionales
+de los dos A*, el modo horda (campo de distancias y paso de AGENTES_HORDA
+perseguidores), los caminos con terreno
+(A* con heap contra cola de cubetas, con y sin heurística), A* con heurística
+ALT de NUM_REFERENCIAS referencias ya preparadas y el dibujo del juego
+(construir_capa_estatica + renderizar_frame) en varios tamaños y densidades
+de bloques, con RNG sembrado para que cada caso sea siempre el mismo mapa.
+
+Uso:
+    python benchmarks.py run --salida base.json          # guarda una línea base
+    python benchmarks.py compare base.json --umbral 0.15  # marca regresiones
+
+El dibujo necesita una pantalla (en Linux sin escritorio, por ejemplo con
+xvfb-run); si Tk no puede abrir una ventana esos casos se omiten.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from horda import Horda, campo_distancias
+from nucleo_laberinto import (Laberinto, astar, astar_heuristica, astar_pesos, generar_bloques_conexos,
+                              pesos_con_borde)
+from referencias import NUM_REFERENCIAS, Referencias
+from tablero_bits import TableroBits
+from terreno import dial_pesos, generar_terreno
+from motor_astar import solve, solve_bidirectional
+
+TAMAÑOS = [5, 50, 200, 1000, 2000]
+TAMAÑOS_RAPIDOS = [5, 50, 200]
+# Fracción de celdas bloqueadas; 0.5 equivale a MAX_BLOQUES
+DENSIDADES = [0.0, 0.25, 0.5]
+SEMILLA = 12345
+AGENTES_HORDA = 1000
+
+
+def medir(funcion, tiempo_min=0.2, min_repeticiones=3, max_repeticiones=50):
+    """Repite funcion hasta acumular tiempo_min segundos; devuelve los tiempos"""
+    tiempos = []
+    inicio = time.perf_counter()
+    while len(tiempos) < max_repeticiones:
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+        if len(tiempos) >= min_repeticiones and time.perf_counter() - inicio >= tiempo_min:
+            break
+    return tiempos
+
+
+def preparar_caso(tamaño, densidad, semilla):
+    """Laberinto conexo y sembrado de tamaño x tamaño con esquinas libres.
+
+    Se crea con Laberinto.desde_grid, así etiquetas, tablero, grafo y cachés
+    corresponden a esta cuadrícula y no a una generada antes.
+    """
+    rng = random.Random(f"{semilla}-{tamaño}-{densidad}")
+    bloques = int(tamaño * tamaño * densidad)
+    esquinas = [(0, 0), (tamaño - 1, tamaño - 1)]
+    grid = generar_bloques_conexos(tamaño, tamaño, bloques, esquinas, rng)
+    return Laberinto.desde_grid(grid, esquinas[0], esquinas[0], esquinas[1], rng=rng)
+
+
+def abrir_juego():
+    """Crea un JuegoLaberinto sobre una ventana oculta, o None si no hay pantalla"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "laberinto_tiempo_real_windows.py.py")
+    spec = importlib.util.spec_from_file_location("laberinto_tiempo_real", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.JuegoLaberinto(root)
+
+
+def casos(tamaños, semilla, juego):
+    """Genera (nombre, función a medir) para cada combinación"""
+    for tamaño in tamaños:
+        for densidad in DENSIDADES:
+            laberinto = preparar_caso(tamaño, densidad, semilla)
+            fin = (tamaño - 1, tamaño - 1)
+            clave = f"{tamaño}x{tamaño}/{densidad}"
+
+            yield f"astar/{clave}", lambda l=laberinto, f=fin: astar(l.grid, (0, 0), f)
+            referencias = Referencias(laberinto.celdas_aplanadas(), tamaño, NUM_REFERENCIAS,
+                                      random.Random(semilla))
+            yield f"astar_alt/{clave}", lambda l=laberinto, f=fin, r=referencias: astar_heuristica(
+                l.celdas_aplanadas(), l.ancho, (0, 0), f, r.heuristica(f))
+            yield f"tablero_desde_grid/{clave}", lambda l=laberinto: TableroBits.desde_grid(l.grid)
+            laberinto.hay_camino((0, 0), fin)  # hay_camino mide solo la consulta
+            yield f"hay_camino/{clave}", lambda l=laberinto, f=fin: l.hay_camino((0, 0), f)
+            yield f"astar_bidireccional/{clave}", lambda l=laberinto, f=fin: astar(
+                l.grid, (0, 0), f, bidireccional=True)
+            yield f"solve_maze/{clave}", lambda m=laberinto.grid.tolist(), f=fin: solve(m, (0, 0), f)
+            yield f"solve_maze_bidireccional/{clave}", lambda m=laberinto.grid.tolist(), f=fin: (
+                solve_bidirectional(m, (0, 0), f))
+            yield f"horda_campo/{clave}", lambda l=laberinto, f=fin: campo_distancias(
+                l.celdas_aplanadas(), l.ancho, f)
+            horda = Horda(laberinto, AGENTES_HORDA, 'objetivo', rng=random.Random(semilla))
+            yield f"horda_paso/{clave}", horda.paso
+
+            costos = generar_terreno(tamaño, tamaño, random.Random(f"{semilla}-{clave}-terreno"))
+            pesos = pesos_con_borde(laberinto.grid, costos)
+            yield f"astar_terreno/{clave}", lambda p=pesos, f=fin: astar_pesos(p, tamaño, (0, 0), f)
+            yield f"dial_terreno/{clave}", lambda p=pesos, f=fin: dial_pesos(p, tamaño, (0, 0), f)
+            yield f"dial_sin_h_terreno/{clave}", lambda p=pesos, f=fin: dial_pesos(p, tamaño, (0, 0), f, False)
+
+            # Se regenera una copia para no alterar el mapa de los demás casos
+            def regenerar(l=preparar_caso(tamaño, densidad, semilla), semilla_gen=f"{clave}-gen"):
+                l.rng = random.Random(f"{semilla}-{semilla_gen}")
+                l.generar_laberinto_valido()
+            yield f"generar_laberinto_valido/{clave}", regenerar
+
+            if juego is not None:
+                def dibujar(l=laberinto):
+                    juego.laberinto = l
+                    juego.construir_capa_estatica()
+                    juego.dibujar_laberinto()
+                    juego.renderizar_frame()
+                    juego.canvas.update_idletasks()
+                yield f"dibujar_laberinto/{clave}", dibujar
+
+
+def ejecutar(tamaños, semilla, tiempo_min):
+    juego = abrir_juego()
+    if juego is None:
+        print("Sin pantalla disponible: se omiten los casos de dibujo", file=sys.stderr)
+
+    resultados = {}
+    for nombre, funcion in casos(tamaños, semilla, juego):
+        tiempos = medir(funcion, tiempo_min)
+        resultados[nombre] = {
+            'min': min(tiempos),
+            'mediana': statistics.median(tiempos),
+            'repeticiones': len(tiempos),
+        }
+        print(f"{nombre:45s} {min(tiempos) * 1e3:12.3f} ms  (x{len(tiempos)})", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'semilla': semilla,
+            'tamaños': tamaños,
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar(base, actual, umbral):
+    """Devuelve los casos cuyo mínimo empeora más de umbral respecto a la base"""
+    regresiones = []
+    for nombre, medida in actual['resultados'].items():
+        referencia = base['resultados'].get(nombre)
+        if referencia is None:
+            continue
+        cociente = medida['min'] / referencia['min'] if referencia['min'] else 1.0
+        marca = "REGRESIÓN" if cociente > 1 + umbral else ""
+        print(f"{nombre:45s} {referencia['min'] * 1e3:10.3f} -> {medida['min'] * 1e3:10.3f} ms"
+              f"  x{cociente:5.2f} {marca}")
+        if marca:
+            regresiones.append(nombre)
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='modo', required=True)
+    for modo in ('run', 'compare'):
+        p = sub.add_parser(modo)
+        p.add_argument('--rapido', action='store_true', help=f"solo tamaños {TAMAÑOS_RAPIDOS}")
+        p.add_argument('--tamaños', type=int, nargs='+', help="lista de tamaños a medir")
+        p.add_argument('--semilla', type=int, default=SEMILLA)
+        p.add_argument('--tiempo-min', type=float, default=0.2,
+                       help="segundos mínimos de medición por caso")
+    sub.choices['run'].add_argument('--salida', default='benchmark_base.json')
+    sub.choices['compare'].add_argument('base', help="JSON guardado con 'run'")
+    sub.choices['compare'].add_argument('--umbral', type=float, default=0.15,
+                                        help="empeoramiento relativo tolerado (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    if args.modo == 'compare':
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        tamaños = args.tamaños or base['meta']['tamaños']
+        actual = ejecutar(tamaños, base['meta']['semilla'], args.tiempo_min)
+        regresiones = comparar(base, actual, args.umbral)
+        if regresiones:
+            print(f"{len(regresiones)} regresiones por encima del {args.umbral:.0%}")
+            sys.exit(1)
+        print("Sin regresiones")
+    else:
+        tamaños = args.tamaños or (TAMAÑOS_RAPIDOS if args.rapido else TAMAÑOS)
+        resultado = ejecutar(tamaños, args.semilla, args.tiempo_min)
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.salida}")
@@ -0,0 +1,452 @@
+"""Núcleos de A* sobre cuadrículas aplanadas con borde, solo con la biblioteca estándar.
+
+Trabajan sobre la secuencia de celdas_con_borde() (o pesos_con_borde()) de
+nucleo_laberinto, pero no importan numpy: quien ya tiene la cuadrícula
+aplanada (como la línea de comandos de resolver.py) puede buscar sin pagar
+esa importación. nucleo_laberinto los reexporta.
+
+Los de celdas recorren los vecinos con un GrafoCuadricula, que se puede
+construir una vez y pasar como grafo= en consultas repetidas.
+"""
+import functools
+import heapq
+import math
+import threading
+import time
+
+from instrumentacion import registro
+
+class _EspacioBusqueda:
+    """Arrays g/padre reutilizables entre búsquedas sobre cuadrículas del mismo tamaño.
+    
+    En lugar de reinicializarlos en cada llamada se usa un sello de versión:
+    g[i] solo es válido si sello[i] == version.
+    """
+    __slots__ = ('n', 'g', 'padre', 'sello', 'cerrado', 'version')
+    
+    def __init__(self, n):
+        self.n = n
+        self.g = [0] * n
+        self.padre = [0] * n
+        self.sello = [0] * n
+        self.cerrado = None
+        self.version = 0
+    
+    def cerrados(self):
+        """Sellos de las celdas ya expandidas (cerrado[i] == version); se crea al usarse"""
+        if self.cerrado is None:
+            self.cerrado = [0] * self.n
+        return self.cerrado
+
+_espacios = threading.local()
+
+def _espacio_busqueda(n, nombre='actual'):
+    """Devuelve el espacio de trabajo del hilo actual para n celdas.
+    
+    Cada nombre es un espacio aparte (la búsqueda bidireccional usa dos).
+    """
+    espacio = getattr(_espacios, nombre, None)
+    if espacio is None or espacio.n != n:
+        espacio = _EspacioBusqueda(n)
+        setattr(_espacios, nombre, espacio)
+    espacio.version += 1
+    return espacio
+
+# Movimientos (di, dj); el orden fija el bit de cada uno en GrafoCuadricula.mascara
+MOVIMIENTOS_4 = ((0, 1), (1, 0), (0, -1), (-1, 0))
+MOVIMIENTOS_8 = MOVIMIENTOS_4 + ((-1, -1), (-1, 1), (1, -1), (1, 1))
+_LIBRES = bytes([1]) + bytes(255)  # Para translate(): 1 en las celdas libres, 0 en el resto
+
+@functools.lru_cache(maxsize=8)
+def _tabla_aristas(movimientos, w):
+    """GrafoCuadricula.aristas; solo depende de los movimientos y del ancho, así que se comparte"""
+    desplazamientos = tuple(di * w + dj for di, dj in movimientos)
+    return tuple(tuple((d, di, dj, math.sqrt(di * di + dj * dj))
+                       for k, (d, (di, dj)) in enumerate(zip(desplazamientos, movimientos))
+                       if mascara >> k & 1)
+                 for mascara in range(1 << len(movimientos)))
+
+class GrafoCuadricula:
+    """Vecinos libres precalculados de cada celda de una cuadrícula aplanada con borde.
+    
+    mascara[k] tiene un bit por movimiento que lleva de la celda libre k a
+    otra libre (0 en paredes y borde), y aristas[mascara[k]] son esos
+    movimientos como (desplazamiento plano, di, dj, costo). Las búsquedas
+    recorren solo vecinos libres, sin mirar paredes ni límites ni calcular
+    costos en cada expansión. Ocupa un byte por celda; al cambiar una pared
+    solo se recalculan esa celda y sus vecinas.
+    """
+    
+    def __init__(self, celdas, ancho, movimientos=MOVIMIENTOS_4):
+        self.w = w = ancho + 2
+        self.ancho = ancho
+        self.alto = len(celdas) // w - 2
+        self.celdas = bytearray(celdas)
+        self.movimientos = movimientos
+        self.desplazamientos = tuple(di * w + dj for di, dj in movimientos)
+        self.aristas = _tabla_aristas(movimientos, w)
+        
+        # Todas las máscaras a la vez con enteros grandes: el byte k de libres
+        # vale 1 si la celda k es libre, y desplazarlo 8*d bits lo alinea con
+        # el de la celda k + d
+        n = len(self.celdas)
+        libres = int.from_bytes(self.celdas.translate(_LIBRES), 'little')
+        mascara = 0
+        for k, d in enumerate(self.desplazamientos):
+            mascara |= (libres >> 8 * d if d > 0 else libres << -8 * d) << k
+        mascara &= libres * 0xFF
+        self.mascara = bytearray(mascara.to_bytes(n + w + 1, 'little')[:n])
+    
+    def indice(self, pos):
+        return (pos[0] + 1) * self.w + pos[1] + 1
+    
+    def poner_pared(self, pos, pared):
+        """Pone (pared verdadero) o quita una pared en pos y actualiza las máscaras vecinas"""
+        k = self.indice(pos)
+        self.celdas[k] = 1 if pared else 0
+        celdas, mascara = self.celdas, self.mascara
+        for u in (k,) + tuple(k - d for d in self.desplazamientos):
+            if celdas[u]:
+                mascara[u] = 0
+            else:
+                mascara[u] = sum(1 << bit for bit, d in enumerate(self.desplazamientos)
+                                 if not celdas[u + d])
+
+def astar_celdas(celdas, ancho, inicio, objetivo, grafo=None):
+    """Núcleo de astar() sobre una cuadrícula ya aplanada con celdas_con_borde().
+    
+    celdas puede ser cualquier secuencia indexable de enteros (bytes,
+    memoryview de memoria compartida...), así el preprocesado se hace una
+    sola vez para muchas consultas sobre el mismo mapa. grafo es su
+    GrafoCuadricula de 4 vecinos; si no se da, se construye aquí.
+    """
+    w = ancho + 2
+    alto = len(celdas) // w - 2
+    if not (0 <= inicio[0] < alto and 0 <= inicio[1] < ancho and
+            0 <= objetivo[0] < alto and 0 <= objetivo[1] < ancho):
+        return []
+    
+    origen = (inicio[0] + 1) * w + inicio[1] + 1
+    destino = (objetivo[0] + 1) * w + objetivo[1] + 1
+    if celdas[destino]:
+        return []
+    di, dj = divmod(destino, w)
+    medir = registro.activo
+    t0 = time.perf_counter() if medir else 0.0
+    if grafo is None:
+        grafo = GrafoCuadricula(celdas, ancho)
+    mascara, aristas = grafo.mascara, grafo.aristas
+    
+    espacio = _espacio_busqueda(len(celdas))
+    version, g, padre, sello = espacio.version, espacio.g, espacio.padre, espacio.sello
+    heappush, heappop = heapq.heappush, heapq.heappop
+    
+    h = abs(inicio[0] - objetivo[0]) + abs(inicio[1] - objetivo[1])
+    sello[origen] = version
+    g[origen] = 0
+    padre[origen] = -1
+    lista_abierta = [(h, h, origen)]
+    # Contadores para la medición: uno por expansión y los demás en ramas
+    # raras o si medir; las entradas metidas se deducen al final
+    expandidos = obsoletas = duplicadas = pico = 0
+    camino = []
+    
+    while lista_abierta:
+        if medir and len(lista_abierta) > pico:
+            pico = len(lista_abierta)
+        f, h, actual = heappop(lista_abierta)
+        g_actual = f - h
+        if g_actual > g[actual]:
+            obsoletas += 1
+            continue  # Entrada obsoleta: el nodo ya salió con un g menor
+        expandidos += 1
+        
+        if actual == destino:
+            while actual != -1:
+                i, j = divmod(actual, w)
+                camino.append((i - 1, j - 1))
+                actual = padre[actual]
+            camino.reverse()
+            break
+        
+        i, j = divmod(actual, w)
+        nuevo_g = g_actual + 1
+        for desplazamiento, mi, mj, _ in aristas[mascara[actual]]:
+            vecino = actual + desplazamiento
+            if sello[vecino] == version:
+                if g[vecino] <= nuevo_g:
+                    continue
+                duplicadas += 1  # Ya estaba en la lista abierta con un g peor
+            sello[vecino] = version
+            g[vecino] = nuevo_g
+            padre[vecino] = actual
+            h = abs(i + mi - di) + abs(j + mj - dj)
+            heappush(lista_abierta, (nuevo_g + h, h, vecino))
+    
+    if medir:
+        # Cada entrada metida salió (expandida u obsoleta) o sigue en la lista
+        empujes = expandidos + obsoletas + len(lista_abierta)
+        registro.anotar('astar', segundos=time.perf_counter() - t0,
+                        expandidos=expandidos, empujes=empujes,
+                        pico_abierta=pico, duplicadas=duplicadas, largo=len(camino))
+    return camino
+
+def astar_bidireccional(celdas, ancho, inicio, objetivo, grafo=None):
+    """A* bidireccional sobre una cuadrícula aplanada con celdas_con_borde().
+    
+    Una búsqueda sale de inicio y otra de objetivo; en cada paso avanza la de
+    lista abierta más corta. Usan potenciales promediados, p(v) = (M(v,
+    objetivo) - M(v, inicio)) / 2 hacia adelante y -p(v) hacia atrás (M es
+    Manhattan): son consistentes y suman 0, así que el costo de un camino
+    por v es la suma de sus claves y se puede parar en cuanto las cimas de
+    las dos listas sumen al menos mejor, el largo del mejor camino que ya une
+    ambas búsquedas. Las claves se guardan duplicadas para que sean enteras.
+    
+    Si una lista se vacía sin que se hayan tocado no hay camino: con el
+    objetivo encerrado eso pasa tras explorar solo su región. Los caminos
+    tienen el mismo largo que los de astar_celdas(); grafo, como allí.
+    """
+    w = ancho + 2
+    alto = len(celdas) // w - 2
+    if not (0 <= inicio[0] < alto and 0 <= inicio[1] < ancho and
+            0 <= objetivo[0] < alto and 0 <= objetivo[1] < ancho):
+        return []
+    
+    origen = (inicio[0] + 1) * w + inicio[1] + 1
+    destino = (objetivo[0] + 1) * w + objetivo[1] + 1
+    if celdas[destino]:
+        return []
+    if origen == destino:
+        return [tuple(inicio)]
+    medir = registro.activo
+    t0 = time.perf_counter() if medir else 0.0
+    if grafo is None:
+        grafo = GrafoCuadricula(celdas, ancho)
+    mascara, aristas = grafo.mascara, grafo.aristas
+    
+    directa = _espacio_busqueda(len(celdas))
+    inversa = _espacio_busqueda(len(celdas), 'inversa')
+    heappush, heappop = heapq.heappush, heapq.heappop
+    
+    # Entradas (2g + h, h, celda) con h = 2p: en inicio y en objetivo vale la
+    # distancia Manhattan entre ambos
+    h = abs(inicio[0] - objetivo[0]) + abs(inicio[1] - objetivo[1])
+    for espacio, nodo in ((directa, origen), (inversa, destino)):
+        espacio.sello[nodo] = espacio.version
+        espacio.g[nodo] = 0
+        espacio.padre[nodo] = -1
+    # Por lado: lista abierta, espacio, celdas hacia la que acerca y de la que
+    # aleja la heurística, y espacio del otro lado
+    lados = ([(h, h, origen)], directa, divmod(destino, w), divmod(origen, w), inversa), \
+            ([(h, h, destino)], inversa, divmod(origen, w), divmod(destino, w), directa)
+    mejor = len(celdas)  # Cota superior: ningún camino simple es tan largo
+    encuentro = None     # (celda del lado directo, celda vecina del lado inverso)
+    expandidos = [0, 0]
+    obsoletas = [0, 0]
+    duplicadas = [0, 0]
+    pico = 0
+    camino = []
+    
+    while lados[0][0] and lados[1][0]:
+        if lados[0][0][0][0] + lados[1][0][0][0] >= 2 * mejor:
+            break
+        if medir and len(lados[0][0]) + len(lados[1][0]) > pico:
+            pico = len(lados[0][0]) + len(lados[1][0])
+        lado = 0 if len(lados[0][0]) <= len(lados[1][0]) else 1
+        lista_abierta, espacio, (di, dj), (si, sj), otro = lados[lado]
+        version, g, padre, sello = espacio.version, espacio.g, espacio.padre, espacio.sello
+        version_otro, g_otro, sello_otro = otro.version, otro.g, otro.sello
+        
+        f, h, actual = heappop(lista_abierta)
+        g_actual = (f - h) >> 1
+        if g_actual > g[actual]:
+            obsoletas[lado] += 1
+            continue
+        expandidos[lado] += 1
+        
+        i, j = divmod(actual, w)
+        nuevo_g = g_actual + 1
+        for desplazamiento, mi, mj, _ in aristas[mascara[actual]]:
+            vecino = actual + desplazamiento
+            if sello_otro[vecino] == version_otro and nuevo_g + g_otro[vecino] < mejor:
+                mejor = nuevo_g + g_otro[vecino]
+                encuentro = (vecino, actual) if lado else (actual, vecino)
+            if sello[vecino] == version:
+                if g[vecino] <= nuevo_g:
+                    continue
+                duplicadas[lado] += 1
+            sello[vecino] = version
+            g[vecino] = nuevo_g
+            padre[vecino] = actual
+            vi, vj = i + mi, j + mj
+            h = abs(vi - di) + abs(vj - dj) - abs(vi - si) - abs(vj - sj)
+            heappush(lista_abierta, (2 * nuevo_g + h, h, vecino))
+    
+    if encuentro is not None:
+        actual, siguiente = encuentro
+        while actual != -1:
+            i, j = divmod(actual, w)
+            camino.append((i - 1, j - 1))
+            actual = directa.padre[actual]
+        camino.reverse()
+        while siguiente != -1:
+            i, j = divmod(siguiente, w)
+            camino.append((i - 1, j - 1))
+            siguiente = inversa.padre[siguiente]
+    
+    if medir:
+        registro.anotar('astar_bidireccional', segundos=time.perf_counter() - t0,
+                        expandidos=sum(expandidos), expandidos_directa=expandidos[0],
+                        expandidos_inversa=expandidos[1], pico_abierta=pico,
+                        duplicadas=sum(duplicadas), largo=len(camino))
+    return camino
+
+def astar_pesos(pesos, ancho, inicio, objetivo):
+    """A* con costos de terreno sobre una cuadrícula aplanada con pesos_con_borde().
+    
+    La heurística es la distancia Manhattan multiplicada por el menor costo
+    del mapa: sigue siendo admisible y consistente con pasos de costo mayor.
+    """
+    w = ancho + 2
+    alto = len(pesos) // w - 2
+    if not (0 <= inicio[0] < alto and 0 <= inicio[1] < ancho and
+            0 <= objetivo[0] < alto and 0 <= objetivo[1] < ancho):
+        return []
+    
+    origen = (inicio[0] + 1) * w + inicio[1] + 1
+    destino = (objetivo[0] + 1) * w + objetivo[1] + 1
+    if not pesos[destino]:
+        return []
+    di, dj = divmod(destino, w)
+    costos = set(pesos)
+    costos.discard(0)
+    k = min(costos)
+    medir = registro.activo
+    t0 = time.perf_counter() if medir else 0.0
+    
+    espacio = _espacio_busqueda(len(pesos))
+    version, g, padre, sello = espacio.version, espacio.g, espacio.padre, espacio.sello
+    heappush, heappop = heapq.heappush, heapq.heappop
+    
+    h = k * (abs(inicio[0] - objetivo[0]) + abs(inicio[1] - objetivo[1]))
+    sello[origen] = version
+    g[origen] = 0
+    padre[origen] = -1
+    lista_abierta = [(h, h, origen)]
+    expandidos = obsoletas = duplicadas = pico = 0
+    camino = []
+    
+    while lista_abierta:
+        if medir and len(lista_abierta) > pico:
+            pico = len(lista_abierta)
+        f, h, actual = heappop(lista_abierta)
+        g_actual = f - h
+        if g_actual > g[actual]:
+            obsoletas += 1
+            continue
+        expandidos += 1
+        
+        if actual == destino:
+            while actual != -1:
+                i, j = divmod(actual, w)
+                camino.append((i - 1, j - 1))
+                actual = padre[actual]
+            camino.reverse()
+            break
+        
+        # La h del vecino difiere en ±k de la del nodo actual
+        i, j = divmod(actual, w)
+        for vecino, dh in ((actual + 1, -k if j < dj else k),
+                           (actual + w, -k if i < di else k),
+                           (actual - 1, -k if j > dj else k),
+                           (actual - w, -k if i > di else k)):
+            costo = pesos[vecino]
+            if not costo:
+                continue
+            nuevo_g = g_actual + costo
+            if sello[vecino] == version:
+                if g[vecino] <= nuevo_g:
+                    continue
+                duplicadas += 1
+            sello[vecino] = version
+            g[vecino] = nuevo_g
+            padre[vecino] = actual
+            heappush(lista_abierta, (nuevo_g + h + dh, h + dh, vecino))
+    
+    if medir:
+        empujes = expandidos + obsoletas + len(lista_abierta)
+        registro.anotar('astar_pesos', segundos=time.perf_counter() - t0,
+                        expandidos=expandidos, empujes=empujes,
+                        pico_abierta=pico, duplicadas=duplicadas, largo=len(camino))
+    return camino
+
+def astar_heuristica(celdas, ancho, inicio, objetivo, h, grafo=None):
+    """Como astar_celdas(), pero con una heurística precalculada por celda.
+    
+    h[k] debe ser una cota inferior consistente de la distancia del índice
+    plano k (con borde) a objetivo, por ejemplo Referencias.heuristica().
+    """
+    w = ancho + 2
+    alto = len(celdas) // w - 2
+    if not (0 <= inicio[0] < alto and 0 <= inicio[1] < ancho and
+            0 <= objetivo[0] < alto and 0 <= objetivo[1] < ancho):
+        return []
+    
+    origen = (inicio[0] + 1) * w + inicio[1] + 1
+    destino = (objetivo[0] + 1) * w + objetivo[1] + 1
+    if celdas[destino]:
+        return []
+    medir = registro.activo
+    t0 = time.perf_counter() if medir else 0.0
+    if grafo is None:
+        grafo = GrafoCuadricula(celdas, ancho)
+    mascara, aristas = grafo.mascara, grafo.aristas
+    
+    espacio = _espacio_busqueda(len(celdas))
+    version, g, padre, sello = espacio.version, espacio.g, espacio.padre, espacio.sello
+    heappush, heappop = heapq.heappush, heapq.heappop
+    
+    sello[origen] = version
+    g[origen] = 0
+    padre[origen] = -1
+    lista_abierta = [(h[origen], h[origen], origen)]
+    expandidos = obsoletas = duplicadas = pico = 0
+    camino = []
+    
+    while lista_abierta:
+        if medir and len(lista_abierta) > pico:
+            pico = len(lista_abierta)
+        f, h_actual, actual = heappop(lista_abierta)
+        g_actual = f - h_actual
+        if g_actual > g[actual]:
+            obsoletas += 1
+            continue
+        expandidos += 1
+        
+        if actual == destino:
+            while actual != -1:
+                i, j = divmod(actual, w)
+                camino.append((i - 1, j - 1))
+                actual = padre[actual]
+            camino.reverse()
+            break
+        
+        nuevo_g = g_actual + 1
+        for desplazamiento, _, _, _ in aristas[mascara[actual]]:
+            vecino = actual + desplazamiento
+            if sello[vecino] == version:
+                if g[vecino] <= nuevo_g:
+                    continue
+                duplicadas += 1
+            sello[vecino] = version
+            g[vecino] = nuevo_g
+            padre[vecino] = actual
+            h_vecino = h[vecino]
+            heappush(lista_abierta, (nuevo_g + h_vecino, h_vecino, vecino))
+    
+    if medir:
+        empujes = expandidos + obsoletas + len(lista_abierta)
+        registro.anotar('astar_alt', segundos=time.perf_counter() - t0,
+                        expandidos=expandidos, empujes=empujes,
+                        pico_abierta=pico, duplicadas=duplicadas, largo=len(camino))
+    return camino
@@ -0,0 +1,133 @@
+"""Caché LRU de rutas más cortas con reutilización de sufijos.
+
+Cada tramo final de una ruta más corta es a su vez una ruta más corta hasta
+el mismo objetivo. Por eso, al guardar una ruta se indexan todas sus celdas:
+si después un agente avanza por ella, la consulta desde su nueva posición es
+una búsqueda en un diccionario y no una búsqueda A*. Lo que se devuelve es un
+TramoRuta, una vista de la ruta guardada desde esa posición: no se copia, así
+que un acierto cuesta lo mismo en la primera celda que en la última.
+
+Las claves llevan la versión de la cuadrícula (Laberinto.version); al ver una
+versión nueva se descarta todo lo anterior, que ya no puede volver a usarse.
+"""
+from collections import OrderedDict
+from itertools import islice
+
+
+class TramoRuta:
+    """Vista de solo lectura de ruta[inicio:fin] que no copia la ruta.
+
+    Se usa como una lista de celdas: len, índices, iteración y comparación
+    con listas. Recortarla con paso 1 da otra vista; la ruta de base no debe
+    modificarse mientras haya vistas.
+    """
+
+    __slots__ = ('ruta', 'inicio', 'fin')
+
+    def __init__(self, ruta, inicio=0, fin=None):
+        self.ruta = ruta
+        self.inicio = inicio
+        self.fin = len(ruta) if fin is None else fin
+
+    def __len__(self):
+        return self.fin - self.inicio
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            inicio, fin, paso = k.indices(len(self))
+            if paso == 1:
+                return TramoRuta(self.ruta, self.inicio + inicio, self.inicio + max(inicio, fin))
+            return self.ruta[self.inicio:self.fin][k]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("índice fuera del tramo")
+        return self.ruta[self.inicio + k]
+
+    def __iter__(self):
+        return islice(self.ruta, self.inicio, self.fin)
+
+    def __eq__(self, otra):
+        if not isinstance(otra, (list, tuple, TramoRuta)):
+            return NotImplemented
+        return len(self) == len(otra) and all(a == b for a, b in zip(self, otra))
+
+    def __repr__(self):
+        return f"TramoRuta({list(self)!r})"
+
+
+class CacheRutas:
+    """Rutas por (versión, inicio, objetivo) con desalojo LRU y tope de celdas"""
+
+    def __init__(self, max_celdas=100_000):
+        self.max_celdas = max_celdas  # Suma de largos de las rutas guardadas
+        self.version = None
+        self.indice = {}              # (inicio, objetivo) -> (ruta, posición de inicio en ruta)
+        self.rutas = OrderedDict()    # id(ruta) -> (ruta, inicio, objetivo), de menos a más reciente
+        self.celdas = 0
+        self.aciertos = 0
+        self.aciertos_sufijo = 0      # Aciertos en una celda intermedia de una ruta guardada
+        self.fallos = 0
+        self.desalojos = 0
+
+    def buscar(self, version, inicio, objetivo):
+        """TramoRuta guardado desde inicio hasta objetivo, o None si no lo hay"""
+        if version != self.version:
+            self.vaciar(version)
+        entrada = self.indice.get((inicio, objetivo))
+        if entrada is None:
+            self.fallos += 1
+            return None
+        ruta, i = entrada
+        self.aciertos += 1
+        if i:
+            self.aciertos_sufijo += 1
+        self.rutas.move_to_end(id(ruta))
+        return TramoRuta(ruta, i)
+
+    def guardar(self, version, inicio, objetivo, ruta):
+        """Guarda una ruta más corta (o [] si no hay camino) calculada para version"""
+        if version != self.version:
+            self.vaciar(version)
+        if not ruta:
+            # Sin camino: solo se recuerda la consulta exacta
+            ruta = []
+            self.indice[(inicio, objetivo)] = (ruta, 0)
+        else:
+            ruta = list(ruta)
+            for i, celda in enumerate(ruta):
+                self.indice[(celda, objetivo)] = (ruta, i)
+        self.rutas[id(ruta)] = (ruta, inicio, objetivo)
+        self.celdas += max(len(ruta), 1)
+
+        while self.celdas > self.max_celdas and len(self.rutas) > 1:
+            self._desalojar()
+
+    def _desalojar(self):
+        _, (ruta, inicio, objetivo) = self.rutas.popitem(last=False)
+        self.celdas -= max(len(ruta), 1)
+        self.desalojos += 1
+        # Solo se borran las celdas que no apunten ya a una ruta más nueva
+        for celda in ruta or [inicio]:
+            entrada = self.indice.get((celda, objetivo))
+            if entrada is not None and entrada[0] is ruta:
+                del self.indice[(celda, objetivo)]
+
+    def vaciar(self, version=None):
+        """Descarta todas las rutas (la cuadrícula cambió)"""
+        self.version = version
+        self.indice.clear()
+        self.rutas.clear()
+        self.celdas = 0
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'aciertos_sufijo': self.aciertos_sufijo,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'desalojos': self.desalojos,
+            'rutas': len(self.rutas),
+            'celdas': self.celdas,
+        }
@@ -0,0 +1,202 @@
+"""Formato binario de laberintos (.lab) con carga por np.memmap, y texto ASCII.
+
+Estructura de un .lab (little-endian), versión 1:
+
+    cabecera   64 bytes, ver CABECERA: firma, versión, banderas, alto, ancho,
+               jugador, IA y objetivo (-1, -1 si no hay), semilla y bloques
+    paredes    alto filas de ceil(ancho / 8) bytes; bit 1 = pared y el bit más
+               significativo de cada byte es la columna de menor índice
+    etiquetas  opcional (bandera CON_ETIQUETAS): etiquetar_componentes() como
+               int32, o int64 con ETIQUETAS_64; empieza alineada a 8 bytes
+
+Al abrir se mapea el archivo en lugar de leerlo: un mapa de miles de millones
+de celdas abre al instante y los procesos que lo abren comparten las páginas.
+
+En ASCII cada fila es una línea: '#' pared, '.' libre, 'J' jugador, 'I' IA y
+'O' objetivo.
+"""
+import argparse
+import struct
+
+import numpy as np
+
+from nucleo_laberinto import Laberinto, etiquetar_componentes
+
+FIRMA = b'LABP'
+VERSION = 1
+# firma, versión, banderas, alto, ancho, jugador, ia, objetivo, semilla, bloques
+CABECERA = struct.Struct('<4sHHQQiiiiiiQQ')
+
+CON_ETIQUETAS = 1
+ETIQUETAS_64 = 2
+CON_SEMILLA = 4
+
+# Filas que se empaquetan de una vez al guardar (acota la memoria temporal)
+FILAS_POR_BLOQUE = 4096
+
+SIMBOLOS = {'#': 1, '.': 0, 'J': 0, 'I': 0, 'O': 0}
+
+
+def _alinear(n, a=8):
+    return -(-n // a) * a
+
+
+def guardar(ruta, grid, jugador=None, ia=None, objetivo=None, semilla=None, etiquetas=False):
+    """Escribe grid (0 = libre, distinto de 0 = pared) en formato .lab.
+
+    etiquetas puede ser False, True (se calculan con etiquetar_componentes) o
+    un array ya calculado. grid puede ser un np.memmap: se procesa por bloques
+    de filas.
+    """
+    grid = np.asarray(grid)
+    alto, ancho = grid.shape
+    if etiquetas is True:
+        etiquetas = etiquetar_componentes(grid)
+    elif etiquetas is False:
+        etiquetas = None
+
+    banderas = 0
+    if etiquetas is not None:
+        banderas |= CON_ETIQUETAS
+        if alto * ancho > np.iinfo(np.int32).max:
+            banderas |= ETIQUETAS_64
+    if semilla is not None:
+        banderas |= CON_SEMILLA
+
+    posiciones = []
+    for pos in (jugador, ia, objetivo):
+        posiciones += list(pos) if pos is not None else [-1, -1]
+
+    bloques = 0
+    with open(ruta, 'wb') as f:
+        f.write(CABECERA.pack(FIRMA, VERSION, banderas, alto, ancho, *posiciones,
+                              semilla or 0, 0))
+        for i in range(0, alto, FILAS_POR_BLOQUE):
+            filas = grid[i:i + FILAS_POR_BLOQUE] != 0
+            bloques += int(filas.sum())
+            np.packbits(filas, axis=1).tofile(f)
+
+        if etiquetas is not None:
+            f.write(bytes(_alinear(f.tell()) - f.tell()))
+            tipo = np.int64 if banderas & ETIQUETAS_64 else np.int32
+            etiquetas = np.asarray(etiquetas)
+            for i in range(0, alto, FILAS_POR_BLOQUE):
+                etiquetas[i:i + FILAS_POR_BLOQUE].astype(tipo).tofile(f)
+
+        # El total de bloques se conoce al final: se reescribe la cabecera
+        f.seek(0)
+        f.write(CABECERA.pack(FIRMA, VERSION, banderas, alto, ancho, *posiciones,
+                              semilla or 0, bloques))
+
+
+def guardar_laberinto(ruta, laberinto, semilla=None, etiquetas=True):
+    """Guarda un Laberinto con sus posiciones (y sus etiquetas si ya las tiene)"""
+    if etiquetas is True and laberinto.componentes is not None:
+        etiquetas = laberinto.componentes
+    guardar(ruta, laberinto.grid, laberinto.jugador, laberinto.ia, laberinto.objetivo,
+            semilla, etiquetas)
+
+
+class ArchivoLaberinto:
+    """Laberinto .lab abierto con np.memmap; las celdas se leen bajo demanda"""
+
+    def __init__(self, ruta, modo='r'):
+        with open(ruta, 'rb') as f:
+            datos = f.read(CABECERA.size)
+        if len(datos) < CABECERA.size or datos[:4] != FIRMA:
+            raise ValueError(f"{ruta} no es un archivo de laberinto")
+        (_, self.version, self.banderas, self.alto, self.ancho,
+         ji, jj, ii, ij, oi, oj, semilla, self.num_bloques) = CABECERA.unpack(datos)
+        if self.version > VERSION:
+            raise ValueError(f"Versión {self.version} no soportada (máxima {VERSION})")
+
+        self.jugador = (ji, jj) if ji >= 0 else None
+        self.ia = (ii, ij) if ii >= 0 else None
+        self.objetivo = (oi, oj) if oi >= 0 else None
+        self.semilla = semilla if self.banderas & CON_SEMILLA else None
+
+        self.bytes_fila = -(-self.ancho // 8)
+        self.paredes = np.memmap(ruta, dtype=np.uint8, mode=modo, offset=CABECERA.size,
+                                 shape=(self.alto, self.bytes_fila))
+        self.componentes = None
+        if self.banderas & CON_ETIQUETAS:
+            tipo = np.int64 if self.banderas & ETIQUETAS_64 else np.int32
+            inicio = _alinear(CABECERA.size + self.alto * self.bytes_fila)
+            self.componentes = np.memmap(ruta, dtype=tipo, mode=modo, offset=inicio,
+                                         shape=(self.alto, self.ancho))
+
+    def pared(self, pos):
+        """1 si la celda es pared; solo toca la página de esa fila"""
+        i, j = pos
+        return int(self.paredes[i, j >> 3] >> (7 - (j & 7)) & 1)
+
+    def region(self, i0, i1, j0, j1):
+        """Subcuadrícula [i0:i1, j0:j1] desempaquetada como uint8"""
+        bits = np.unpackbits(self.paredes[i0:i1, j0 >> 3:-(-j1 // 8)], axis=1)
+        return bits[:, j0 & 7:(j0 & 7) + j1 - j0]
+
+    def grid(self):
+        """Cuadrícula completa en memoria, con el mismo tipo que Laberinto.grid"""
+        return self.region(0, self.alto, 0, self.ancho).astype(int)
+
+    def laberinto(self, rng=None):
+        """Laberinto de juego con las posiciones guardadas (requiere que existan)"""
+        componentes = np.array(self.componentes) if self.componentes is not None else None
+        return Laberinto.desde_grid(self.grid(), self.jugador, self.ia, self.objetivo,
+                                    componentes, rng=rng)
+
+
+def abrir(ruta, modo='r'):
+    """Abre un .lab sin leerlo entero (modo 'r+' permite modificar paredes en disco)"""
+    return ArchivoLaberinto(ruta, modo)
+
+
+def exportar_ascii(ruta, laberinto):
+    """Escribe un Laberinto como texto ('#', '.', 'J', 'I', 'O')"""
+    filas = [['#' if celda else '.' for celda in fila] for fila in laberinto.grid.tolist()]
+    for simbolo, pos in (('O', laberinto.objetivo), ('I', laberinto.ia), ('J', laberinto.jugador)):
+        if pos is not None:
+            filas[pos[0]][pos[1]] = simbolo
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.writelines(''.join(fila) + '\n' for fila in filas)
+
+
+def importar_ascii(ruta, rng=None):
+    """Lee un laberinto de texto; debe tener J, I y O exactamente una vez"""
+    with open(ruta, encoding='utf-8') as f:
+        lineas = [linea.rstrip('\r\n') for linea in f if linea.strip()]
+    if not lineas or len({len(linea) for linea in lineas}) != 1:
+        raise ValueError(f"{ruta}: todas las filas deben tener el mismo largo")
+
+    posiciones = {}
+    grid = np.zeros((len(lineas), len(lineas[0])), dtype=int)
+    for i, linea in enumerate(lineas):
+        for j, simbolo in enumerate(linea):
+            if simbolo not in SIMBOLOS:
+                raise ValueError(f"{ruta}:{i + 1}: símbolo desconocido {simbolo!r}")
+            grid[i, j] = SIMBOLOS[simbolo]
+            if simbolo in 'JIO':
+                if simbolo in posiciones:
+                    raise ValueError(f"{ruta}: '{simbolo}' aparece más de una vez")
+                posiciones[simbolo] = (i, j)
+    faltan = [s for s in 'JIO' if s not in posiciones]
+    if faltan:
+        raise ValueError(f"{ruta}: faltan {', '.join(faltan)}")
+    return Laberinto.desde_grid(grid, posiciones['J'], posiciones['I'], posiciones['O'], rng=rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte laberintos entre ASCII y .lab")
+    parser.add_argument('entrada', help="archivo .txt (ASCII) o .lab")
+    parser.add_argument('salida', help="archivo .txt (ASCII) o .lab")
+    parser.add_argument('--semilla', type=int, default=None, help="semilla a guardar en el .lab")
+    args = parser.parse_args()
+
+    if args.entrada.endswith('.lab'):
+        laberinto = abrir(args.entrada).laberinto()
+    else:
+        laberinto = importar_ascii(args.entrada)
+    if args.salida.endswith('.lab'):
+        guardar_laberinto(args.salida, laberinto, args.semilla)
+    else:
+        exportar_ascii(args.salida, laberinto)
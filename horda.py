@@ -0,0 +1,179 @@
+"""Modo horda: muchos perseguidores guiados por un único campo de distancias.
+
+En lugar de una búsqueda A* por agente se calcula un campo de distancias BFS
+con raíz en el destino (el jugador o el objetivo) y cada agente baja un
+escalón por paso. El campo solo se recalcula cuando cambian el destino o las
+paredes, y el paso de todos los agentes es una única operación de arrays
+sobre sus índices planos en la cuadrícula con borde de celdas_con_borde().
+"""
+import numpy as np
+
+INALCANZABLE = np.iinfo(np.int32).max
+# Con fronteras de este tamaño o más, una capa del BFS se expande con numpy;
+# por debajo el costo fijo de las llamadas a numpy supera al bucle en Python
+FRONTERA_NUMPY = 48
+DESTINOS = ('jugador', 'objetivo')
+
+
+def campo_distancias(celdas, ancho, destino):
+    """Distancias BFS (4 vecinos) desde cada celda hasta destino.
+
+    celdas es la cuadrícula aplanada con celdas_con_borde(); el resultado es
+    un array int32 plano del mismo largo, con INALCANZABLE en paredes y en
+    celdas sin camino. Las capas anchas se expanden con numpy y las estrechas
+    (pasillos) celda a celda, así no se paga una llamada a numpy por cada paso
+    de un pasillo largo.
+    """
+    w = ancho + 2
+    pendientes = bytearray(np.frombuffer(celdas, dtype=np.uint8) == 0)  # Libres sin visitar
+    pendientes_np = np.frombuffer(pendientes, dtype=np.uint8)
+    distancia = np.full(len(pendientes), INALCANZABLE, dtype=np.int32)
+    origen = (destino[0] + 1) * w + destino[1] + 1
+    if not pendientes[origen]:
+        return distancia
+
+    vecinos = np.array([1, -1, w, -w])
+    pendientes[origen] = 0
+    distancia[origen] = 0
+    frontera = [origen]
+    visitadas, capas = [], []  # Celdas de las capas estrechas y la distancia de cada tramo
+    d = 0
+    while len(frontera):
+        d += 1
+        if len(frontera) >= FRONTERA_NUMPY:
+            candidatas = (np.asarray(frontera)[:, None] + vecinos).ravel()
+            candidatas = np.unique(candidatas[pendientes_np[candidatas] != 0])
+            pendientes_np[candidatas] = 0
+            distancia[candidatas] = d
+            frontera = candidatas
+            if len(frontera) < FRONTERA_NUMPY:
+                frontera = frontera.tolist()
+        else:
+            nueva = []
+            for u in frontera:
+                for v in (u + 1, u - 1, u + w, u - w):
+                    if pendientes[v]:
+                        pendientes[v] = 0
+                        nueva.append(v)
+            visitadas += nueva
+            capas.append((d, len(nueva)))
+            frontera = nueva
+
+    if visitadas:
+        distancia[visitadas] = np.repeat([d for d, _ in capas], [n for _, n in capas])
+    return distancia
+
+
+class Horda:
+    """N perseguidores que avanzan juntos por el campo de distancias de un Laberinto.
+
+    El agente 0 empieza en laberinto.ia; los demás en celdas libres al azar.
+    Con evitar_choques, dos agentes nunca terminan un paso en la misma celda
+    (salvo en el destino): quien no puede avanzar espera su turno.
+    """
+
+    def __init__(self, laberinto, num_agentes, destino='jugador', evitar_choques=True, rng=None):
+        if destino not in DESTINOS:
+            raise ValueError(f"Destino desconocido: {destino}")
+        self.laberinto = laberinto
+        self.destino = destino
+        self.evitar_choques = evitar_choques
+        self.w = laberinto.ancho + 2
+        self.vecinos = np.array([1, -1, self.w, -self.w])
+        self.clave_campo = None  # (versión de la cuadrícula, destino) del campo actual
+        self.campo = None
+        self.posiciones = self._colocar(num_agentes, rng if rng is not None else laberinto.rng)
+
+    def _indice(self, pos):
+        return (pos[0] + 1) * self.w + pos[1] + 1
+
+    def _colocar(self, num_agentes, rng):
+        """Índices planos iniciales: la IA y celdas libres distintas elegidas al azar"""
+        laberinto = self.laberinto
+        excluir = {self._indice(p) for p in (laberinto.jugador, laberinto.objetivo, laberinto.ia)}
+        fila, columna = np.divmod(laberinto.libres, laberinto.ancho)
+        libres = (fila + 1) * self.w + columna + 1
+        libres = libres[~np.isin(libres, list(excluir))]
+        extra = min(max(num_agentes - 1, 0), libres.size)
+        elegidas = np.random.default_rng(rng.getrandbits(64)).choice(libres, extra, replace=False)
+        return np.concatenate(([self._indice(laberinto.ia)], elegidas)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.posiciones)
+
+    def celdas(self):
+        """Posiciones (fila, columna) de todos los agentes"""
+        fila, columna = np.divmod(self.posiciones, self.w)
+        return list(zip((fila - 1).tolist(), (columna - 1).tolist()))
+
+    def celda(self, k):
+        """Posición (fila, columna) del agente k"""
+        fila, columna = divmod(int(self.posiciones[k]), self.w)
+        return (fila - 1, columna - 1)
+
+    def celda_destino(self):
+        return self.laberinto.jugador if self.destino == 'jugador' else self.laberinto.objetivo
+
+    def campo_actual(self):
+        """Campo de distancias al destino actual, recalculado solo si cambió algo"""
+        destino = self.celda_destino()
+        clave = (self.laberinto.version, destino)
+        if clave != self.clave_campo:
+            self.campo = campo_distancias(self.laberinto.celdas_aplanadas(), self.laberinto.ancho, destino)
+            self.clave_campo = clave
+        return self.campo
+
+    def usar_campo(self, destino, campo):
+        """Toma un campo hasta destino calculado fuera (en otro hilo) con las paredes actuales"""
+        self.clave_campo = (self.laberinto.version, destino)
+        self.campo = campo
+
+    def campo_al_dia(self):
+        """Indica si el campo guardado es del destino y las paredes actuales"""
+        return self.clave_campo == (self.laberinto.version, self.celda_destino())
+
+    def campo_de_estas_paredes(self):
+        """Indica si el campo guardado sirve para las paredes actuales (aunque el destino se haya movido)"""
+        return self.clave_campo is not None and self.clave_campo[0] == self.laberinto.version
+
+    def paso(self, campo=None):
+        """Mueve cada agente a su vecino más cercano al destino (si lo acerca).
+
+        Sin campo se usa campo_actual(), que lo recalcula aquí si hace falta.
+        """
+        campo = self.campo_actual() if campo is None else campo
+        actuales = self.posiciones
+        candidatas = actuales[:, None] + self.vecinos
+        distancias = campo[candidatas]
+        mejor = distancias.argmin(axis=1)
+        filas = np.arange(len(actuales))
+        acerca = distancias[filas, mejor] < campo[actuales]
+        siguientes = np.where(acerca, candidatas[filas, mejor], actuales)
+        if self.evitar_choques:
+            siguientes = self._sin_choques(actuales, siguientes)
+        self.posiciones = siguientes
+
+    def _sin_choques(self, actuales, siguientes):
+        """Anula movimientos hasta que no haya dos agentes en la misma celda.
+
+        Los que se quedan quietos tienen prioridad sobre los que llegan; entre
+        los que llegan a la vez gana el de menor índice. Cada vuelta solo puede
+        detener agentes, así que termina en como mucho len(actuales) vueltas.
+        """
+        destino = self._indice(self.celda_destino())
+        mueve = siguientes != actuales
+        while True:
+            finales = np.where(mueve, siguientes, actuales)
+            orden = np.lexsort((mueve, finales))
+            ordenadas = finales[orden]
+            repetida = np.zeros(len(orden), dtype=bool)
+            repetida[1:] = ordenadas[1:] == ordenadas[:-1]
+            perdedores = orden[repetida]
+            perdedores = perdedores[mueve[perdedores] & (finales[perdedores] != destino)]
+            if not perdedores.size:
+                return finales
+            mueve[perdedores] = False
+
+    def en(self, pos):
+        """Indica si algún agente está en pos"""
+        return bool((self.posiciones == self._indice(pos)).any())
@@ -0,0 +1,88 @@
+"""Mediciones de costo de búsquedas, generación y dibujo, con registro JSON-lines.
+
+Las funciones instrumentadas llevan sus contadores en variables locales (una
+suma y una comparación por nodo expandido) y solo al terminar, si
+registro.activo es verdadero, los publican con registro.anotar(). Con la
+medición apagada el costo extra es leer ese atributo una vez por llamada.
+
+Cada anotación queda como la última de su evento (para el overlay de la
+interfaz) y, si se indicó un archivo, se añade a él como una línea JSON:
+
+    {"evento": "astar", "t": 1718000000.0, "expandidos": 812, ...}
+
+Definir LABERINTO_MEDICION=archivo.jsonl activa la medición al importar.
+"""
+import json
+import os
+import threading
+import time
+
+
+class Registro:
+    """Destino de las mediciones: última de cada evento y log JSON-lines opcional"""
+
+    def __init__(self):
+        self.activo = False
+        self.ruta = None
+        self.archivo = None
+        self.ultimas = {}   # evento -> datos de su última anotación
+        self.cuentas = {}   # evento -> anotaciones desde que se activó
+        self._cerrojo = threading.Lock()
+
+    def activar(self, ruta=None):
+        """Empieza a medir; con ruta, cada anotación se añade a ese archivo"""
+        with self._cerrojo:
+            if ruta is not None and ruta != self.ruta:
+                if self.archivo is not None:
+                    self.archivo.close()
+                # Con buffer de línea cada medición llega al disco al anotarse
+                self.archivo = open(ruta, 'a', encoding='utf-8', buffering=1)
+                self.ruta = ruta
+            self.activo = True
+
+    def desactivar(self):
+        """Deja de medir y cierra el log"""
+        with self._cerrojo:
+            self.activo = False
+            if self.archivo is not None:
+                self.archivo.close()
+            self.archivo = self.ruta = None
+            self.ultimas.clear()
+            self.cuentas.clear()
+
+    def anotar(self, evento, **datos):
+        """Guarda una medición del evento (llamar solo si self.activo)"""
+        datos = {'evento': evento, 't': round(time.time(), 6), **datos}
+        with self._cerrojo:
+            self.ultimas[evento] = datos
+            self.cuentas[evento] = self.cuentas.get(evento, 0) + 1
+            if self.archivo is not None:
+                self.archivo.write(json.dumps(datos, ensure_ascii=False) + '\n')
+
+    def resumen(self):
+        """Una línea de texto por evento con su última medición (para el overlay)"""
+        with self._cerrojo:
+            ultimas = [dict(datos) for datos in self.ultimas.values()]
+            cuentas = dict(self.cuentas)
+        lineas = []
+        for datos in ultimas:
+            evento = datos.pop('evento')
+            datos.pop('t')
+            campos = [_formatear(clave, valor) for clave, valor in datos.items()]
+            lineas.append(f"{evento} (x{cuentas[evento]}): " + ", ".join(campos))
+        return lineas
+
+
+def _formatear(clave, valor):
+    if clave == 'segundos':
+        return f"{valor * 1e3:.2f} ms"
+    if isinstance(valor, float):
+        return f"{clave}={valor:.3g}"
+    return f"{clave}={valor}"
+
+
+# Registro compartido por todos los módulos instrumentados
+registro = Registro()
+
+if os.environ.get('LABERINTO_MEDICION'):
+    registro.activar(os.environ['LABERINTO_MEDICION'])
@@ -0,0 +1,361 @@
+"""Búsqueda jerárquica (HPA*) para laberintos muy grandes de 4 vecinos.
+
+La cuadrícula se divide en clusters de tam_cluster x tam_cluster. En cada borde
+entre dos clusters vecinos, los tramos de celdas libres a ambos lados son
+entradas con una o dos transiciones. Los nodos del grafo abstracto son las
+celdas de transición. Las aristas son de dos tipos: entre clusters (costo 1) y
+dentro de un cluster (distancia BFS sin salir de él). Las aristas internas se
+calculan la primera vez que la búsqueda entra en un cluster y quedan en caché;
+precalcular() las obtiene todas de una vez.
+
+Una consulta busca en el grafo abstracto y devuelve puntos de paso; refinar()
+los convierte en celdas tramo a tramo, solo cuando se piden. El camino es casi
+óptimo: no atraviesa un cluster por fuera de sus propias celdas.
+"""
+import heapq
+import sys
+from array import array
+
+import numpy as np
+
+from nucleo_laberinto import celdas_con_borde
+
+TAM_CLUSTER = 32
+# Entradas a partir de este largo llevan una transición en cada extremo
+LARGO_ENTRADA = 6
+# Marca de "sin camino interno" en las matrices de distancias (array('H'))
+SIN_CAMINO = 0xFFFF
+
+
+def _transiciones(libre, tam_cluster):
+    """Posiciones de transición a lo largo de una línea de borde.
+
+    libre[k] indica si la celda k está libre a ambos lados del borde. Los
+    tramos se cortan cada tam_cluster celdas porque cada trozo pertenece a otro
+    par de clusters.
+    """
+    k = np.arange(libre.size)
+    anterior = np.concatenate(([False], libre[:-1]))
+    siguiente = np.concatenate((libre[1:], [False]))
+    inicios = np.flatnonzero(libre & (~anterior | (k % tam_cluster == 0)))
+    fines = np.flatnonzero(libre & (~siguiente | (k % tam_cluster == tam_cluster - 1)))
+    largos = fines - inicios + 1
+    cortos = largos < LARGO_ENTRADA
+    return np.concatenate(((inicios + fines)[cortos] // 2, inicios[~cortos], fines[~cortos]))
+
+
+def _bfs(local, ancho, origen, destino=-1):
+    """BFS sobre celdas locales rodeadas de paredes; devuelve (distancias, padres).
+
+    Las celdas no alcanzadas quedan con distancia -1. Si se da destino, la
+    búsqueda para en cuanto lo alcanza.
+    """
+    distancia = [-1] * len(local)
+    padre = [-1] * len(local)
+    distancia[origen] = 0
+    frontera = [origen]
+    d = 0
+    while frontera and (destino < 0 or distancia[destino] < 0):
+        d += 1
+        siguiente = []
+        for u in frontera:
+            for v in (u + 1, u - 1, u + ancho, u - ancho):
+                if distancia[v] < 0 and not local[v]:
+                    distancia[v] = d
+                    padre[v] = u
+                    siguiente.append(v)
+        frontera = siguiente
+    return distancia, padre
+
+
+class MapaJerarquico:
+    """Grafo abstracto HPA* sobre una cuadrícula (0 = libre, 1 = pared)"""
+
+    def __init__(self, laberinto, tam_cluster=TAM_CLUSTER):
+        if not 2 <= tam_cluster <= 255:
+            raise ValueError("tam_cluster debe estar entre 2 y 255")
+        grid = np.asarray(laberinto)
+        self.alto, self.ancho = grid.shape
+        self.w = self.ancho + 2
+        self.tam = tam_cluster
+        self.filas_cluster = -(-self.alto // tam_cluster)
+        self.columnas_cluster = -(-self.ancho // tam_cluster)
+        # Copia propia con borde de paredes: se modifica con cambiar_celda
+        self.celdas = bytearray(celdas_con_borde(grid))
+
+        self.cruces = {}   # Borde ('v' | 'h', ci, cj) -> [(celda, celda del otro lado)]
+        self.inter = {}    # Nodo -> nodos de otros clusters a distancia 1
+        self.nodos = {}    # Cluster -> set de nodos
+        self.intra = {}    # Cluster -> (nodos, posiciones, matriz), se rellena al usarse
+        self.tramos = {}   # Cluster -> {(a, b): celdas de a a b} ya refinadas
+        self.expandidos = 0  # Nodos abstractos expandidos en la última consulta
+
+        libre = grid == 0
+        t = tam_cluster
+        for cj in range(self.columnas_cluster - 1):
+            x = (cj + 1) * t - 1
+            for k in _transiciones(libre[:, x] & libre[:, x + 1], t).tolist():
+                self._agregar_cruce(('v', k // t, cj), self._indice((k, x)), self._indice((k, x + 1)))
+        for ci in range(self.filas_cluster - 1):
+            y = (ci + 1) * t - 1
+            for k in _transiciones(libre[y, :] & libre[y + 1, :], t).tolist():
+                self._agregar_cruce(('h', ci, k // t), self._indice((y, k)), self._indice((y + 1, k)))
+
+    def _indice(self, pos):
+        return (pos[0] + 1) * self.w + pos[1] + 1
+
+    def _posicion(self, indice):
+        i, j = divmod(indice, self.w)
+        return (i - 1, j - 1)
+
+    def _cluster(self, indice):
+        i, j = divmod(indice, self.w)
+        return (i - 1) // self.tam * self.columnas_cluster + (j - 1) // self.tam
+
+    def _h(self, a, b):
+        ai, aj = divmod(a, self.w)
+        bi, bj = divmod(b, self.w)
+        return abs(ai - bi) + abs(aj - bj)
+
+    def _agregar_cruce(self, borde, a, b):
+        self.cruces.setdefault(borde, []).append((a, b))
+        self.inter.setdefault(a, []).append(b)
+        self.inter.setdefault(b, []).append(a)
+        self.nodos.setdefault(self._cluster(a), set()).add(a)
+        self.nodos.setdefault(self._cluster(b), set()).add(b)
+
+    # --- Búsqueda local dentro de un cluster ---
+
+    def _region(self, cluster):
+        """Copia del cluster rodeada de paredes: (celdas locales, fila y columna base, ancho)"""
+        ci, cj = divmod(cluster, self.columnas_cluster)
+        i0, j0 = ci * self.tam, cj * self.tam
+        filas = min(self.tam, self.alto - i0)
+        columnas = min(self.tam, self.ancho - j0)
+        lw = columnas + 2
+        local = bytearray(b'\x01') * ((filas + 2) * lw)
+        for i in range(filas):
+            g = (i0 + i + 1) * self.w + j0 + 1
+            l = (i + 1) * lw + 1
+            local[l:l + columnas] = self.celdas[g:g + columnas]
+        return local, i0, j0, lw
+
+    def _a_local(self, indice, i0, j0, lw):
+        i, j = divmod(indice, self.w)
+        return (i - i0) * lw + j - j0
+
+    def _a_global(self, local, i0, j0, lw):
+        i, j = divmod(local, lw)
+        return (i + i0) * self.w + j + j0
+
+    def _aristas_intra(self, cluster):
+        """(nodos, posición de cada nodo, matriz k x k de distancias) del cluster.
+
+        Se calcula con un BFS por nodo la primera vez que se pide y se guarda;
+        la matriz es un array('H') con SIN_CAMINO donde no hay camino interno.
+        """
+        aristas = self.intra.get(cluster)
+        if aristas is None:
+            region = self._region(cluster)
+            nodos = tuple(self.nodos.get(cluster, ()))
+            locales = [self._a_local(n, *region[1:]) for n in nodos]
+            k = len(nodos)
+            matriz = array('H', [SIN_CAMINO]) * (k * k)
+            for fila, origen in enumerate(locales):
+                distancia, _ = _bfs(region[0], region[3], origen)
+                for columna, destino in enumerate(locales):
+                    if distancia[destino] >= 0:
+                        matriz[fila * k + columna] = distancia[destino]
+            aristas = (nodos, {n: fila for fila, n in enumerate(nodos)}, matriz)
+            self.intra[cluster] = aristas
+        return aristas
+
+    def precalcular(self):
+        """Calcula por adelantado las aristas internas de todos los clusters"""
+        for cluster in self.nodos:
+            self._aristas_intra(cluster)
+
+    # --- Consultas ---
+
+    def ruta_abstracta(self, inicio, objetivo):
+        """Puntos de paso (inicio, transiciones..., objetivo) o [] si no hay camino"""
+        for pos in (inicio, objetivo):
+            if not (0 <= pos[0] < self.alto and 0 <= pos[1] < self.ancho):
+                return []
+        s, t = self._indice(inicio), self._indice(objetivo)
+        if self.celdas[s] or self.celdas[t]:
+            return []
+        if s == t:
+            return [inicio]
+
+        # Se enlazan inicio y objetivo con los nodos de sus clusters
+        cluster_s, cluster_t = self._cluster(s), self._cluster(t)
+        salidas = self._distancias_a_nodos(cluster_s, s)
+        if cluster_s == cluster_t:
+            region = self._region(cluster_s)
+            distancia, _ = _bfs(region[0], region[3], self._a_local(s, *region[1:]),
+                                self._a_local(t, *region[1:]))
+            if distancia[self._a_local(t, *region[1:])] >= 0:
+                salidas.append((t, distancia[self._a_local(t, *region[1:])]))
+        llegadas = dict(self._distancias_a_nodos(cluster_t, t))
+
+        g = {s: 0}
+        padre = {s: None}
+        cerrados = set()
+        abierta = [(self._h(s, t), 0, s)]
+        self.expandidos = 0
+        while abierta:
+            _, _, u = heapq.heappop(abierta)
+            if u in cerrados:
+                continue
+            cerrados.add(u)
+            self.expandidos += 1
+            if u == t:
+                camino = []
+                while u is not None:
+                    camino.append(self._posicion(u))
+                    u = padre[u]
+                return camino[::-1]
+
+            vecinos = [(v, 1) for v in self.inter.get(u, ())]
+            if u in self.inter:
+                nodos, posiciones, matriz = self._aristas_intra(self._cluster(u))
+                k = len(nodos)
+                fila = posiciones[u] * k
+                vecinos += [(nodos[c], d) for c, d in enumerate(matriz[fila:fila + k])
+                            if d != SIN_CAMINO and nodos[c] != u]
+            if u == s:
+                vecinos += salidas
+            if u in llegadas:
+                vecinos.append((t, llegadas[u]))
+
+            g_u = g[u]
+            for v, costo in vecinos:
+                nuevo = g_u + costo
+                if v not in cerrados and nuevo < g.get(v, float('inf')):
+                    g[v] = nuevo
+                    padre[v] = u
+                    h = self._h(v, t)
+                    heapq.heappush(abierta, (nuevo + h, h, v))
+        return []
+
+    def _distancias_a_nodos(self, cluster, origen):
+        """[(nodo, distancia)] desde origen a los nodos alcanzables de su cluster"""
+        region = self._region(cluster)
+        distancia, _ = _bfs(region[0], region[3], self._a_local(origen, *region[1:]))
+        resultado = []
+        for n in self.nodos.get(cluster, ()):
+            d = distancia[self._a_local(n, *region[1:])]
+            if d >= 0:
+                resultado.append((n, d))
+        return resultado
+
+    def refinar(self, puntos):
+        """Genera las celdas del camino entre puntos de paso consecutivos, bajo demanda"""
+        if not puntos:
+            return
+        yield puntos[0]
+        for a, b in zip(puntos, puntos[1:]):
+            yield from self._tramo(self._indice(a), self._indice(b))
+
+    def _tramo(self, a, b):
+        """Celdas después de a hasta b incluida (a y b en el mismo cluster o vecinas)"""
+        cluster = self._cluster(a)
+        if cluster != self._cluster(b):
+            return [self._posicion(b)]
+        cache = self.tramos.setdefault(cluster, {})
+        tramo = cache.get((a, b))
+        if tramo is None:
+            region = self._region(cluster)
+            origen, destino = self._a_local(a, *region[1:]), self._a_local(b, *region[1:])
+            _, padre = _bfs(region[0], region[3], origen, destino)
+            tramo = []
+            u = destino
+            while u != origen:
+                tramo.append(self._posicion(self._a_global(u, *region[1:])))
+                u = padre[u]
+            tramo.reverse()
+            cache[(a, b)] = tramo
+        return tramo
+
+    def ruta(self, inicio, objetivo):
+        """Camino completo de celdas (casi óptimo) o [] si no hay"""
+        return list(self.refinar(self.ruta_abstracta(inicio, objetivo)))
+
+    # --- Cambios en el mapa ---
+
+    def cambiar_celda(self, pos, pared):
+        """Pone (pared=1) o quita (pared=0) una pared y reconstruye solo su zona.
+
+        Se recalculan las entradas de los cuatro bordes del cluster que contiene
+        la celda, y se descartan las aristas internas y los tramos refinados de
+        ese cluster y de sus vecinos.
+        """
+        v = self._indice(pos)
+        if self.celdas[v] == pared:
+            return
+        self.celdas[v] = pared
+
+        ci, cj = pos[0] // self.tam, pos[1] // self.tam
+        bordes = [('v', ci, cj - 1), ('v', ci, cj), ('h', ci - 1, cj), ('h', ci, cj)]
+        afectados = {ci * self.columnas_cluster + cj}
+        for borde in bordes:
+            tipo, bi, bj = borde
+            if not (0 <= bi < self.filas_cluster and 0 <= bj < self.columnas_cluster):
+                continue
+            if (tipo == 'v' and bj == self.columnas_cluster - 1) or (tipo == 'h' and bi == self.filas_cluster - 1):
+                continue
+            self._reconstruir_borde(borde)
+            otro = (bi, bj + 1) if tipo == 'v' else (bi + 1, bj)
+            afectados.add(bi * self.columnas_cluster + bj)
+            afectados.add(otro[0] * self.columnas_cluster + otro[1])
+
+        for cluster in afectados:
+            self.intra.pop(cluster, None)
+            self.tramos.pop(cluster, None)
+
+    def _reconstruir_borde(self, borde):
+        """Quita las transiciones de un borde y las vuelve a calcular"""
+        for a, b in self.cruces.pop(borde, []):
+            for x, y in ((a, b), (b, a)):
+                self.inter[x].remove(y)
+                if not self.inter[x]:
+                    del self.inter[x]
+                    self.nodos[self._cluster(x)].discard(x)
+
+        tipo, ci, cj = borde
+        t, celdas = self.tam, self.celdas
+        if tipo == 'v':
+            x = (cj + 1) * t - 1
+            filas = range(ci * t, min((ci + 1) * t, self.alto))
+            pares = [(self._indice((i, x)), self._indice((i, x + 1))) for i in filas]
+        else:
+            y = (ci + 1) * t - 1
+            columnas = range(cj * t, min((cj + 1) * t, self.ancho))
+            pares = [(self._indice((y, j)), self._indice((y + 1, j))) for j in columnas]
+        libre = np.array([not celdas[a] and not celdas[b] for a, b in pares], dtype=bool)
+        for k in _transiciones(libre, t).tolist():
+            self._agregar_cruce(borde, *pares[k])
+
+    def memoria(self):
+        """Tamaño del grafo abstracto y estimación de los bytes que ocupa"""
+        tamaño = sys.getsizeof
+        aristas_intra = sum(sum(d != SIN_CAMINO for d in matriz) - len(nodos)
+                            for nodos, _, matriz in self.intra.values())
+        bytes_grafo = (tamaño(self.celdas) + tamaño(self.cruces) + tamaño(self.inter) +
+                       tamaño(self.nodos) + tamaño(self.intra) + tamaño(self.tramos))
+        bytes_grafo += sum(tamaño(v) for v in self.cruces.values())
+        bytes_grafo += sum(tamaño(v) for v in self.inter.values())
+        bytes_grafo += sum(tamaño(v) for v in self.nodos.values())
+        for nodos, posiciones, matriz in self.intra.values():
+            bytes_grafo += tamaño(nodos) + tamaño(posiciones) + tamaño(matriz)
+        for cache in self.tramos.values():
+            bytes_grafo += tamaño(cache) + sum(tamaño(v) + 64 * len(v) for v in cache.values())
+        return {
+            'clusters': self.filas_cluster * self.columnas_cluster,
+            'clusters_calculados': len(self.intra),
+            'nodos': sum(len(n) for n in self.nodos.values()),
+            'aristas_inter': sum(len(v) for v in self.inter.values()) // 2,
+            'aristas_intra': aristas_intra,
+            'bytes': bytes_grafo,
+        }
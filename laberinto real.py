@@ -1,41 +1,40 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 import random
-import math
 import time
 
+from instrumentacion import registro
+from motor_astar import METHODS, grid_graph, solve
+
+MAX_MAZE_SIZE = 500   # Tamaño máximo del laberinto (celdas por lado)
+CANVAS_PX = 500       # Lado del canvas en píxeles
+STATS_LOG = "medicion.jsonl"  # Log de la medición activada desde la interfaz
+REPLAY_TICK_MS = 20   # Intervalo mínimo entre tandas de la animación
+TRACE_COLORS = ("yellow", "blue")  # Colores de la traza y del camino
+
 class AStarMazeSolver:
-    def __init__(self, root):
+    def __init__(self, root, maze_size=5):
         self.root = root
-        self.root.title("A* Maze Solver 5x5 - Selección Gráfica")
         
         # Variables para el laberinto
-        self.maze_size = 5
+        self.maze_size = maze_size
         self.maze = [[0 for _ in range(self.maze_size)] for _ in range(self.maze_size)]
+        self.graph = None  # grid_graph(self.maze), se crea al resolver y vale hasta que cambie maze
         self.start_pos = None
         self.end_pos = None
         self.obstacles = 0
-        self.setup_phase = "start"  # "start", "end", "obstacles", "ready"
+        self.setup_phase = "start"  # "start", "end", "obstacles", "ready", "solving"
+        self.replay_job = None  # Tarea de after() que reproduce la traza
         
         # Crear la interfaz gráfica
         self.create_widgets()
         
     def create_widgets(self):
-        # Frame para el laberinto
-        self.maze_frame = tk.Frame(self.root)
-        self.maze_frame.pack(pady=10)
-        
-        # Crear celdas del laberinto con bindings de clic
-        self.cells = []
-        for i in range(self.maze_size):
-            row = []
-            for j in range(self.maze_size):
-                cell = tk.Label(self.maze_frame, text="", width=4, height=2, 
-                               relief="ridge", bg="white")
-                cell.grid(row=i, column=j, padx=1, pady=1)
-                cell.bind("<Button-1>", lambda e, i=i, j=j: self.cell_click(i, j))
-                row.append(cell)
-            self.cells.append(row)
+        # Un único canvas para todo el laberinto
+        self.canvas = tk.Canvas(self.root, bg="white", highlightthickness=0)
+        self.canvas.pack(pady=10)
+        self.canvas.bind("<Button-1>", self.canvas_click)
+        self.build_grid()
         
         # Frame para los botones
         self.button_frame = tk.Frame(self.root)
@@ -54,20 +53,120 @@ class AStarMazeSolver:
                                      command=self.clear_maze)
         self.clear_button.pack(side="left", padx=5)
         
+        tk.Label(self.button_frame, text="Tamaño:").pack(side="left")
+        self.size_var = tk.IntVar(value=self.maze_size)
+        self.size_spinbox = tk.Spinbox(self.button_frame, from_=2, to=MAX_MAZE_SIZE,
+                                       width=5, textvariable=self.size_var)
+        self.size_spinbox.pack(side="left", padx=5)
+        
+        # Algoritmo de búsqueda: A* clásico o Jump Point Search
+        self.method_var = tk.StringVar(value="astar")
+        for method, text in (("astar", "A*"), ("jps", "JPS"), ("bidirectional", "Bidireccional")):
+            tk.Radiobutton(self.button_frame, text=text, value=method,
+                           variable=self.method_var).pack(side="left")
+        
+        # Medición de la búsqueda: overlay sobre el canvas y log JSON-lines
+        self.stats_var = tk.BooleanVar(value=registro.activo)
+        tk.Checkbutton(self.button_frame, text="Medición", variable=self.stats_var,
+                       command=self.toggle_stats).pack(side="left")
+        
+        # Velocidad de reproducción de la búsqueda (0 = sin animación)
+        self.speed_scale = tk.Scale(self.root, from_=0, to=500, resolution=1,
+                                    orient="horizontal", length=250,
+                                    label="Velocidad (ms por nodo, 0 = omitir)")
+        self.speed_scale.set(100)
+        self.speed_scale.pack()
+        
         # Etiqueta de instrucciones
         self.instructions = tk.Label(self.root, text="Haz clic en 'Configurar Laberinto' para comenzar", 
                                     fg="blue")
         self.instructions.pack(pady=5)
     
+    def build_grid(self):
+        """Prepara el canvas para el tamaño actual.
+        
+        Los rectángulos se crean la primera vez que una celda deja de ser
+        blanca y se reutilizan después, así que ni el arranque ni la limpieza
+        dependen del número total de celdas.
+        """
+        self.root.title(f"A* Maze Solver {self.maze_size}x{self.maze_size} - Selección Gráfica")
+        self.canvas.delete("all")
+        self.cell_px = max(1, CANVAS_PX // self.maze_size)
+        side = self.cell_px * self.maze_size
+        self.canvas.config(width=side, height=side)
+        
+        self.cell_items = {}   # índice plano -> id del rectángulo
+        self.cell_colors = {}  # índice plano -> color, solo celdas no blancas
+        
+        # Rejilla como líneas (2*(n+1) items) mientras las celdas sean visibles
+        if self.cell_px >= 4:
+            for k in range(self.maze_size + 1):
+                self.canvas.create_line(0, k * self.cell_px, side, k * self.cell_px, fill="gray")
+                self.canvas.create_line(k * self.cell_px, 0, k * self.cell_px, side, fill="gray")
+        
+        # Etiquetas I/F: dos textos que se mueven con coords()
+        font = ("Helvetica", max(6, self.cell_px // 3), "bold")
+        self.start_label = self.canvas.create_text(0, 0, text="I", font=font, state="hidden")
+        self.end_label = self.canvas.create_text(0, 0, text="F", font=font, state="hidden")
+        self.stats_label = self.canvas.create_text(4, 4, text="", anchor="nw", fill="red",
+                                                   font=("Courier", 8))
+    
+    def paint_cell(self, i, j, color):
+        """Colorea una celda, tocando el canvas solo si el color cambia"""
+        idx = i * self.maze_size + j
+        if self.cell_colors.get(idx, "white") == color:
+            return
+        
+        item = self.cell_items.get(idx)
+        if color == "white":
+            self.canvas.itemconfig(item, state="hidden")
+            del self.cell_colors[idx]
+            return
+        
+        if item is None:
+            px = self.cell_px
+            outline = "gray" if px >= 4 else ""
+            item = self.canvas.create_rectangle(j * px, i * px, (j + 1) * px, (i + 1) * px,
+                                                fill=color, outline=outline)
+            self.canvas.tag_lower(item, self.start_label)
+            self.cell_items[idx] = item
+        else:
+            self.canvas.itemconfig(item, fill=color, state="normal")
+        self.cell_colors[idx] = color
+    
+    def place_label(self, label, pos):
+        i, j = pos
+        px = self.cell_px
+        self.canvas.coords(label, j * px + px / 2, i * px + px / 2)
+        self.canvas.itemconfig(label, state="normal" if px >= 10 else "hidden")
+    
+    def canvas_click(self, event):
+        i, j = event.y // self.cell_px, event.x // self.cell_px
+        if 0 <= i < self.maze_size and 0 <= j < self.maze_size:
+            self.cell_click(i, j)
+    
     def start_setup(self):
+        try:
+            size = int(self.size_var.get())
+        except (tk.TclError, ValueError):
+            size = self.maze_size
+        size = min(max(size, 2), MAX_MAZE_SIZE)
+        self.size_var.set(size)
+        
         self.clear_maze()
+        if size != self.maze_size:
+            self.maze_size = size
+            self.maze = [[0 for _ in range(size)] for _ in range(size)]
+            self.graph = None
+            self.build_grid()
         self.setup_phase = "start"
         self.instructions.config(text="Selecciona la posición INICIAL (clic en una celda)")
     
     def cell_click(self, i, j):
         if self.setup_phase == "start":
             self.start_pos = (i, j)
-            self.cells[i][j].config(text="I", bg="green")
+            self.paint_cell(i, j, "green")
+            self.place_label(self.start_label, (i, j))
             self.setup_phase = "end"
             self.instructions.config(text="Ahora selecciona la posición FINAL (clic en una celda)")
         elif self.setup_phase == "end":
@@ -75,7 +174,8 @@ class AStarMazeSolver:
                 messagebox.showerror("Error", "El destino no puede ser igual al inicio")
                 return
             self.end_pos = (i, j)
-            self.cells[i][j].config(text="F", bg="red")
+            self.paint_cell(i, j, "red")
+            self.place_label(self.end_label, (i, j))
             self.setup_phase = "obstacles"
             self.ask_obstacles()
         elif self.setup_phase == "obstacles":
@@ -103,13 +203,10 @@ class AStarMazeSolver:
                 if (i, j) != self.start_pos and (i, j) != self.end_pos
             ]
             
-            for _ in range(self.obstacles):
-                if not available_positions:
-                    break
-                pos = random.choice(available_positions)
-                self.maze[pos[0]][pos[1]] = 1
-                self.cells[pos[0]][pos[1]].config(bg="black")
-                available_positions.remove(pos)
+            for i, j in random.sample(available_positions, min(self.obstacles, len(available_positions))):
+                self.maze[i][j] = 1
+                self.paint_cell(i, j, "black")
+            self.graph = None
             
             self.setup_phase = "ready"
             self.instructions.config(text="Laberinto configurado. Haz clic en 'Resolver' para encontrar el camino")
@@ -119,15 +216,19 @@ class AStarMazeSolver:
             self.clear_maze()
     
     def clear_maze(self):
+        self.cancel_replay()
         self.maze = [[0 for _ in range(self.maze_size)] for _ in range(self.maze_size)]
+        self.graph = None
         self.start_pos = None
         self.end_pos = None
         self.obstacles = 0
         self.setup_phase = "start"
         
-        for i in range(self.maze_size):
-            for j in range(self.maze_size):
-                self.cells[i][j].config(text="", bg="white")
+        # Solo se repintan las celdas que cambiaron
+        for idx in list(self.cell_colors):
+            self.paint_cell(*divmod(idx, self.maze_size), "white")
+        self.canvas.itemconfig(self.start_label, state="hidden")
+        self.canvas.itemconfig(self.end_label, state="hidden")
         
         self.instructions.config(text="Haz clic en 'Configurar Laberinto' para comenzar")
     
@@ -136,117 +237,99 @@ class AStarMazeSolver:
             messagebox.showerror("Error", "Primero configura el laberinto completamente")
             return
         
-        # Implementación del algoritmo A*
-        class Node:
-            def __init__(self, parent=None, position=None):
-                self.parent = parent
-                self.position = position
-                self.g = 0  # Costo desde el inicio
-                self.h = 0  # Heurística (distancia al destino)
-                self.f = 0  # Costo total (g + h)
-            
-            def __eq__(self, other):
-                return self.position == other.position
-            
-            def __hash__(self):
-                return hash(self.position)
-        
-        # Crear nodos inicial y final
-        start_node = Node(None, self.start_pos)
-        end_node = Node(None, self.end_pos)
-        
-        # Inicializar listas abierta y cerrada
-        open_list = []
-        closed_list = set()
+        self.cancel_replay()
+        self.clear_trace()
+        # La búsqueda se hace fuera de la interfaz; aquí solo se reproduce la traza
+        method = self.method_var.get()
+        t0 = time.perf_counter() if registro.activo else 0.0
+        if self.graph is None:
+            self.graph = grid_graph(self.maze)
+        result = METHODS[method](self.maze, self.start_pos, self.end_pos, graph=self.graph)
+        if registro.activo:
+            registro.anotar('solve_maze', segundos=time.perf_counter() - t0, metodo=method,
+                            expandidos=result.expanded, empujes=result.pushes,
+                            pico_abierta=result.peak_open, duplicadas=result.duplicates,
+                            largo=len(result.path))
+            self.show_stats()
+        if method != "astar":
+            # Búsqueda de referencia para informar de las expansiones ahorradas
+            result.baseline_expanded = solve(self.maze, self.start_pos, self.end_pos, self.graph).expanded
+        self.setup_phase = "solving"
+        self.replay_trace(result, result.iter_trace())
+    
+    def toggle_stats(self):
+        if self.stats_var.get():
+            registro.activar(STATS_LOG)
+        else:
+            registro.desactivar()
+            self.canvas.itemconfig(self.stats_label, text="")
+    
+    def show_stats(self):
+        """Escribe en el overlay la última medición de solve_maze"""
+        self.canvas.itemconfig(self.stats_label, text="\n".join(registro.resumen()))
+        self.canvas.tag_raise(self.stats_label)
+    
+    def clear_trace(self):
+        """Borra la traza y el camino de la resolución anterior"""
+        for idx, color in list(self.cell_colors.items()):
+            if color in TRACE_COLORS:
+                self.paint_cell(*divmod(idx, self.maze_size), "white")
+    
+    def replay_batch(self):
+        """Celdas por tick y ms entre ticks según la escala (None: todo de una vez).
         
-        # Añadir el nodo inicial
-        open_list.append(start_node)
+        Con pocos ms por nodo se pintan varias celdas en cada tick de
+        REPLAY_TICK_MS en vez de programar un after() por celda; el ritmo
+        sigue siendo el de la escala.
+        """
+        delay = self.speed_scale.get()
+        if not delay:
+            return None, 0
+        batch = max(1, REPLAY_TICK_MS // delay)
+        return batch, batch * delay
+    
+    def replay_trace(self, result, steps):
+        """Pinta la traza de expansiones y luego el camino, una tanda por tick"""
+        batch, interval = self.replay_batch()
         
-        # Movimientos posibles (arriba, abajo, izquierda, derecha, diagonales)
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1), 
-                 (-1, -1), (-1, 1), (1, -1), (1, 1)]
+        painted = 0
+        for pos in steps:
+            if pos != self.start_pos and pos != self.end_pos:
+                self.paint_cell(pos[0], pos[1], "yellow")
+            painted += 1
+            if painted == batch:
+                self.replay_job = self.root.after(interval, self.replay_trace, result, steps)
+                return
         
-        found = False
+        # Traza terminada: mostrar el camino (excluyendo inicio y fin)
+        self.replay_job = None
+        self.replay_path(result, iter(result.path[1:-1]))
+    
+    def replay_path(self, result, steps):
+        batch, interval = self.replay_batch()
         
-        while open_list:
-            # Obtener el nodo con menor costo f
-            current_node = min(open_list, key=lambda x: x.f)
-            open_list.remove(current_node)
-            closed_list.add(current_node)
-            
-            # Dibujar el nodo actual (solo para visualización)
-            i, j = current_node.position
-            if current_node.position != self.start_pos and current_node.position != self.end_pos:
-                self.cells[i][j].config(bg="yellow")
-            self.root.update()
-            time.sleep(0.1)  # Pequeña pausa para visualización
-            
-            # Si llegamos al destino
-            if current_node.position == end_node.position:
-                found = True
-                break
-            
-            # Generar hijos
-            children = []
-            for move in moves:
-                node_position = (current_node.position[0] + move[0], 
-                                current_node.position[1] + move[1])
-                
-                # Verificar si está dentro del laberinto
-                if (node_position[0] >= self.maze_size or node_position[0] < 0 or 
-                    node_position[1] >= self.maze_size or node_position[1] < 0):
-                    continue
-                
-                # Verificar si es un obstáculo
-                if self.maze[node_position[0]][node_position[1]] == 1:
-                    continue
-                
-                # Crear nuevo nodo
-                new_node = Node(current_node, node_position)
-                children.append(new_node)
-            
-            # Procesar hijos
-            for child in children:
-                # Si el hijo ya está en la lista cerrada
-                if child in closed_list:
-                    continue
-                
-                # Calcular g, h y f
-                # Costo 1 para movimientos ortogonales, sqrt(2) para diagonales
-                move_cost = 1.0 if abs(child.position[0] - current_node.position[0]) + \
-                            abs(child.position[1] - current_node.position[1]) == 1 else math.sqrt(2)
-                
-                child.g = current_node.g + move_cost
-                child.h = math.sqrt((child.position[0] - end_node.position[0])**2 + 
-                            (child.position[1] - end_node.position[1])**2)  # Distancia euclidiana
-                child.f = child.g + child.h
-                
-                # Si el hijo ya está en la lista abierta con un g menor
-                existing_node = next((n for n in open_list if n == child), None)
-                if existing_node and child.g >= existing_node.g:
-                    continue
-                
-                # Añadir el hijo a la lista abierta
-                open_list.append(child)
+        painted = 0
+        for i, j in steps:
+            self.paint_cell(i, j, "blue")
+            painted += 1
+            if painted == batch:
+                self.replay_job = self.root.after(interval, self.replay_path, result, steps)
+                return
         
-        if found:
-            # Reconstruir el camino
-            path = []
-            current = current_node
-            while current is not None:
-                path.append(current.position)
-                current = current.parent
-            
-            # Mostrar el camino
-            for pos in path[1:-1]:  # Excluir inicio y fin
-                i, j = pos
-                self.cells[i][j].config(bg="blue")
-                self.root.update()
-                time.sleep(0.1)
-            
-            messagebox.showinfo("Éxito", "¡Camino encontrado!")
+        self.replay_job = None
+        self.setup_phase = "ready"
+        stats = f"{result.expanded} nodos expandidos"
+        if result.baseline_expanded is not None:
+            stats += f", {result.baseline_expanded - result.expanded} menos que A*"
+        if result.found:
+            messagebox.showinfo("Éxito", f"¡Camino encontrado! ({stats})")
         else:
-            messagebox.showinfo("Error", "No se encontró un camino!")
+            messagebox.showinfo("Error", f"No se encontró un camino! ({stats})")
+    
+    def cancel_replay(self):
+        if self.replay_job is not None:
+            self.root.after_cancel(self.replay_job)
+            self.replay_job = None
     
     def run(self):
         self.root.mainloop()
@@ -1,16 +1,25 @@
-import numpy as np
-import heapq
-import random
 import tkinter as tk
-from collections import deque
 from tkinter import messagebox, simpledialog
 import time
+from collections import OrderedDict
+
+from instrumentacion import registro
+from horda import DESTINOS, Horda
+from nucleo_laberinto import ANCHO, ALTO, MAX_BLOQUES, GENERADORES, Laberinto
+from planificacion import MedidorLatencia, PlanificadorAsincrono, RelojPasoFijo, ReservaNiveles
+from vista import Vista
 
 # Configuración inicial
-ANCHO = 15
-ALTO = 10
-MAX_BLOQUES = ANCHO * ALTO // 2  # Máximo razonable de bloques
 VELOCIDAD_IA = 0.5
+TAM_CELDA = 40  # Píxeles por celda al empezar (ver vista.ZOOMS)
+TAM_MAXIMO_MAPA = 5000  # Filas o columnas como mucho
+TESELAS_EN_CACHE = 96  # Imágenes de paredes que se conservan (cada una de unos 256x256 px)
+FPS = 60  # Máximo de redibujos por segundo
+PASO_SIMULACION = 0.05  # Segundos por paso de la lógica del juego
+PASOS_IA = round(VELOCIDAD_IA / PASO_SIMULACION)  # Pasos entre movimientos de la IA
+PERIODO_BUCLE_MS = 10  # Cada cuánto se recogen planes y se avanza la simulación
+NIVELES_EN_RESERVA = 3  # Laberintos que se generan por adelantado
+ARCHIVO_MEDICION = "medicion.jsonl"  # Log de la medición activada desde la interfaz
 
 COLORES = {
     'jugador': '#2ecc71',   # Verde
@@ -24,135 +33,6 @@ COLORES = {
     'fondo': '#ffffff'      # Blanco
 }
 
-class Laberinto:
-    def __init__(self, num_bloques=0):
-        self.num_bloques = num_bloques
-        self.grid = np.zeros((ALTO, ANCHO), dtype=int)
-        self.reset_posiciones()
-        self.generar_laberinto_valido()
-    
-    def generar_posicion_aleatoria_valida(self, excluir=[]):
-        """Genera una posición aleatoria que no sea pared y sea accesible"""
-        while True:
-            pos = (random.randint(0, ALTO-1), random.randint(0, ANCHO-1))
-            if pos not in excluir and self.grid[pos] == 0:
-                return pos
-    
-    def reset_posiciones(self):
-        """Reinicia las posiciones sin cambiar el laberinto"""
-        self.jugador = (0, 0)
-        self.ia = (ALTO-1, 0)
-        # El objetivo ahora se coloca aleatoriamente en cada nueva partida
-        self.objetivo = self.generar_posicion_aleatoria_valida(excluir=[self.jugador, self.ia])
-        self.ruta_ia = []
-        self.ruta_jugador = []
-    
-    def hay_camino(self, inicio, fin):
-        """BFS para verificar conectividad"""
-        visitados = set()
-        cola = deque([inicio])
-        visitados.add(inicio)
-        
-        while cola:
-            x, y = cola.popleft()
-            
-            if (x, y) == fin:
-                return True
-            
-            for dx, dy in [(0,1), (1,0), (0,-1), (-1,0)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < ALTO and 0 <= ny < ANCHO and 
-                    self.grid[nx][ny] == 0 and (nx, ny) not in visitados):
-                    visitados.add((nx, ny))
-                    cola.append((nx, ny))
-        
-        return False
-    
-    def generar_laberinto_valido(self):
-        """Genera un laberinto con exactamente num_bloques paredes y objetivo accesible"""
-        intentos = 0
-        while intentos < 100:  # Límite de intentos para evitar bucles infinitos
-            self.grid = np.zeros((ALTO, ANCHO), dtype=int)
-            
-            # Generar bloques exactos
-            posiciones_disponibles = [
-                (i, j) for i in range(ALTO) for j in range(ANCHO)
-                if (i, j) not in [self.jugador, self.ia]
-            ]
-            
-            # Seleccionar posiciones aleatorias para los bloques
-            bloques_colocados = 0
-            random.shuffle(posiciones_disponibles)
-            
-            for i, j in posiciones_disponibles:
-                if bloques_colocados < self.num_bloques:
-                    self.grid[i][j] = 1
-                    bloques_colocados += 1
-            
-            # Colocar objetivo en posición aleatoria accesible
-            self.objetivo = self.generar_posicion_aleatoria_valida(excluir=[self.jugador, self.ia])
-            
-            # Verificar caminos válidos
-            if (self.hay_camino(self.jugador, self.objetivo) and 
-                self.hay_camino(self.ia, self.objetivo)):
-                # Calcular rutas iniciales
-                self.ruta_ia = astar(self.grid, self.ia, self.objetivo)
-                self.ruta_jugador = astar(self.grid, self.jugador, self.objetivo)
-                return
-            
-            intentos += 1
-        
-        # Si no se encontró un laberinto válido después de muchos intentos
-        self.num_bloques = max(0, self.num_bloques - 1)
-        self.generar_laberinto_valido()
-
-class Nodo:
-    def __init__(self, posicion, padre=None):
-        self.posicion = posicion
-        self.padre = padre
-        self.g = 0  # Costo desde inicio
-        self.h = 0  # Heurística hasta objetivo
-        self.f = 0  # Costo total
-    
-    def __eq__(self, otro):
-        return self.posicion == otro.posicion
-    
-    def __lt__(self, otro):
-        return self.f < otro.f
-
-def astar(laberinto, inicio, objetivo):
-    """Algoritmo A* para encontrar el camino más corto"""
-    lista_abierta = []
-    lista_cerrada = set()
-    
-    heapq.heappush(lista_abierta, Nodo(inicio))
-    
-    while lista_abierta:
-        nodo_actual = heapq.heappop(lista_abierta)
-        lista_cerrada.add(nodo_actual.posicion)
-        
-        if nodo_actual.posicion == objetivo:
-            camino = []
-            while nodo_actual:
-                camino.append(nodo_actual.posicion)
-                nodo_actual = nodo_actual.padre
-            return camino[::-1]
-        
-        for dx, dy in [(0,1), (1,0), (0,-1), (-1,0)]:
-            nueva_pos = (nodo_actual.posicion[0] + dx, nodo_actual.posicion[1] + dy)
-            
-            if (0 <= nueva_pos[0] < ALTO and 0 <= nueva_pos[1] < ANCHO and 
-                laberinto[nueva_pos] == 0 and nueva_pos not in lista_cerrada):
-                
-                nuevo_nodo = Nodo(nueva_pos, nodo_actual)
-                nuevo_nodo.g = nodo_actual.g + 1
-                nuevo_nodo.h = abs(nueva_pos[0] - objetivo[0]) + abs(nueva_pos[1] - objetivo[1])
-                nuevo_nodo.f = nuevo_nodo.g + nuevo_nodo.h
-                
-                heapq.heappush(lista_abierta, nuevo_nodo)
-    
-    return []
-
 class JuegoLaberinto:
     def __init__(self, master):
         self.master = master
@@ -163,15 +43,61 @@ class JuegoLaberinto:
         self.victorias_jugador = 0
         self.victorias_ia = 0
         self.num_bloques_actual = 10  # Valor inicial de bloques
+        self.alto_mapa = ALTO
+        self.ancho_mapa = ANCHO
+        self.generador = 'aleatorio'  # Ver GENERADORES
+        self.num_horda = 0  # Perseguidores del modo horda (0 = una sola IA)
+        self.destino_horda = 'jugador'  # Ver DESTINOS
+        self.horda = None
+        self.campo_pedido = None  # (versión, destino) del último campo pedido al planificador
+        self.ovalos_horda = []  # Óvalos reutilizados para dibujar la horda
+        self.ovalos_visibles = 0  # Los primeros ovalos_visibles de ovalos_horda están a la vista
         self.juego_activo = False  # Estado de espera para comenzar
         
+        # Redibujo diferido: como mucho un frame cada 1/FPS segundos
+        self.pendiente_dibujo = False
+        self.frame_programado = None
+        self.ultimo_frame = 0.0
+        self.pedidos_dibujo = 0  # Llamadas a dibujar_laberinto agrupadas en el frame
+        
+        # Rutas calculadas en otro hilo; la lógica avanza a paso fijo
+        self.planificador = PlanificadorAsincrono()
+        self.reloj = RelojPasoFijo(PASO_SIMULACION)
+        self.pasos_ia = 0
+        self.version_ruta_ia = 0  # Versión de paredes con la que se calculó ruta_ia
+        self.partida_terminada = False
+        
+        # Los próximos laberintos de la configuración actual se generan en otro hilo
+        self.reserva = ReservaNiveles(
+            lambda configuracion: Laberinto(*configuracion[:2], alto=configuracion[2],
+                                            ancho=configuracion[3]),
+            NIVELES_EN_RESERVA)
+        self.nivel_pedido = None  # Future del laberinto que se está generando, si hay
+        self.inicio_pedido = 0.0
+        self.aciertos_pedido = 0
+        self.tiempo_nivel = MedidorLatencia()
+        
+        # Mediciones que se muestran bajo el tablero
+        self.latencia_entrada = MedidorLatencia()
+        self.retraso_bucle = MedidorLatencia()
+        self.tiempo_plan = MedidorLatencia()
+        self.entrada_pendiente = None
+        self.ultimo_informe = 0.0
+        
+        # Solo se dibuja lo que cae en la vista: las paredes, como imágenes por
+        # teselas que se reutilizan al desplazarse
+        self.vista = Vista(ALTO, ANCHO, ANCHO*TAM_CELDA, ALTO*TAM_CELDA, TAM_CELDA)
+        self.teselas = OrderedDict()  # (tam, ti, tj) -> PhotoImage, de menos a más reciente
+        self.items_tesela = {}        # (tam, ti, tj) -> imagen del canvas que la muestra
+        self.items_libres = []        # Imágenes del canvas ocultas, para reutilizar
+        
         # Interfaz
         self.crear_interfaz()
         
-        # Iniciar juego
-        self.nuevo_juego()
-        self.ultimo_movimiento_ia = time.time()
-        self.actualizar_ia()
+        # Iniciar juego: el primer laberinto se espera aquí, la ventana aún no se ve
+        self.nuevo_juego(esperar=True)
+        self.proximo_bucle = time.perf_counter()
+        self.bucle_juego()
     
     def crear_interfaz(self):
         """Crea la interfaz gráfica"""
@@ -200,38 +126,120 @@ class JuegoLaberinto:
         )
         self.btn_config.pack(side=tk.RIGHT, padx=10)
         
-        # Canvas para el laberinto
+        # Tamaño del mapa (la vista se desplaza si no cabe)
+        self.btn_tamano = tk.Button(
+            self.frame_superior,
+            text="Tamaño",
+            command=self.configurar_tamano,
+            bg=COLORES['camino'],
+            fg=COLORES['texto'],
+            relief=tk.RAISED
+        )
+        self.btn_tamano.pack(side=tk.RIGHT, padx=5)
+        
+        # Selector de generador
+        self.var_generador = tk.StringVar(value=self.generador)
+        self.menu_generador = tk.OptionMenu(
+            self.frame_superior,
+            self.var_generador,
+            *GENERADORES,
+            command=self.cambiar_generador
+        )
+        self.menu_generador.configure(bg=COLORES['camino'], fg=COLORES['texto'])
+        self.menu_generador.pack(side=tk.RIGHT)
+        
+        # Modo horda: cantidad de perseguidores y a qué persiguen
+        self.btn_horda = tk.Button(
+            self.frame_superior,
+            text="Horda",
+            command=self.configurar_horda,
+            bg=COLORES['camino'],
+            fg=COLORES['texto'],
+            relief=tk.RAISED
+        )
+        self.btn_horda.pack(side=tk.RIGHT, padx=5)
+        self.var_destino_horda = tk.StringVar(value=self.destino_horda)
+        self.menu_destino_horda = tk.OptionMenu(
+            self.frame_superior,
+            self.var_destino_horda,
+            *DESTINOS,
+            command=self.cambiar_destino_horda
+        )
+        self.menu_destino_horda.configure(bg=COLORES['camino'], fg=COLORES['texto'])
+        self.menu_destino_horda.pack(side=tk.RIGHT)
+        
+        # Modo de paredes dinámicas: clic en el tablero pone o quita paredes
+        self.paredes_dinamicas = tk.BooleanVar(value=False)
+        self.chk_paredes = tk.Checkbutton(
+            self.frame_superior,
+            text="Paredes dinámicas",
+            variable=self.paredes_dinamicas,
+            bg=COLORES['fondo'],
+            fg=COLORES['texto']
+        )
+        self.chk_paredes.pack(side=tk.RIGHT)
+        
+        # Medición de búsquedas, generación y frames (overlay + log JSON-lines)
+        self.medicion = tk.BooleanVar(value=registro.activo)
+        self.chk_medicion = tk.Checkbutton(
+            self.frame_superior,
+            text="Medición",
+            variable=self.medicion,
+            command=self.alternar_medicion,
+            bg=COLORES['fondo'],
+            fg=COLORES['texto']
+        )
+        self.chk_medicion.pack(side=tk.RIGHT)
+        
+        # Canvas para el laberinto: es la vista, y crece con la ventana
         self.canvas = tk.Canvas(
             self.master, 
-            width=ANCHO*40, 
-            height=ALTO*40, 
+            width=self.vista.ancho_px, 
+            height=self.vista.alto_px, 
             bg=COLORES['camino'], 
             highlightthickness=0
         )
-        self.canvas.pack()
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Button-1>", self.clic_tablero)
+        self.canvas.bind("<Configure>", self.redimensionar_vista)
+        self.canvas.bind("<MouseWheel>", self.rueda_zoom)
+        self.canvas.bind("<Button-4>", self.rueda_zoom)
+        self.canvas.bind("<Button-5>", self.rueda_zoom)
+        self.crear_capa_dinamica()
         
         # Controles
         self.lbl_controles = tk.Label(
             self.master, 
-            text="Controles: WASD (movimiento) | Q (salir) | Presiona Enter para comenzar",
+            text="Controles: WASD (movimiento) | +/- (zoom) | Q (salir) | Presiona Enter para comenzar",
             font=('Helvetica', 10), 
             fg=COLORES['texto'],
             bg=COLORES['fondo']
         )
         self.lbl_controles.pack(pady=5)
         
+        # Latencias medidas
+        self.lbl_rendimiento = tk.Label(
+            self.master,
+            text="",
+            font=('Helvetica', 9),
+            fg=COLORES['texto'],
+            bg=COLORES['fondo']
+        )
+        self.lbl_rendimiento.pack()
+        
         # Bind de teclado
         self.master.bind("<Key>", self.manejar_teclado)
     
     def configurar_bloques(self):
         """Permite configurar el número exacto de bloques"""
         try:
+            maximo = self.max_bloques()
             nuevo_num = simpledialog.askinteger(
                 "Configurar Bloques",
-                f"Ingrese número de bloques (0-{MAX_BLOQUES}):",
+                f"Ingrese número de bloques (0-{maximo}):",
                 parent=self.master,
                 minvalue=0,
-                maxvalue=MAX_BLOQUES,
+                maxvalue=maximo,
                 initialvalue=self.num_bloques_actual
             )
             
@@ -241,82 +249,371 @@ class JuegoLaberinto:
                 self.nuevo_juego()
                 self.mostrar_mensaje_inicio()
         except:
-            messagebox.showerror("Error", f"Por favor ingrese un número entre 0 y {MAX_BLOQUES}")
+            messagebox.showerror("Error", f"Por favor ingrese un número entre 0 y {self.max_bloques()}")
+    
+    def max_bloques(self):
+        """Como MAX_BLOQUES, pero para el tamaño de mapa actual"""
+        return MAX_BLOQUES * self.alto_mapa * self.ancho_mapa // (ALTO * ANCHO)
+    
+    def configurar_tamano(self):
+        """Pide el tamaño del mapa como 'filas x columnas'"""
+        texto = simpledialog.askstring(
+            "Tamaño del mapa",
+            f"Filas x columnas (2-{TAM_MAXIMO_MAPA}), por ejemplo 2000x2000:",
+            parent=self.master,
+            initialvalue=f"{self.alto_mapa}x{self.ancho_mapa}"
+        )
+        if texto is None:
+            return
+        try:
+            alto, ancho = (int(parte) for parte in texto.lower().split('x'))
+        except ValueError:
+            alto = ancho = 0
+        if not (2 <= alto <= TAM_MAXIMO_MAPA and 2 <= ancho <= TAM_MAXIMO_MAPA):
+            messagebox.showerror("Error", f"Use dos números entre 2 y {TAM_MAXIMO_MAPA}, como 200x300")
+            return
+        self.alto_mapa, self.ancho_mapa = alto, ancho
+        self.num_bloques_actual = min(self.num_bloques_actual, self.max_bloques())
+        self.actualizar_marcador()
+        # Un mapa grande tarda segundos: se genera en la reserva y hasta que
+        # llega se sigue viendo el anterior
+        self.nuevo_juego()
+        self.mostrar_mensaje_inicio()
+    
+    def configurar_horda(self):
+        """Pide cuántos perseguidores usar (0 vuelve a una sola IA)"""
+        maximo = self.alto_mapa * self.ancho_mapa - self.max_bloques() - 2
+        nuevo_num = simpledialog.askinteger(
+            "Modo horda",
+            f"Número de perseguidores (0-{maximo}, 0 = una sola IA):",
+            parent=self.master,
+            minvalue=0,
+            maxvalue=maximo,
+            initialvalue=self.num_horda
+        )
+        if nuevo_num is not None:
+            self.num_horda = nuevo_num
+            self.nuevo_juego()
+            self.mostrar_mensaje_inicio()
+    
+    def cambiar_destino_horda(self, destino):
+        """Cambia lo que persigue la horda y empieza una partida nueva"""
+        self.destino_horda = destino
+        self.nuevo_juego()
+        self.mostrar_mensaje_inicio()
+    
+    def cambiar_generador(self, generador):
+        """Cambia el algoritmo de generación y empieza una partida nueva"""
+        self.generador = generador
+        self.nuevo_juego()
+        self.mostrar_mensaje_inicio()
     
     def mostrar_mensaje_inicio(self):
         """Muestra mensaje de inicio"""
         self.juego_activo = False
+        if self.nivel_pedido is not None:
+            return  # Se muestra cuando llegue el laberinto
         self.canvas.create_text(
-            ANCHO*20, ALTO*20,
+            *self.centro_vista(),
             text="Presiona Enter para comenzar",
             font=('Helvetica', 16, 'bold'),
             fill=COLORES['texto'],
             tags="mensaje"
         )
     
-    def nuevo_juego(self):
-        """Inicia un nuevo juego con la configuración actual"""
-        self.laberinto = Laberinto(self.num_bloques_actual)
+    def nuevo_juego(self, esperar=False):
+        """Pide un laberinto con la configuración actual; indica si la partida ya empezó.
+        
+        Normalmente ya está generado y validado en la reserva. Si la
+        configuración acaba de cambiar se genera en el hilo de la reserva: se
+        sigue viendo el nivel anterior con un aviso y bucle_juego lo recoge al
+        terminar (esperar=True lo espera aquí y deja pasar sus errores).
+        """
+        if self.nivel_pedido is not None:
+            self.nivel_pedido.cancel()
+        self.inicio_pedido = time.perf_counter()
+        self.aciertos_pedido = self.reserva.aciertos
+        self.nivel_pedido = self.reserva.tomar((self.num_bloques_actual, self.generador,
+                                                self.alto_mapa, self.ancho_mapa))
+        if esperar or self.nivel_pedido.done():
+            self.recoger_nivel()
+            return True
+        
+        self.juego_activo = False
+        self.canvas.delete("mensaje")
+        self.canvas.create_text(
+            *self.centro_vista(),
+            text="Generando laberinto…",
+            font=('Helvetica', 16, 'bold'),
+            fill=COLORES['texto'],
+            tags="mensaje"
+        )
+        return False
+    
+    def esperar_nivel(self):
+        """Desde bucle_juego: empieza la partida en cuanto llega el laberinto pedido"""
+        if self.nivel_pedido is None or not self.nivel_pedido.done():
+            return
+        try:
+            self.recoger_nivel()
+        except Exception as e:
+            # Se sigue con el nivel anterior; el próximo pedido lo reintenta
+            self.canvas.delete("mensaje")
+            messagebox.showerror("Error", f"No se pudo generar el laberinto: {e}")
+        self.mostrar_mensaje_inicio()
+    
+    def recoger_nivel(self):
+        """Empieza la partida con el laberinto pedido (espera si aún se genera)"""
+        pedido, self.nivel_pedido = self.nivel_pedido, None
+        self.laberinto = pedido.result()
+        self.tiempo_nivel.registrar(time.perf_counter() - self.inicio_pedido)
+        if registro.activo:
+            registro.anotar('nivel', segundos=time.perf_counter() - self.inicio_pedido,
+                            de_reserva=self.reserva.aciertos > self.aciertos_pedido,
+                            **self.reserva.estadisticas())
+        # Las rutas iniciales ya vienen calculadas; las siguientes las da el hilo
+        self.planificador.reiniciar(self.laberinto.grid, self.laberinto.objetivo)
+        self.version_ruta_ia = 0
+        self.pasos_ia = 0
+        self.partida_terminada = False
+        # En modo horda la IA es el agente 0 y todos siguen el mismo campo de distancias
+        self.horda = None
+        self.campo_pedido = None
+        if self.num_horda:
+            self.horda = Horda(self.laberinto, self.num_horda, self.destino_horda)
+            self.laberinto.ruta_ia = []
+        self.canvas.delete("mensaje")
+        self.construir_capa_estatica()
+        self.dibujar_laberinto()
+    
+    def crear_capa_dinamica(self):
+        """Crea una sola vez las rutas, el objetivo y los agentes; luego solo se mueven"""
+        self.linea_jugador = self.canvas.create_line(
+            0, 0, 0, 0, fill=COLORES['ruta_jugador'], width=3, smooth=True, state=tk.HIDDEN
+        )
+        self.linea_ia = self.canvas.create_line(
+            0, 0, 0, 0, fill=COLORES['ruta_ia'], width=3, smooth=True, state=tk.HIDDEN
+        )
+        self.ovalo_objetivo = self.canvas.create_oval(
+            0, 0, 0, 0, fill=COLORES['objetivo'], outline=COLORES['objetivo']
+        )
+        self.ovalo_jugador = self.canvas.create_oval(
+            0, 0, 0, 0, fill=COLORES['jugador'], outline=COLORES['jugador']
+        )
+        self.ovalo_ia = self.canvas.create_oval(
+            0, 0, 0, 0, fill=COLORES['ia'], outline=COLORES['ia']
+        )
+        self.texto_medicion = self.canvas.create_text(
+            4, 4, text="", anchor=tk.NW, font=('Courier', 8),
+            fill=COLORES['texto'], tags="medicion",
+            state=tk.NORMAL if registro.activo else tk.HIDDEN
+        )
+    
+    def construir_capa_estatica(self):
+        """Prepara las paredes de un laberinto nuevo: se pintan por teselas al verse"""
+        self.teselas.clear()
+        for item in self.items_tesela.values():
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+            self.items_libres.append(item)
+        self.items_tesela.clear()
+        self.vista.cambiar_mapa(self.laberinto.alto, self.laberinto.ancho)
+        self.actualizar_vista(forzar=True)
+    
+    def actualizar_vista(self, forzar=False):
+        """Sigue al jugador; si la cámara se movió, desplaza el canvas y repone las teselas"""
+        if not self.vista.seguir(self.laberinto.jugador) and not forzar:
+            return
+        vista = self.vista
+        ancho_px = max(self.laberinto.ancho * vista.tam, vista.ancho_px)
+        alto_px = max(self.laberinto.alto * vista.tam, vista.alto_px)
+        # Los objetos están en coordenadas del mapa completo: desplazarse es mover la vista
+        self.canvas.configure(scrollregion=(0, 0, ancho_px, alto_px))
+        self.canvas.xview_moveto(vista.x / ancho_px)
+        self.canvas.yview_moveto(vista.y / alto_px)
+        self.canvas.coords(self.texto_medicion, vista.x + 4, vista.y + 4)
+        self.canvas.coords("mensaje", *self.centro_vista())
+        self.actualizar_teselas()
+    
+    def centro_vista(self):
+        return (self.vista.x + self.vista.ancho_px / 2, self.vista.y + self.vista.alto_px / 2)
+    
+    def actualizar_teselas(self):
+        """Muestra las teselas visibles reutilizando imágenes del canvas y de la caché"""
+        tam = self.vista.tam
+        visibles = {(tam,) + clave for clave in self.vista.teselas_visibles()}
+        for clave in [clave for clave in self.items_tesela if clave not in visibles]:
+            item = self.items_tesela.pop(clave)
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+            self.items_libres.append(item)
+        
+        for clave in visibles - self.items_tesela.keys():
+            imagen = self.imagen_tesela(clave)
+            x, y = clave[2] * self.vista.celdas_tesela * tam, clave[1] * self.vista.celdas_tesela * tam
+            if self.items_libres:
+                item = self.items_libres.pop()
+                self.canvas.coords(item, x, y)
+                self.canvas.itemconfig(item, image=imagen, state=tk.NORMAL)
+            else:
+                item = self.canvas.create_image(x, y, image=imagen, anchor=tk.NW, tags="pared")
+            self.items_tesela[clave] = item
+        self.canvas.tag_lower("pared")
+    
+    def imagen_tesela(self, clave):
+        """PhotoImage con las paredes de la tesela (tam, ti, tj); se guarda en una caché LRU"""
+        imagen = self.teselas.get(clave)
+        if imagen is not None:
+            self.teselas.move_to_end(clave)
+            return imagen
+        
+        tam = clave[0]
+        i0, i1, j0, j1 = self.vista.celdas_de_tesela(clave[1:])
+        imagen = tk.PhotoImage(width=(j1 - j0) * tam, height=(i1 - i0) * tam)
+        # Cada fila de celdas es una fila de píxeles que put() repite tam veces hacia abajo
+        colores = (f"{COLORES['camino']} " * tam, f"{COLORES['pared']} " * tam)
+        for i in range(i0, i1):
+            fila = self.laberinto.grid[i, j0:j1].tolist()
+            pixeles = "{" + "".join(colores[celda != 0] for celda in fila) + "}"
+            imagen.put(pixeles, to=(0, (i - i0) * tam, (j1 - j0) * tam, (i - i0 + 1) * tam))
+        
+        self.teselas[clave] = imagen
+        while len(self.teselas) > TESELAS_EN_CACHE:
+            # Se descarta la menos reciente que no esté a la vista
+            viejas = [c for c in self.teselas if c not in self.items_tesela]
+            if not viejas:
+                break
+            del self.teselas[viejas[0]]
+        return imagen
+    
+    def redibujar_tesela(self, pos):
+        """Vuelve a pintar la tesela de pos tras cambiar una pared"""
+        clave = (self.vista.tam,) + self.vista.tesela_de(pos)
+        # Las de otros zooms también quedaron viejas: se pintarán de nuevo al usarse
+        for vieja in [c for c in self.teselas if c[0] != clave[0] or c == clave]:
+            del self.teselas[vieja]
+        item = self.items_tesela.get(clave)
+        if item is not None:
+            self.canvas.itemconfig(item, image=self.imagen_tesela(clave))
+    
+    def redimensionar_vista(self, event):
+        """La ventana cambió de tamaño: la vista ocupa todo el canvas"""
+        self.vista.redimensionar(event.width, event.height)
+        self.actualizar_vista(forzar=True)
         self.dibujar_laberinto()
     
-    def dibujar_laberinto(self):
-        """Dibuja el laberinto completo con rutas (ahora con líneas)"""
-        self.canvas.delete("all")
-        
-        # Dibujar paredes/bloques
-        for i in range(ALTO):
-            for j in range(ANCHO):
-                if self.laberinto.grid[i][j] == 1:
-                    self.canvas.create_rectangle(
-                        j*40, i*40, j*40+40, i*40+40,
-                        fill=COLORES['pared'], outline=COLORES['pared']
-                    )
-        
-        # Dibujar ruta del jugador (líneas verdes)
-        if len(self.laberinto.ruta_jugador) > 1:
-            puntos_jugador = [(y*40+20, x*40+20) for x, y in self.laberinto.ruta_jugador]
-            self.canvas.create_line(
-                puntos_jugador,
-                fill=COLORES['ruta_jugador'],
-                width=3,
-                smooth=True
-            )
+    def cambiar_zoom(self, pasos):
+        if self.vista.acercar(pasos):
+            self.actualizar_vista(forzar=True)
+            self.dibujar_laberinto()
+    
+    def rueda_zoom(self, event):
+        self.cambiar_zoom(1 if event.num == 4 or getattr(event, 'delta', 0) > 0 else -1)
+    
+    def clic_tablero(self, event):
+        """En modo paredes dinámicas, alterna la pared bajo el cursor y replanifica"""
+        if not self.paredes_dinamicas.get() or self.nivel_pedido is not None:
+            return
+        tam = self.vista.tam
+        pos = (int(self.canvas.canvasy(event.y)) // tam, int(self.canvas.canvasx(event.x)) // tam)
+        if not (0 <= pos[0] < self.laberinto.alto and 0 <= pos[1] < self.laberinto.ancho):
+            return
+        if self.horda is not None and self.horda.en(pos):
+            return
+        valor = self.laberinto.alternar_pared(pos)
+        if valor is None:
+            return
         
-        # Dibujar ruta de la IA (líneas moradas)
-        if len(self.laberinto.ruta_ia) > 1:
-            puntos_ia = [(y*40+20, x*40+20) for x, y in self.laberinto.ruta_ia]
-            self.canvas.create_line(
-                puntos_ia,
-                fill=COLORES['ruta_ia'],
-                width=3,
-                smooth=True
-            )
+        # Los planificadores (en su hilo) solo reparan lo que depende de esta celda;
+        # hasta que lleguen los planes nuevos la IA no avanza con el viejo
+        self.planificador.cambiar_celda(pos, valor)
+        if self.horda is None:
+            self.planificador.pedir_ruta('ia', self.laberinto.ia)
+        self.planificador.pedir_ruta('jugador', self.laberinto.jugador)
         
-        # Dibujar objetivo
-        obj_x, obj_y = self.laberinto.objetivo
-        self.canvas.create_oval(
-            obj_y*40+5, obj_x*40+5, obj_y*40+35, obj_x*40+35,
-            fill=COLORES['objetivo'], outline=COLORES['objetivo']
-        )
+        self.redibujar_tesela(pos)
+        self.dibujar_laberinto()
+    
+    def dibujar_laberinto(self):
+        """Marca el tablero como sucio; el redibujo real se hace a ritmo de FPS"""
+        self.pendiente_dibujo = True
+        self.pedidos_dibujo += 1
+        if self.frame_programado is None:
+            espera = self.ultimo_frame + 1.0 / FPS - time.time()
+            self.frame_programado = self.master.after(
+                max(0, int(espera * 1000)), self.renderizar_frame
+            )
+    
+    def renderizar_frame(self):
+        """Mueve la vista con el jugador y actualiza en su sitio rutas y posiciones con coords()"""
+        if self.frame_programado is not None:
+            self.master.after_cancel(self.frame_programado)
+            self.frame_programado = None
+        if not self.pendiente_dibujo:
+            return
+        self.pendiente_dibujo = False
+        self.ultimo_frame = time.time()
+        t0 = time.perf_counter() if registro.activo else 0.0
+        if self.entrada_pendiente is not None:
+            self.latencia_entrada.registrar(time.perf_counter() - self.entrada_pendiente)
+            self.entrada_pendiente = None
         
-        # Dibujar jugador
-        j_x, j_y = self.laberinto.jugador
-        self.canvas.create_oval(
-            j_y*40+5, j_x*40+5, j_y*40+35, j_x*40+35,
-            fill=COLORES['jugador'], outline=COLORES['jugador']
-        )
+        self.actualizar_vista()
+        self.actualizar_linea(self.linea_jugador, self.laberinto.ruta_jugador)
+        self.actualizar_linea(self.linea_ia, self.laberinto.ruta_ia)
+        self.canvas.coords(self.ovalo_objetivo, *self.coords_ovalo(self.laberinto.objetivo))
+        self.canvas.coords(self.ovalo_jugador, *self.coords_ovalo(self.laberinto.jugador))
+        self.canvas.coords(self.ovalo_ia, *self.coords_ovalo(self.laberinto.ia))
+        self.dibujar_horda()
         
-        # Dibujar IA
-        ia_x, ia_y = self.laberinto.ia
-        self.canvas.create_oval(
-            ia_y*40+5, ia_x*40+5, ia_y*40+35, ia_x*40+35,
-            fill=COLORES['ia'], outline=COLORES['ia']
-        )
+        if registro.activo:
+            registro.anotar('frame', segundos=time.perf_counter() - t0, pedidos=self.pedidos_dibujo)
+        self.pedidos_dibujo = 0
+    
+    def dibujar_horda(self):
+        """Mueve un óvalo pequeño por agente visible (además del 0, que es ovalo_ia); los que sobran se ocultan"""
+        celdas = self.horda.celdas()[1:] if self.horda is not None else []
+        i0, i1, j0, j1 = self.vista.rango_celdas(1)
+        celdas = [pos for pos in celdas if i0 <= pos[0] < i1 and j0 <= pos[1] < j1]
+        while len(self.ovalos_horda) < len(celdas):
+            self.ovalos_horda.append(self.canvas.create_oval(
+                0, 0, 0, 0, fill=COLORES['ia'], outline=COLORES['ruta_ia'], tags="horda"
+            ))
+        for ovalo, pos in zip(self.ovalos_horda, celdas):
+            self.canvas.coords(ovalo, *self.coords_ovalo(pos, self.vista.tam // 4))
+        # Solo se muestran u ocultan los óvalos que cambian respecto al frame anterior
+        for ovalo in self.ovalos_horda[self.ovalos_visibles:len(celdas)]:
+            self.canvas.itemconfig(ovalo, state=tk.NORMAL)
+        for ovalo in self.ovalos_horda[len(celdas):self.ovalos_visibles]:
+            self.canvas.itemconfig(ovalo, state=tk.HIDDEN)
+        self.ovalos_visibles = len(celdas)
+    
+    def actualizar_linea(self, linea, ruta):
+        ruta = self.vista.tramo_visible(ruta)
+        if len(ruta) > 1:
+            tam = self.vista.tam
+            centro = tam // 2
+            puntos = [c for x, y in ruta for c in (y*tam+centro, x*tam+centro)]
+            self.canvas.coords(linea, *puntos)
+            self.canvas.itemconfig(linea, state=tk.NORMAL)
+        else:
+            self.canvas.itemconfig(linea, state=tk.HIDDEN)
+    
+    def coords_ovalo(self, pos, margen=None):
+        tam = self.vista.tam
+        margen = tam // 8 if margen is None else margen
+        x, y = pos
+        return (y*tam+margen, x*tam+margen, (y+1)*tam-margen, (x+1)*tam-margen)
     
     def manejar_teclado(self, event):
         """Gestiona las entradas de teclado"""
+        if self.entrada_pendiente is None:
+            self.entrada_pendiente = time.perf_counter()
+        if event.keysym in ('plus', 'KP_Add', 'minus', 'KP_Subtract'):
+            self.cambiar_zoom(1 if event.keysym in ('plus', 'KP_Add') else -1)
+            return
         if not self.juego_activo:
-            if event.keysym == 'Return':
+            if event.keysym == 'Return' and self.nivel_pedido is None:
+                if self.partida_terminada and not self.nuevo_juego():
+                    return
                 self.juego_activo = True
                 self.canvas.delete("mensaje")
             return
@@ -333,68 +630,155 @@ class JuegoLaberinto:
         if not self.juego_activo:
             return
             
-        dx, dy = 0, 0
+        nueva_pos = self.laberinto.mover(self.laberinto.jugador, direccion)
         
-        if direccion == 'w' and self.laberinto.jugador[0] > 0:
-            dx = -1
-        elif direccion == 's' and self.laberinto.jugador[0] < ALTO-1:
-            dx = 1
-        elif direccion == 'a' and self.laberinto.jugador[1] > 0:
-            dy = -1
-        elif direccion == 'd' and self.laberinto.jugador[1] < ANCHO-1:
-            dy = 1
-        
-        nueva_pos = (self.laberinto.jugador[0]+dx, self.laberinto.jugador[1]+dy)
-        
-        if (0 <= nueva_pos[0] < ALTO and 0 <= nueva_pos[1] < ANCHO and 
-            self.laberinto.grid[nueva_pos] == 0):
+        if nueva_pos != self.laberinto.jugador:
             self.laberinto.jugador = nueva_pos
-            # Recalcular ruta del jugador
-            self.laberinto.ruta_jugador = astar(self.laberinto.grid, self.laberinto.jugador, self.laberinto.objetivo)
+            # Mientras llega la ruta nueva se recorta la anterior si sigue sirviendo
+            ruta = self.laberinto.ruta_jugador
+            self.laberinto.ruta_jugador = ruta[1:] if len(ruta) > 1 and ruta[1] == nueva_pos else []
+            self.planificador.pedir_ruta('jugador', nueva_pos)
             self.dibujar_laberinto()
             self.verificar_fin_juego()
     
+    def bucle_juego(self):
+        """Recoge los planes terminados, avanza la simulación a paso fijo y se reprograma"""
+        ahora = time.perf_counter()
+        # Retraso respecto a lo programado: cota de lo que espera una tecla pulsada
+        self.retraso_bucle.registrar(max(0.0, ahora - self.proximo_bucle))
+        
+        self.esperar_nivel()
+        self.aplicar_planes()
+        for _ in range(self.reloj.pasos(ahora)):
+            self.actualizar_ia()
+        if ahora - self.ultimo_informe > 0.5:
+            self.actualizar_rendimiento()
+            self.ultimo_informe = ahora
+        
+        self.proximo_bucle = time.perf_counter() + PERIODO_BUCLE_MS / 1000
+        self.master.after(PERIODO_BUCLE_MS, self.bucle_juego)
+    
+    def aplicar_planes(self):
+        """Usa los planes que siguen valiendo para la posición y las paredes actuales"""
+        for plan in self.planificador.planes_listos():
+            self.tiempo_plan.registrar(plan.segundos)
+            if not self.planificador.vigente(plan):
+                continue
+            if plan.agente == 'horda':
+                if self.horda is not None:
+                    self.horda.usar_campo(plan.inicio, plan.ruta)
+                continue
+            if plan.agente == 'ia' and plan.inicio == self.laberinto.ia and self.horda is None:
+                self.laberinto.ruta_ia = plan.ruta
+                self.version_ruta_ia = plan.version
+            elif plan.agente == 'jugador' and plan.inicio == self.laberinto.jugador:
+                self.laberinto.ruta_jugador = plan.ruta
+            else:
+                continue
+            self.dibujar_laberinto()
+    
     def actualizar_ia(self):
-        """Actualiza el movimiento de la IA"""
-        if self.juego_activo and time.time() - self.ultimo_movimiento_ia > VELOCIDAD_IA:
-            # Recalcular ruta completa de la IA
-            self.laberinto.ruta_ia = astar(self.laberinto.grid, self.laberinto.ia, self.laberinto.objetivo)
-            
-            if len(self.laberinto.ruta_ia) > 1:
-                self.laberinto.ia = self.laberinto.ruta_ia[1]
-                self.dibujar_laberinto()
-                self.verificar_fin_juego()
-            
-            self.ultimo_movimiento_ia = time.time()
+        """Un paso de simulación: la IA avanza por su plan cada PASOS_IA pasos"""
+        if not self.juego_activo:
+            return
+        self.pasos_ia += 1
+        if self.pasos_ia < PASOS_IA:
+            return
+        
+        if self.horda is not None:
+            # El campo se calcula en el hilo del planificador. Mientras llega el
+            # nuevo se sigue el del destino anterior, pero nunca uno de otras paredes
+            if not self.horda.campo_al_dia():
+                clave = (self.laberinto.version, self.horda.celda_destino())
+                if clave != self.campo_pedido:
+                    self.planificador.pedir_campo(clave[1])
+                    self.campo_pedido = clave
+                if not self.horda.campo_de_estas_paredes():
+                    return
+            self.pasos_ia = 0
+            self.horda.paso(self.horda.campo)
+            self.laberinto.ia = self.horda.celda(0)
+            self.dibujar_laberinto()
+            self.verificar_fin_juego()
+            return
         
-        self.master.after(100, self.actualizar_ia)
+        # Si el plan no está al día con las paredes, la IA espera al siguiente paso
+        ruta = self.laberinto.ruta_ia
+        if (len(ruta) > 1 and ruta[0] == self.laberinto.ia and
+                self.version_ruta_ia == self.planificador.version):
+            self.pasos_ia = 0
+            self.laberinto.ia = ruta[1]
+            self.laberinto.ruta_ia = ruta[1:]
+            self.planificador.pedir_ruta('ia', self.laberinto.ia)
+            self.dibujar_laberinto()
+            self.verificar_fin_juego()
+    
+    def alternar_medicion(self):
+        """Activa o apaga la medición y su overlay sobre el tablero"""
+        if self.medicion.get():
+            registro.activar(ARCHIVO_MEDICION)
+            self.canvas.itemconfig(self.texto_medicion, state=tk.NORMAL)
+        else:
+            registro.desactivar()
+            self.canvas.itemconfig(self.texto_medicion, state=tk.HIDDEN, text="")
+    
+    def actualizar_rendimiento(self):
+        """Muestra las latencias medidas (percentil 95 y máximo reciente)"""
+        if registro.activo:
+            self.canvas.itemconfig(self.texto_medicion, text="\n".join(registro.resumen()))
+        reserva = self.reserva.estadisticas()
+        self.lbl_rendimiento.config(
+            text=f"Tecla→frame p95: {self.latencia_entrada.percentil(0.95) * 1e3:.1f} ms | "
+                 f"Retraso del bucle p95/máx: {self.retraso_bucle.percentil(0.95) * 1e3:.1f}/"
+                 f"{self.retraso_bucle.maximo() * 1e3:.1f} ms | "
+                 f"Plan p95: {self.tiempo_plan.percentil(0.95) * 1e3:.1f} ms\n"
+                 f"Nivel nuevo máx: {self.tiempo_nivel.maximo() * 1e3:.1f} ms | "
+                 f"Reserva: {reserva['tasa_aciertos']:.0%} aciertos, {reserva['en_reserva']} listos, "
+                 f"reposición p95 {reserva['reposicion_p95'] * 1e3:.1f} ms"
+        )
     
     def verificar_fin_juego(self):
         """Verifica si el juego ha terminado y reinicia automáticamente"""
         if not self.juego_activo:
             return
+        
+        ia_en_objetivo = self.ia_en(self.laberinto.objetivo)
+        atrapado = self.ia_en(self.laberinto.jugador)
+        if self.laberinto.jugador == self.laberinto.objetivo or ia_en_objetivo or atrapado:
+            # Mostrar la posición final antes del mensaje
+            self.renderizar_frame()
             
         if self.laberinto.jugador == self.laberinto.objetivo:
             self.victorias_jugador += 1
             self.actualizar_marcador()
-            self.juego_activo = False
-            messagebox.showinfo("¡Ganaste!", "¡Llegaste al objetivo primero! 😊")
-            self.nuevo_juego()  # Reiniciar automáticamente
-            self.mostrar_mensaje_inicio()
-        elif self.laberinto.ia == self.laberinto.objetivo:
+            self.mostrar_resultado("¡Llegaste al objetivo primero! 😊")
+        elif ia_en_objetivo:
             self.victorias_ia += 1
             self.actualizar_marcador()
-            self.juego_activo = False
-            messagebox.showinfo("Perdiste", "La IA llegó primero al objetivo 🤖")
-            self.nuevo_juego()  # Reiniciar automáticamente
-            self.mostrar_mensaje_inicio()
-        elif self.laberinto.jugador == self.laberinto.ia:
+            self.mostrar_resultado("La IA llegó primero al objetivo 🤖")
+        elif atrapado:
             self.victorias_ia += 1
             self.actualizar_marcador()
-            self.juego_activo = False
-            messagebox.showinfo("Perdiste", "¡La IA te atrapó! 💀")
-            self.nuevo_juego()  # Reiniciar automáticamente
-            self.mostrar_mensaje_inicio()
+            self.mostrar_resultado("¡La IA te atrapó! 💀")
+    
+    def ia_en(self, pos):
+        """Indica si la IA (o, en modo horda, algún perseguidor) está en pos"""
+        if self.horda is not None:
+            return self.horda.en(pos)
+        return self.laberinto.ia == pos
+    
+    def mostrar_resultado(self, texto):
+        """Muestra el resultado sobre el tablero final, sin diálogos modales que frenen el bucle"""
+        self.juego_activo = False
+        self.partida_terminada = True
+        self.canvas.create_text(
+            *self.centro_vista(),
+            text=f"{texto}\nPresiona Enter para jugar otra vez",
+            font=('Helvetica', 16, 'bold'),
+            fill=COLORES['texto'],
+            justify=tk.CENTER,
+            tags="mensaje"
+        )
     
     def actualizar_marcador(self):
         """Actualiza el marcador en la interfaz"""
@@ -405,7 +789,7 @@ class JuegoLaberinto:
 if __name__ == "__main__":
     root = tk.Tk()
     root.geometry("700x600")
-    root.resizable(False, False)
+    root.resizable(True, True)
     
     try:
         juego = JuegoLaberinto(root)
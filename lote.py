@@ -0,0 +1,98 @@
+"""Resolución de muchas consultas (inicio, objetivo) sobre una misma cuadrícula.
+
+La cuadrícula se aplana una sola vez con celdas_con_borde() y se publica en
+memoria compartida: los procesos trabajadores la leen sin que se copie en cada
+tarea. Las consultas sin camino posible se descartan antes de repartir el
+trabajo usando las etiquetas de componentes.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from nucleo_laberinto import GrafoCuadricula, astar_celdas, celdas_con_borde, etiquetar_componentes
+
+# Estado de cada proceso trabajador (se rellena en _iniciar_trabajador)
+_memoria = None
+_celdas = None
+_ancho = None
+_grafo = None
+
+
+def _iniciar_trabajador(nombre, n, ancho):
+    """Se conecta a la cuadrícula compartida y arma su grafo una vez por proceso"""
+    global _memoria, _celdas, _ancho, _grafo
+    _memoria = shared_memory.SharedMemory(name=nombre)
+    # El bloque puede venir redondeado a páginas: solo valen las n primeras celdas
+    _celdas = _memoria.buf[:n]
+    _ancho = ancho
+    _grafo = GrafoCuadricula(_celdas, ancho)
+
+
+def _resolver_bloque(bloque):
+    return [(indice, astar_celdas(_celdas, _ancho, inicio, objetivo, _grafo))
+            for indice, inicio, objetivo in bloque]
+
+
+def _alcanzables(etiquetas, consultas):
+    """Separa las consultas con solución posible de las que no la tienen"""
+    alto, ancho = etiquetas.shape
+    validas, imposibles = [], []
+    for indice, (inicio, objetivo) in enumerate(consultas):
+        inicio, objetivo = tuple(inicio), tuple(objetivo)
+        if (0 <= inicio[0] < alto and 0 <= inicio[1] < ancho and
+                0 <= objetivo[0] < alto and 0 <= objetivo[1] < ancho and
+                etiquetas[inicio] == etiquetas[objetivo] != -1):
+            validas.append((indice, inicio, objetivo))
+        else:
+            imposibles.append(indice)
+    return validas, imposibles
+
+
+def resolver_lote(laberinto, consultas, procesos=None, tam_bloque=256):
+    """Resuelve cada (inicio, objetivo) de consultas con astar sobre laberinto.
+
+    Es un generador: produce (índice de la consulta, camino) a medida que se
+    terminan los bloques, sin esperar al resto y sin orden garantizado. El
+    camino es [] si no existe. Con procesos=1 (o pocas consultas) todo se
+    resuelve en el proceso actual. En Windows, como con cualquier
+    ProcessPoolExecutor, la llamada debe estar bajo if __name__ == "__main__".
+    """
+    laberinto = np.asarray(laberinto)
+    validas, imposibles = _alcanzables(etiquetar_componentes(laberinto), consultas)
+    for indice in imposibles:
+        yield indice, []
+
+    procesos = procesos or os.cpu_count() or 1
+    celdas = celdas_con_borde(laberinto)
+    ancho = laberinto.shape[1]
+
+    if procesos == 1 or len(validas) <= tam_bloque:
+        grafo = GrafoCuadricula(celdas, ancho)
+        for indice, inicio, objetivo in validas:
+            yield indice, astar_celdas(celdas, ancho, inicio, objetivo, grafo)
+        return
+
+    memoria = shared_memory.SharedMemory(create=True, size=len(celdas))
+    ejecutor = None
+    try:
+        memoria.buf[:len(celdas)] = celdas
+        ejecutor = ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador,
+                                       initargs=(memoria.name, len(celdas), ancho))
+        # Como mucho dos bloques en vuelo por proceso para no acumular resultados
+        pendientes = set()
+        for i in range(0, len(validas), tam_bloque):
+            pendientes.add(ejecutor.submit(_resolver_bloque, validas[i:i + tam_bloque]))
+            if len(pendientes) >= 2 * procesos:
+                listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    yield from futuro.result()
+        for futuro in as_completed(pendientes):
+            yield from futuro.result()
+    finally:
+        # Si el consumidor abandona el generador, se cancela lo que falte
+        if ejecutor is not None:
+            ejecutor.shutdown(cancel_futures=True)
+        memoria.close()
+        memoria.unlink()
@@ -0,0 +1,373 @@
+"""Motor A* sin interfaz gráfica para laberintos de 8 vecinos.
+
+No depende de tkinter: recibe la matriz del laberinto (0 = libre, 1 = obstáculo)
+y devuelve el camino junto con una traza compacta de los nodos expandidos, para
+que la interfaz la reproduzca al ritmo que quiera o la omita.
+
+solve() y solve_bidirectional() recorren los vecinos con un GrafoCuadricula
+de busqueda.py; quien resuelve varias veces el mismo laberinto puede crearlo
+una vez con grid_graph() y pasarlo como graph=.
+"""
+import heapq
+import math
+from array import array
+
+from busqueda import MOVIMIENTOS_8, GrafoCuadricula, _espacio_busqueda
+from instrumentacion import registro
+
+SQRT2 = math.sqrt(2)
+OBSTACLES = bytes(range(2)) + bytes(254)  # Para translate(): 1 = obstáculo, el resto libre
+
+# Movimientos posibles (arriba, abajo, izquierda, derecha, diagonales) con su costo
+MOVES = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+         (-1, -1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (1, 1, SQRT2)]
+
+
+def octile(a, b):
+    """Distancia octil: heurística admisible para costos 1 y sqrt(2)"""
+    di = abs(a[0] - b[0])
+    dj = abs(a[1] - b[1])
+    return max(di, dj) + (SQRT2 - 1) * min(di, dj)
+
+
+def grid_graph(maze):
+    """GrafoCuadricula de 8 vecinos (costos 1 y sqrt(2)) de la matriz maze"""
+    cols = len(maze[0])
+    # Borde de arriba y el izquierdo de la primera fila, bordes entre filas, y al final
+    frame = b'\x01' * (cols + 3)
+    cells = frame + b'\x01\x01'.join(bytes(row) for row in maze) + frame
+    return GrafoCuadricula(cells.translate(OBSTACLES), cols, MOVIMIENTOS_8)
+
+
+def _cell(index, w):
+    i, j = divmod(index, w)
+    return (i - 1, j - 1)
+
+
+class SearchResult:
+    """Resultado de una búsqueda: camino, costo y traza de expansiones.
+
+    pushes, peak_open y duplicates solo se cuentan con la medición activa
+    (registro.activo); si no, valen 0.
+    """
+
+    def __init__(self, path, cost, trace, cols, pushes=0, peak_open=0, duplicates=0):
+        self.path = path      # Lista de posiciones desde el inicio al destino ([] si no hay)
+        self.cost = cost      # Costo total del camino (None si no hay)
+        self.trace = trace    # array('i') con los índices planos expandidos, en orden
+        self.cols = cols
+        self.pushes = pushes          # Entradas metidas en la lista abierta
+        self.peak_open = peak_open    # Tamaño máximo que alcanzó la lista abierta
+        self.duplicates = duplicates  # Entradas de nodos que ya estaban en la lista abierta
+        self.baseline_expanded = None  # Expansiones de A* clásico, si se comparó
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+    @property
+    def expanded(self):
+        return len(self.trace)
+
+    def iter_trace(self):
+        """Recorre la traza como posiciones (fila, columna)"""
+        cols = self.cols
+        for idx in self.trace:
+            yield divmod(idx, cols)
+
+
+def solve(maze, start, end, graph=None):
+    """A* de 8 vecinos con lista abierta en heap sobre el grafo de la cuadrícula"""
+    cols = len(maze[0])
+    if graph is None:
+        graph = grid_graph(maze)
+    w, mask, edges = graph.w, graph.mascara, graph.aristas
+    space = _espacio_busqueda(len(mask))
+    version, best_g, parent, seen = space.version, space.g, space.padre, space.sello
+    closed = space.cerrados()
+    trace = array('i')
+    origin, target = graph.indice(start), graph.indice(end)
+    ti, tj = divmod(target, w)
+    diagonal = SQRT2 - 1
+
+    seen[origin] = version
+    best_g[origin] = 0.0
+    parent[origin] = -1
+    h = octile(start, end)
+    open_list = [(h, h, origin)]
+    # Contadores de la medición: las entradas metidas se deducen al final
+    # (sacadas + obsoletas + las que quedan), lo demás solo si medir
+    medir = registro.activo
+    stale = peak = duplicates = 0
+
+    while open_list:
+        if medir and len(open_list) > peak:
+            peak = len(open_list)
+        _, _, current = heapq.heappop(open_list)
+        if closed[current] == version:
+            stale += 1
+            continue  # Entrada obsoleta: ya se expandió con un g menor
+        closed[current] = version
+        ci, cj = divmod(current, w)
+        trace.append((ci - 1) * cols + cj - 1)
+
+        if current == target:
+            path = []
+            while current != -1:
+                path.append(_cell(current, w))
+                current = parent[current]
+            pushes = len(trace) + stale + len(open_list) if medir else 0
+            return SearchResult(path[::-1], best_g[target], trace, cols, pushes, peak, duplicates)
+
+        g = best_g[current]
+        for offset, di, dj, cost in edges[mask[current]]:
+            child = current + offset
+            if closed[child] == version:
+                continue
+            new_g = g + cost
+            if seen[child] == version:
+                if new_g >= best_g[child]:
+                    continue
+                if medir:
+                    duplicates += 1
+            seen[child] = version
+            best_g[child] = new_g
+            parent[child] = current
+            # octile(child, end) sin crear tuplas
+            a, b = abs(ci + di - ti), abs(cj + dj - tj)
+            h = a + diagonal * b if a > b else b + diagonal * a
+            heapq.heappush(open_list, (new_g + h, h, child))
+
+    pushes = len(trace) + stale if medir else 0
+    return SearchResult([], None, trace, cols, pushes, peak, duplicates)
+
+
+def solve_bidirectional(maze, start, end, graph=None):
+    """A* bidireccional sobre el mismo modelo de 8 vecinos que solve().
+    
+    Una búsqueda sale de start y otra de end; avanza siempre la de lista
+    abierta más corta. Usan potenciales promediados (octil hasta end menos
+    octil hasta start, a la mitad, y el opuesto hacia atrás), que suman 0: se
+    para en cuanto las cimas de las dos listas suman al menos el mejor costo
+    que ya une ambas, o cuando una lista se vacía, así que con el destino
+    encerrado solo se explora su región. La traza mezcla los dos lados.
+    """
+    if start == end:
+        return solve(maze, start, end, graph)
+    cols = len(maze[0])
+    if graph is None:
+        graph = grid_graph(maze)
+    w, mask, edges = graph.w, graph.mascara, graph.aristas
+    n = len(mask)
+    diagonal = SQRT2 - 1
+    trace = array('i')
+    # Por lado: lista abierta, espacio (g, padres, vistos), cerrados, hacia dónde y desde dónde
+    sides = []
+    for name, origin, target in (('actual', start, end), ('inversa', end, start)):
+        space = _espacio_busqueda(n, name)
+        index = graph.indice(origin)
+        space.sello[index] = space.version
+        space.g[index] = 0.0
+        space.padre[index] = -1
+        p = octile(origin, target) / 2
+        sides.append(([(p, p, index)], space, space.cerrados(),
+                      divmod(graph.indice(target), w), divmod(index, w)))
+    forward, backward = sides
+    best = math.inf
+    meeting = None  # (celda del lado de start, celda vecina del lado de end)
+    medir = registro.activo
+    stale = peak = duplicates = 0
+
+    while forward[0] and backward[0]:
+        if forward[0][0][0] + backward[0][0][0] >= best:
+            break
+        if medir and len(forward[0]) + len(backward[0]) > peak:
+            peak = len(forward[0]) + len(backward[0])
+        side = 0 if len(forward[0]) <= len(backward[0]) else 1
+        open_list, space, closed, (ti, tj), (oi, oj) = sides[side]
+        version, best_g, parent, seen = space.version, space.g, space.padre, space.sello
+        other = sides[1 - side][1]
+        other_version, other_g, other_seen = other.version, other.g, other.sello
+
+        _, _, current = heapq.heappop(open_list)
+        if closed[current] == version:
+            stale += 1
+            continue
+        closed[current] = version
+        ci, cj = divmod(current, w)
+        trace.append((ci - 1) * cols + cj - 1)
+
+        g = best_g[current]
+        for offset, di, dj, cost in edges[mask[current]]:
+            child = current + offset
+            new_g = g + cost
+            if other_seen[child] == other_version and new_g + other_g[child] < best:
+                best = new_g + other_g[child]
+                meeting = (current, child) if side == 0 else (child, current)
+            if closed[child] == version:
+                continue
+            if seen[child] == version:
+                if new_g >= best_g[child]:
+                    continue
+                if medir:
+                    duplicates += 1
+            seen[child] = version
+            best_g[child] = new_g
+            parent[child] = current
+            # (octile(child, target) - octile(child, origin)) / 2 sin crear tuplas
+            a, b = abs(ci + di - ti), abs(cj + dj - tj)
+            c, d = abs(ci + di - oi), abs(cj + dj - oj)
+            p = ((a + diagonal * b if a > b else b + diagonal * a) -
+                 (c + diagonal * d if c > d else d + diagonal * c)) / 2
+            heapq.heappush(open_list, (new_g + p, p, child))
+
+    pushes = len(trace) + stale + len(forward[0]) + len(backward[0]) if medir else 0
+    if meeting is None:
+        return SearchResult([], None, trace, cols, pushes, peak, duplicates)
+    path = []
+    current = meeting[0]
+    while current != -1:
+        path.append(_cell(current, w))
+        current = forward[1].padre[current]
+    path.reverse()
+    current = meeting[1]
+    while current != -1:
+        path.append(_cell(current, w))
+        current = backward[1].padre[current]
+    return SearchResult(path, best, trace, cols, pushes, peak, duplicates)
+
+
+def _walkable(maze, rows, cols, i, j):
+    return 0 <= i < rows and 0 <= j < cols and maze[i][j] != 1
+
+
+def _jump(maze, rows, cols, i, j, di, dj, end):
+    """Avanza desde (i, j) en la dirección (di, dj) hasta el siguiente punto de salto"""
+    while True:
+        i += di
+        j += dj
+        if not _walkable(maze, rows, cols, i, j):
+            return None
+        if (i, j) == end:
+            return (i, j)
+        if di and dj:
+            # Vecinos forzados en diagonal
+            if ((not _walkable(maze, rows, cols, i - di, j) and _walkable(maze, rows, cols, i - di, j + dj)) or
+                    (not _walkable(maze, rows, cols, i, j - dj) and _walkable(maze, rows, cols, i + di, j - dj))):
+                return (i, j)
+            # Un punto de salto en alguna de las componentes rectas también cuenta
+            if (_jump(maze, rows, cols, i, j, di, 0, end) is not None or
+                    _jump(maze, rows, cols, i, j, 0, dj, end) is not None):
+                return (i, j)
+        elif di:
+            if ((not _walkable(maze, rows, cols, i, j + 1) and _walkable(maze, rows, cols, i + di, j + 1)) or
+                    (not _walkable(maze, rows, cols, i, j - 1) and _walkable(maze, rows, cols, i + di, j - 1))):
+                return (i, j)
+        else:
+            if ((not _walkable(maze, rows, cols, i + 1, j) and _walkable(maze, rows, cols, i + 1, j + dj)) or
+                    (not _walkable(maze, rows, cols, i - 1, j) and _walkable(maze, rows, cols, i - 1, j + dj))):
+                return (i, j)
+
+
+def _pruned_directions(maze, rows, cols, i, j, di, dj):
+    """Direcciones naturales y forzadas al llegar a (i, j) moviéndose en (di, dj)"""
+    if di and dj:
+        directions = [(di, 0), (0, dj), (di, dj)]
+        if not _walkable(maze, rows, cols, i - di, j):
+            directions.append((-di, dj))
+        if not _walkable(maze, rows, cols, i, j - dj):
+            directions.append((di, -dj))
+    elif di:
+        directions = [(di, 0)]
+        for side in (1, -1):
+            if not _walkable(maze, rows, cols, i, j + side):
+                directions.append((di, side))
+    else:
+        directions = [(0, dj)]
+        for side in (1, -1):
+            if not _walkable(maze, rows, cols, i + side, j):
+                directions.append((side, dj))
+    return directions
+
+
+def _expand_path(jump_points):
+    """Rellena las celdas intermedias entre puntos de salto consecutivos"""
+    path = [jump_points[0]]
+    for (i, j), (ni, nj) in zip(jump_points, jump_points[1:]):
+        di = (ni > i) - (ni < i)
+        dj = (nj > j) - (nj < j)
+        while (i, j) != (ni, nj):
+            i += di
+            j += dj
+            path.append((i, j))
+    return path
+
+
+def solve_jps(maze, start, end, graph=None):
+    """Jump Point Search sobre el mismo modelo de 8 vecinos que solve().
+    
+    Devuelve caminos del mismo costo pero solo expande puntos de salto, de modo
+    que la traza es mucho más corta en zonas abiertas. El camino devuelto
+    incluye todas las celdas intermedias. graph se acepta para que todos los
+    METHODS se llamen igual, pero los saltos miran maze directamente.
+    """
+    rows, cols = len(maze), len(maze[0])
+    best_g = {start: 0.0}
+    parent = {start: None}
+    closed = set()
+    trace = array('i')
+
+    h = octile(start, end)
+    open_list = [(h, h, start)]
+    medir = registro.activo
+    peak = duplicates = 0
+
+    while open_list:
+        if medir and len(open_list) > peak:
+            peak = len(open_list)
+        _, _, current = heapq.heappop(open_list)
+        if current in closed:
+            continue
+        closed.add(current)
+        ci, cj = current
+        trace.append(ci * cols + cj)
+
+        if current == end:
+            jump_points = []
+            while current is not None:
+                jump_points.append(current)
+                current = parent[current]
+            return SearchResult(_expand_path(jump_points[::-1]), best_g[end], trace, cols,
+                                len(best_g) + duplicates if medir else 0, peak, duplicates)
+
+        previous = parent[current]
+        if previous is None:
+            directions = [(di, dj) for di, dj, _ in MOVES]
+        else:
+            di = (ci > previous[0]) - (ci < previous[0])
+            dj = (cj > previous[1]) - (cj < previous[1])
+            directions = _pruned_directions(maze, rows, cols, ci, cj, di, dj)
+
+        g = best_g[current]
+        for di, dj in directions:
+            point = _jump(maze, rows, cols, ci, cj, di, dj, end)
+            if point is None or point in closed:
+                continue
+            new_g = g + octile(current, point)
+            if new_g < best_g.get(point, math.inf):
+                if medir and point in best_g:
+                    duplicates += 1
+                best_g[point] = new_g
+                parent[point] = current
+                h = octile(point, end)
+                heapq.heappush(open_list, (new_g + h, h, point))
+
+    return SearchResult([], None, trace, cols, len(best_g) + duplicates if medir else 0, peak, duplicates)
+
+
+# Métodos de búsqueda disponibles para la interfaz
+METHODS = {
+    "astar": solve,
+    "jps": solve_jps,
+    "bidirectional": solve_bidirectional,
+}
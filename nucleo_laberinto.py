@@ -0,0 +1,452 @@
+"""Lógica del laberinto sin interfaz gráfica: generación, conectividad y A*"""
+import numpy as np
+import random
+import time
+
+from busqueda import (GrafoCuadricula, astar_bidireccional, astar_celdas, astar_heuristica,
+                      astar_pesos)
+from cache_rutas import CacheRutas
+from instrumentacion import registro
+from referencias import Referencias
+from tablero_bits import TableroBits
+
+# Configuración inicial
+ANCHO = 15
+ALTO = 10
+MAX_BLOQUES = ANCHO * ALTO // 2  # Máximo razonable de bloques
+
+# Movimientos del jugador (teclas WASD)
+DIRECCIONES = {'w': (-1, 0), 's': (1, 0), 'a': (0, -1), 'd': (0, 1)}
+
+def etiquetar_componentes(grid):
+    """Etiqueta las componentes 4-conexas de celdas libres con operaciones de arrays.
+    
+    Devuelve un array con la forma de grid: -1 en las paredes y, en cada celda
+    libre, el menor índice plano de su componente. Dos celdas están conectadas
+    si y solo si tienen la misma etiqueta.
+    """
+    libre = np.asarray(grid) == 0
+    alto, ancho = libre.shape
+    padre = np.arange(alto * ancho)
+    indices = padre.reshape(alto, ancho)
+    
+    # Aristas entre celdas libres vecinas (horizontales y verticales)
+    horizontales = libre[:, :-1] & libre[:, 1:]
+    verticales = libre[:-1, :] & libre[1:, :]
+    u = np.concatenate((indices[:, :-1][horizontales], indices[:-1, :][verticales]))
+    v = np.concatenate((indices[:, 1:][horizontales], indices[1:, :][verticales]))
+    
+    while u.size:
+        raiz_u, raiz_v = padre[u], padre[v]
+        distintas = raiz_u != raiz_v
+        if not distintas.any():
+            break
+        # Las aristas ya unidas no vuelven a separarse: se descartan
+        u, v = u[distintas], v[distintas]
+        raiz_u, raiz_v = raiz_u[distintas], raiz_v[distintas]
+        
+        # Colgar cada raíz de la menor raíz vecina y comprimir hasta las raíces
+        np.minimum.at(padre, np.maximum(raiz_u, raiz_v), np.minimum(raiz_u, raiz_v))
+        while True:
+            abuelo = padre[padre]
+            if np.array_equal(abuelo, padre):
+                break
+            padre = abuelo
+    
+    etiquetas = padre.reshape(alto, ancho)
+    etiquetas[~libre] = -1
+    return etiquetas
+
+def _raiz(padre, x):
+    """Busca la raíz en el union-find (con compresión por mitades)"""
+    while padre[x] != x:
+        padre[x] = padre[padre[x]]
+        x = padre[x]
+    return x
+
+def _aristas_barajadas(indices, rng):
+    """Aristas (u, v) entre vecinos de la matriz de índices, en orden aleatorio"""
+    u = np.concatenate((indices[:, :-1].ravel(), indices[:-1, :].ravel()))
+    v = np.concatenate((indices[:, 1:].ravel(), indices[1:, :].ravel()))
+    orden = np.random.default_rng(rng.getrandbits(64)).permutation(u.size)
+    return zip(u[orden].tolist(), v[orden].tolist())
+
+def generar_bloques_conexos(alto, ancho, num_bloques, protegidas, rng):
+    """Coloca num_bloques paredes al azar sin desconectar las celdas libres.
+    
+    Se construye un árbol generador aleatorio de la cuadrícula (Kruskal con
+    union-find) y se convierten en pared hojas elegidas al azar: quitar una
+    hoja nunca desconecta el resto del árbol. El costo es O(celdas) siempre.
+    Solo se coloca menos de lo pedido si el árbol queda reducido al camino
+    entre las posiciones protegidas.
+    """
+    n = alto * ancho
+    padre = list(range(n))
+    vecinos = [[] for _ in range(n)]
+    for u, v in _aristas_barajadas(np.arange(n).reshape(alto, ancho), rng):
+        raiz_u, raiz_v = _raiz(padre, u), _raiz(padre, v)
+        if raiz_u != raiz_v:
+            padre[raiz_u] = raiz_v
+            vecinos[u].append(v)
+            vecinos[v].append(u)
+    
+    protegidas = {i * ancho + j for i, j in protegidas}
+    grado = [len(v) for v in vecinos]
+    hojas = [c for c in range(n) if grado[c] <= 1 and c not in protegidas]
+    paredes = bytearray(n)
+    
+    for _ in range(min(num_bloques, n - len(protegidas))):
+        if not hojas:
+            break
+        # Extraer una hoja al azar en O(1)
+        k = rng.randrange(len(hojas))
+        hoja = hojas[k]
+        hojas[k] = hojas[-1]
+        hojas.pop()
+        paredes[hoja] = 1
+        for v in vecinos[hoja]:
+            if not paredes[v]:
+                grado[v] -= 1
+                if grado[v] == 1 and v not in protegidas:
+                    hojas.append(v)
+    
+    return np.frombuffer(paredes, dtype=np.uint8).reshape(alto, ancho).astype(int)
+
+def _abrir_hasta_sala(paredes, ancho, pos):
+    """Abre pos y el tramo que la une con la sala (coordenadas pares) más cercana"""
+    i, j = pos
+    for celda in ((i, j), (i - i % 2, j), (i - i % 2, j - j % 2)):
+        paredes[celda[0] * ancho + celda[1]] = 0
+
+def generar_backtracker(alto, ancho, num_bloques, protegidas, rng):
+    """Laberinto perfecto por backtracking recursivo (con pila explícita).
+    
+    Las salas ocupan las coordenadas pares y las paredes entre ellas se abren
+    al avanzar. num_bloques se ignora: la cantidad de paredes la fija el algoritmo.
+    """
+    paredes = bytearray(b"\x01") * (alto * ancho)
+    paredes[0] = 0
+    pila = [(0, 0)]
+    while pila:
+        i, j = pila[-1]
+        opciones = [
+            (i + di, j + dj) for di, dj in ((0, 2), (2, 0), (0, -2), (-2, 0))
+            if 0 <= i + di < alto and 0 <= j + dj < ancho and paredes[(i + di) * ancho + j + dj]
+        ]
+        if not opciones:
+            pila.pop()
+            continue
+        ni, nj = rng.choice(opciones)
+        paredes[(i + ni) // 2 * ancho + (j + nj) // 2] = 0
+        paredes[ni * ancho + nj] = 0
+        pila.append((ni, nj))
+    
+    for pos in protegidas:
+        _abrir_hasta_sala(paredes, ancho, pos)
+    return np.frombuffer(paredes, dtype=np.uint8).reshape(alto, ancho).astype(int)
+
+def generar_kruskal(alto, ancho, num_bloques, protegidas, rng):
+    """Laberinto perfecto por Kruskal aleatorio sobre las salas de coordenadas pares"""
+    paredes = bytearray(b"\x01") * (alto * ancho)
+    padre = list(range(alto * ancho))
+    for i in range(0, alto, 2):
+        for j in range(0, ancho, 2):
+            paredes[i * ancho + j] = 0
+    
+    salas = np.arange(alto * ancho).reshape(alto, ancho)[::2, ::2]
+    for u, v in _aristas_barajadas(salas, rng):
+        raiz_u, raiz_v = _raiz(padre, u), _raiz(padre, v)
+        if raiz_u != raiz_v:
+            padre[raiz_u] = raiz_v
+            paredes[(u + v) // 2] = 0
+    
+    for pos in protegidas:
+        _abrir_hasta_sala(paredes, ancho, pos)
+    return np.frombuffer(paredes, dtype=np.uint8).reshape(alto, ancho).astype(int)
+
+GENERADORES = {
+    'aleatorio': generar_bloques_conexos,
+    'backtracker': generar_backtracker,
+    'kruskal': generar_kruskal,
+}
+
+class Laberinto:
+    def __init__(self, num_bloques=0, generador='aleatorio', rng=None, alto=ALTO, ancho=ANCHO,
+                 referencias=0):
+        if generador not in GENERADORES:
+            raise ValueError(f"Generador desconocido: {generador}")
+        self.num_bloques = num_bloques
+        self.generador = generador
+        self.rng = rng if rng is not None else random  # random.Random para resultados reproducibles
+        self.alto = alto
+        self.ancho = ancho
+        self.grid = np.zeros((alto, ancho), dtype=int)
+        self.componentes = None  # Etiquetas de etiquetar_componentes(self.grid)
+        self.tablero = None      # TableroBits de self.grid, se crea al usarse
+        self.costos = None       # Costos de terreno (uint8 con la forma de grid); None = todo 1
+        self.version = 0         # Aumenta con cada cambio de grid (ver indexar_libres)
+        self.cache_rutas = CacheRutas()
+        self.celdas_borde = None  # celdas_con_borde(self.grid) y la versión para la que vale
+        self.version_celdas = -1
+        self.grafo = None         # GrafoCuadricula de 4 vecinos y la versión para la que vale
+        self.version_grafo = -1
+        self.num_referencias = referencias  # Referencias ALT a preparar al generar (0 = Manhattan)
+        self.referencias = None
+        self.version_referencias = -1
+        self.indexar_libres()
+        self.reset_posiciones()
+        self.generar_laberinto_valido()
+    
+    @classmethod
+    def desde_grid(cls, grid, jugador, ia, objetivo, componentes=None, generador='aleatorio', rng=None):
+        """Crea un Laberinto a partir de una cuadrícula ya hecha, sin generar nada.
+        
+        componentes puede traer etiquetas precalculadas (por ejemplo, leídas de
+        disco); si no, se calculan aquí.
+        """
+        laberinto = cls.__new__(cls)
+        laberinto.grid = np.array(grid, dtype=int)
+        laberinto.alto, laberinto.ancho = laberinto.grid.shape
+        laberinto.num_bloques = int(laberinto.grid.sum())
+        laberinto.generador = generador
+        laberinto.rng = rng if rng is not None else random
+        laberinto.componentes = (np.asarray(componentes) if componentes is not None
+                                 else etiquetar_componentes(laberinto.grid))
+        laberinto.tablero = None
+        laberinto.costos = None
+        laberinto.version = 0
+        laberinto.cache_rutas = CacheRutas()
+        laberinto.celdas_borde = None
+        laberinto.version_celdas = -1
+        laberinto.grafo = None
+        laberinto.version_grafo = -1
+        laberinto.num_referencias = 0
+        laberinto.referencias = None
+        laberinto.version_referencias = -1
+        laberinto.indexar_libres()
+        laberinto.jugador, laberinto.ia, laberinto.objetivo = tuple(jugador), tuple(ia), tuple(objetivo)
+        laberinto.ruta_ia = laberinto.ruta(laberinto.ia)
+        laberinto.ruta_jugador = laberinto.ruta(laberinto.jugador)
+        return laberinto
+    
+    def indexar_libres(self):
+        """Actualiza el índice de celdas libres (índices planos) tras cambiar grid.
+        
+        También sube la versión de la cuadrícula, con lo que las rutas en caché
+        dejan de valer: cualquier cambio de grid debe terminar llamando a esto.
+        """
+        self.libres = np.flatnonzero(self.grid.ravel() == 0)
+        self.version += 1
+    
+    def generar_posicion_aleatoria_valida(self, excluir=[]):
+        """Genera una posición aleatoria que no sea pared y sea accesible"""
+        excluir = set(excluir)
+        disponibles = len(self.libres) - sum(1 for pos in excluir if self.grid[pos] == 0)
+        if disponibles <= 0:
+            raise ValueError("No quedan celdas libres disponibles")
+        
+        # Muestreo O(1) esperado sobre el índice de celdas libres
+        self.reintentos_posicion = 0  # Muestras descartadas (para la medición)
+        while True:
+            pos = divmod(int(self.libres[self.rng.randrange(len(self.libres))]), self.ancho)
+            if pos not in excluir:
+                return pos
+            self.reintentos_posicion += 1
+    
+    def reset_posiciones(self):
+        """Reinicia las posiciones sin cambiar el laberinto"""
+        self.jugador = (0, 0)
+        self.ia = (self.alto-1, 0)
+        # El objetivo ahora se coloca aleatoriamente en cada nueva partida
+        self.objetivo = self.generar_posicion_aleatoria_valida(excluir=[self.jugador, self.ia])
+        self.ruta_ia = []
+        self.ruta_jugador = []
+    
+    def hay_camino(self, inicio, fin):
+        """Inundación bit-paralela para verificar conectividad"""
+        if inicio == fin:
+            return True
+        if not registro.activo:
+            if self.tablero is None:
+                self.tablero = TableroBits.desde_grid(self.grid)
+            return self.tablero.hay_camino(inicio, fin, self.grafo_vecinos())
+        
+        t0 = time.perf_counter()
+        construido = self.tablero is None
+        if construido:
+            self.tablero = TableroBits.desde_grid(self.grid)
+        conectados = self.tablero.hay_camino(inicio, fin, self.grafo_vecinos())
+        registro.anotar('hay_camino', segundos=time.perf_counter() - t0, conectados=conectados,
+                        vueltas=self.tablero.vueltas, celda_a_celda=self.tablero.celda_a_celda,
+                        tablero_nuevo=construido)
+        return conectados
+    
+    def ruta(self, inicio, objetivo=None):
+        """Ruta más corta desde inicio (por defecto hasta el objetivo), con caché.
+        
+        Si inicio está sobre una ruta ya calculada hacia el mismo objetivo con
+        las mismas paredes, se devuelve su tramo final sin buscar ni copiarlo
+        (un TramoRuta de cache_rutas, que se usa como una lista).
+        """
+        objetivo = self.objetivo if objetivo is None else objetivo
+        ruta = self.cache_rutas.buscar(self.version, inicio, objetivo)
+        if ruta is None:
+            if self.costos is None and self.version_referencias == self.version:
+                ruta = astar_heuristica(self.celdas_aplanadas(), self.ancho, inicio, objetivo,
+                                        self.referencias.heuristica(objetivo), self.grafo_vecinos())
+            elif self.costos is None:
+                ruta = astar_celdas(self.celdas_aplanadas(), self.ancho, inicio, objetivo,
+                                    self.grafo_vecinos())
+            else:
+                ruta = astar_pesos(pesos_con_borde(self.grid, self.costos), self.ancho, inicio, objetivo)
+            self.cache_rutas.guardar(self.version, inicio, objetivo, ruta)
+        return ruta
+    
+    def poner_terreno(self, costos):
+        """Asigna costos de terreno (enteros de 1 a 255 por celda; None = todo 1)"""
+        if costos is not None:
+            costos = np.asarray(costos)
+            if costos.shape != self.grid.shape or costos.min() < 1 or costos.max() > 255:
+                raise ValueError("Los costos deben ser enteros de 1 a 255 con la forma de grid")
+            costos = costos.astype(np.uint8)
+        self.costos = costos
+        self.version += 1  # Las rutas en caché se calcularon con los costos anteriores
+    
+    def preparar_referencias(self, num_referencias=None):
+        """Precalcula las referencias ALT para la cuadrícula actual.
+        
+        Solo valen mientras no cambie la versión; después ruta() vuelve a
+        Manhattan hasta que se llame otra vez.
+        """
+        num_referencias = self.num_referencias if num_referencias is None else num_referencias
+        t0 = time.perf_counter() if registro.activo else 0.0
+        self.referencias = Referencias(self.celdas_aplanadas(), self.ancho, num_referencias, self.rng)
+        self.version_referencias = self.version
+        if registro.activo:
+            estadisticas = self.referencias.estadisticas()
+            registro.anotar('referencias', segundos=time.perf_counter() - t0,
+                            referencias=len(self.referencias),
+                            ms_por_referencia=[round(t * 1e3, 2) for t in estadisticas['segundos_por_referencia']],
+                            bytes_por_referencia=estadisticas['bytes_por_referencia'])
+        return self.referencias
+    
+    def celdas_aplanadas(self):
+        """celdas_con_borde(self.grid), recalculada solo si la cuadrícula cambió"""
+        if self.version_celdas != self.version:
+            self.celdas_borde = celdas_con_borde(self.grid)
+            self.version_celdas = self.version
+        return self.celdas_borde
+    
+    def grafo_vecinos(self):
+        """GrafoCuadricula de self.grid; alternar_pared lo actualiza sin rehacerlo"""
+        if self.version_grafo != self.version:
+            self.grafo = GrafoCuadricula(self.celdas_aplanadas(), self.ancho)
+            self.version_grafo = self.version
+        return self.grafo
+    
+    def mover(self, pos, direccion):
+        """Posición tras moverse desde pos; la misma si hay pared o borde"""
+        dx, dy = DIRECCIONES[direccion]
+        nueva_pos = (pos[0] + dx, pos[1] + dy)
+        if (0 <= nueva_pos[0] < self.alto and 0 <= nueva_pos[1] < self.ancho and
+                self.grid[nueva_pos] == 0):
+            return nueva_pos
+        return pos
+    
+    def alternar_pared(self, pos):
+        """Pone o quita una pared durante la partida; devuelve el nuevo valor de la celda.
+        
+        No se permite sobre el jugador, la IA ni el objetivo (devuelve None).
+        Las etiquetas de componentes se descartan y se recalculan al consultarlas.
+        """
+        if pos in (self.jugador, self.ia, self.objetivo):
+            return None
+        self.grid[pos] ^= 1
+        self.num_bloques += 1 if self.grid[pos] else -1
+        self.componentes = None
+        self.tablero = None
+        al_dia = self.version_grafo == self.version
+        self.indexar_libres()
+        if al_dia:
+            # Solo cambian la celda y sus vecinas: no hace falta rehacer el grafo
+            self.grafo.poner_pared(pos, self.grid[pos])
+            self.version_grafo = self.version
+        return int(self.grid[pos])
+    
+    def mismo_componente(self, *posiciones):
+        """Indica en O(1) si todas las posiciones son libres y están conectadas"""
+        if self.componentes is None:
+            self.componentes = etiquetar_componentes(self.grid)
+        etiquetas = {self.componentes[pos] for pos in posiciones}
+        return len(etiquetas) == 1 and -1 not in etiquetas
+    
+    def generar_laberinto_valido(self):
+        """Genera un laberinto conexo por construcción y coloca el objetivo accesible"""
+        t0 = time.perf_counter() if registro.activo else 0.0
+        protegidas = [self.jugador, self.ia]
+        # Siempre quedan al menos tres celdas libres: jugador, IA y objetivo
+        bloques = min(self.num_bloques, self.alto * self.ancho - 3)
+        self.grid = GENERADORES[self.generador](self.alto, self.ancho, bloques, protegidas, self.rng)
+        self.num_bloques = int(self.grid.sum())
+        self.indexar_libres()
+        self.componentes = etiquetar_componentes(self.grid)
+        self.tablero = None
+        
+        # Todas las celdas libres están conectadas: cualquier objetivo sirve
+        self.objetivo = self.generar_posicion_aleatoria_valida(excluir=protegidas)
+        if self.num_referencias:
+            self.preparar_referencias()
+        
+        # Calcular rutas iniciales
+        self.ruta_ia = self.ruta(self.ia)
+        self.ruta_jugador = self.ruta(self.jugador)
+        
+        if registro.activo:
+            # Conexo por construcción: siempre basta un intento; solo el
+            # muestreo del objetivo puede reintentar
+            registro.anotar('generacion', segundos=time.perf_counter() - t0,
+                            generador=self.generador, alto=self.alto, ancho=self.ancho,
+                            bloques_pedidos=bloques, bloques=self.num_bloques,
+                            intentos=1, reintentos=self.reintentos_posicion)
+
+def celdas_con_borde(laberinto):
+    """Aplana la cuadrícula a bytes rodeada de un borde de paredes.
+    
+    Con el borde no hacen falta comprobaciones de límites: los vecinos de la
+    celda libre k son k+1, k-1, k+ancho+2 y k-ancho-2.
+    """
+    laberinto = np.asarray(laberinto)
+    alto, ancho = laberinto.shape
+    celdas = np.ones((alto + 2, ancho + 2), dtype=np.uint8)
+    celdas[1:-1, 1:-1] = laberinto != 0
+    return celdas.tobytes()
+
+def pesos_con_borde(laberinto, costos):
+    """Como celdas_con_borde(), pero cada celda libre guarda su costo de entrada.
+    
+    costos son enteros de 1 a 255 con la forma de laberinto; en el resultado
+    0 marca las paredes y el borde.
+    """
+    laberinto = np.asarray(laberinto)
+    alto, ancho = laberinto.shape
+    pesos = np.zeros((alto + 2, ancho + 2), dtype=np.uint8)
+    pesos[1:-1, 1:-1] = np.where(laberinto == 0, costos, 0)
+    return pesos.tobytes()
+
+def astar(laberinto, inicio, objetivo, costos=None, bidireccional=False):
+    """Algoritmo A* (4 vecinos, Manhattan) para encontrar el camino más corto.
+    
+    Trabaja sobre índices planos y admite cuadrículas de cualquier forma. Los
+    empates se deshacen por menor h y luego por menor índice, así que el
+    resultado es determinista. Devuelve [] si no hay camino. Con costos
+    (terreno, ver pesos_con_borde) minimiza la suma de los costos de las
+    celdas en las que se entra. bidireccional=True usa astar_bidireccional
+    (solo sin costos).
+    """
+    if bidireccional:
+        if costos is not None:
+            raise ValueError("La búsqueda bidireccional no admite costos de terreno")
+        return astar_bidireccional(celdas_con_borde(laberinto), np.shape(laberinto)[1], inicio, objetivo)
+    if costos is not None:
+        return astar_pesos(pesos_con_borde(laberinto, costos), np.shape(laberinto)[1], inicio, objetivo)
+    return astar_celdas(celdas_con_borde(laberinto), np.shape(laberinto)[1], inicio, objetivo)
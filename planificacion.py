@@ -0,0 +1,340 @@
+"""Planificación de rutas fuera del hilo de la interfaz y reloj de paso fijo.
+
+PlanificadorAsincrono mantiene los planificadores D* Lite en un hilo propio.
+La interfaz le envía pedidos por una cola (rutas, campos de distancias de la
+horda, cambios de pared, partida nueva) y recoge los planes terminados de
+otra sin esperar nunca. Mientras un
+plan se calcula, el hilo de Tk solo cede el GIL cada sys.getswitchinterval()
+segundos (5 ms por defecto), así que la latencia de la entrada no depende del
+tamaño del mapa.
+
+RelojPasoFijo separa la simulación del dibujo: la lógica avanza en pasos de
+duración fija aunque los frames lleguen a ritmo irregular.
+
+ReservaNiveles genera en otro hilo los próximos niveles de la configuración
+actual, así empezar una partida nueva no espera a la generación. Si no hay
+ninguno listo, el pedido se entrega más tarde en un Future y la interfaz lo
+consulta desde su bucle en lugar de bloquearse. Un segundo hilo atiende el
+pedido cuando el primero está ocupado con una configuración vieja; nunca
+hay más de dos generaciones a la vez.
+"""
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+from horda import campo_distancias
+from nucleo_laberinto import celdas_con_borde
+from replanificacion import PlanificadorDStarLite
+
+AGENTES = ('ia', 'jugador')
+
+# Plan terminado: ruta desde inicio, calculada para la partida y versión de
+# paredes indicadas, y segundos que tardó el cálculo. Los de la horda (agente
+# 'horda') llevan en inicio el destino y en ruta su campo de distancias
+Plan = namedtuple('Plan', 'agente inicio ruta partida version segundos')
+
+
+class PlanificadorAsincrono:
+    """Hilo de planificación con cola de pedidos y cola de planes terminados"""
+
+    def __init__(self):
+        self.pedidos = queue.Queue()
+        self.planes = queue.Queue()
+        self.partida = 0
+        self.version = 0
+        self.hilo = threading.Thread(target=self._trabajar, name="planificador", daemon=True)
+        self.hilo.start()
+
+    def reiniciar(self, grid, objetivo):
+        """Empieza una partida nueva; los planes de la anterior se descartan"""
+        self.partida += 1
+        self.version = 0
+        self.pedidos.put(('reiniciar', self.partida, grid.copy(), objetivo))
+
+    def cambiar_celda(self, pos, pared):
+        """Avisa de un cambio de pared; invalida los planes ya pedidos"""
+        self.version += 1
+        self.pedidos.put(('celda', self.partida, self.version, pos, pared))
+
+    def pedir_ruta(self, agente, inicio):
+        """Pide la ruta de agente desde inicio (solo se calcula el último pedido)"""
+        self.pedidos.put(('ruta', self.partida, agente, inicio))
+
+    def pedir_campo(self, destino):
+        """Pide el campo de distancias de la horda hasta destino (solo el último pedido)"""
+        self.pedidos.put(('campo', self.partida, destino))
+
+    def planes_listos(self):
+        """Planes terminados desde la última llamada, sin bloquear"""
+        listos = []
+        while True:
+            try:
+                listos.append(self.planes.get_nowait())
+            except queue.Empty:
+                return listos
+
+    def vigente(self, plan):
+        """Indica si plan corresponde a la partida y a las paredes actuales"""
+        return plan.partida == self.partida and plan.version == self.version
+
+    def cerrar(self):
+        self.pedidos.put(None)
+        self.hilo.join()
+
+    def _trabajar(self):
+        planificadores = {}
+        celdas, ancho = None, 0  # Cuadrícula con borde para los campos de la horda
+        partida = version = 0
+        while True:
+            lote = [self.pedidos.get()]
+            while True:
+                try:
+                    lote.append(self.pedidos.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Se aplican todos los cambios en orden, pero de cada agente solo
+            # se calcula la ruta más reciente
+            rutas = {}
+            campo = None
+            for pedido in lote:
+                if pedido is None:
+                    return
+                if pedido[0] == 'reiniciar':
+                    _, partida, grid, objetivo = pedido
+                    version = 0
+                    planificadores = {agente: PlanificadorDStarLite(grid, objetivo) for agente in AGENTES}
+                    celdas, ancho = bytearray(celdas_con_borde(grid)), grid.shape[1]
+                    rutas.clear()
+                    campo = None
+                elif pedido[1] != partida:
+                    continue
+                elif pedido[0] == 'celda':
+                    _, _, version, pos, pared = pedido
+                    for planificador in planificadores.values():
+                        planificador.cambiar_celda(pos, pared)
+                    celdas[(pos[0] + 1) * (ancho + 2) + pos[1] + 1] = pared
+                elif pedido[0] == 'campo':
+                    campo = pedido[2]
+                else:
+                    rutas[pedido[2]] = pedido[3]
+
+            for agente, inicio in rutas.items():
+                t0 = time.perf_counter()
+                ruta = planificadores[agente].ruta(inicio)
+                self.planes.put(Plan(agente, inicio, ruta, partida, version, time.perf_counter() - t0))
+            if campo is not None:
+                t0 = time.perf_counter()
+                distancias = campo_distancias(celdas, ancho, campo)
+                self.planes.put(Plan('horda', campo, distancias, partida, version, time.perf_counter() - t0))
+
+
+class ReservaNiveles:
+    """Niveles ya generados para una configuración, repuestos por un hilo propio"""
+
+    def __init__(self, crear, capacidad=3):
+        self.crear = crear            # configuración -> nivel; solo se llama en el hilo
+        self.capacidad = capacidad
+        self.configuracion = None
+        self.niveles = deque()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartados = 0          # Terminados después de cambiar la configuración
+        self.reposicion = MedidorLatencia()  # Segundos que tarda en generarse cada nivel
+        self._pedidos = deque()       # Futures de tomar() que esperan un nivel
+        self._en_curso = None         # Configuración que está generando el hilo
+        self._aparte = None           # Future que espera al hilo auxiliar (a lo sumo uno)
+        self._aparte_en_curso = False  # El hilo auxiliar está generando
+        self._fallida = None          # Configuración cuya generación lanzó una excepción
+        self._cerrada = False
+        self._condicion = threading.Condition()
+        self.hilo = threading.Thread(target=self._reponer, name="reserva_niveles", daemon=True)
+        self.hilo_aparte = threading.Thread(target=self._generar_aparte, name="reserva_pedido",
+                                            daemon=True)
+        self.hilo.start()
+        self.hilo_aparte.start()
+
+    def tomar(self, configuracion):
+        """Future con un nivel de configuracion, ya resuelto si había en la reserva.
+
+        Si no había, el hilo genera ese nivel antes de reponer y lo entrega en
+        el Future (o la excepción de crear); quien llama no espera nunca. Al
+        cambiar de configuración, los pedidos pendientes se cancelan. Si el
+        hilo sigue con un nivel de otra configuración (un mapa grande que ya
+        no sirve, por ejemplo), el pedido pasa al hilo auxiliar para no
+        esperarlo, y la reposición no sigue hasta que ese hilo termine. Ahí
+        espera un solo pedido: el de una configuración posterior lo reemplaza.
+        """
+        pedido = Future()
+        with self._condicion:
+            self._cambiar(configuracion)
+            if self.niveles:
+                self.aciertos += 1
+                pedido.set_result(self.niveles.popleft())
+            else:
+                self.fallos += 1
+                self._fallida = None  # Un pedido explícito reintenta aunque haya fallado
+                if self._en_curso not in (None, configuracion) and self._aparte is None:
+                    self._aparte = pedido
+                else:
+                    self._pedidos.append(pedido)
+            self._condicion.notify_all()
+        return pedido
+
+    def preparar(self, configuracion):
+        """Empieza a llenar la reserva para configuracion sin tomar nada"""
+        with self._condicion:
+            self._cambiar(configuracion)
+            self._condicion.notify_all()
+
+    def _cambiar(self, configuracion):
+        # Con una configuración nueva los niveles guardados ya no sirven
+        if configuracion != self.configuracion:
+            self.configuracion = configuracion
+            self.niveles.clear()
+            self._cancelar_pedidos()
+            self._fallida = None
+
+    def _cancelar_pedidos(self):
+        # El pedido que esperaba al hilo auxiliar también: lo reemplaza el siguiente
+        if self._aparte is not None:
+            self._aparte.cancel()
+            self._aparte = None
+        while self._pedidos:
+            self._pedidos.popleft().cancel()
+
+    def _siguiente_pedido(self):
+        # Primer pedido en espera que no se haya cancelado, ya marcado en curso
+        while self._pedidos:
+            pedido = self._pedidos.popleft()
+            if pedido.set_running_or_notify_cancel():
+                return pedido
+        return None
+
+    def estadisticas(self):
+        tomados = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / tomados if tomados else 0.0,
+            'en_reserva': len(self.niveles),
+            'descartados': self.descartados,
+            'reposicion_p95': self.reposicion.percentil(0.95),
+        }
+
+    def cerrar(self):
+        with self._condicion:
+            self._cerrada = True
+            self._cancelar_pedidos()
+            self._condicion.notify_all()
+        self.hilo.join()
+        self.hilo_aparte.join()
+
+    def _generar_aparte(self):
+        # Hilo auxiliar: genera el pedido que no puede esperar al hilo de reposición
+        while True:
+            with self._condicion:
+                self._aparte_en_curso = False
+                self._condicion.notify_all()
+                while not self._cerrada and self._aparte is None:
+                    self._condicion.wait()
+                if self._cerrada:
+                    return
+                pedido, self._aparte = self._aparte, None
+                if not pedido.set_running_or_notify_cancel():
+                    continue
+                configuracion = self.configuracion
+                self._aparte_en_curso = True
+
+            try:
+                pedido.set_result(self.crear(configuracion))
+            except Exception as error:
+                pedido.set_exception(error)
+
+    def _reponer(self):
+        while True:
+            with self._condicion:
+                self._en_curso = None
+                if self._aparte is not None:
+                    # Libre antes que el hilo auxiliar: el pedido que lo esperaba va primero
+                    self._pedidos.appendleft(self._aparte)
+                    self._aparte = None
+                # Los pedidos se atienden siempre; reponer espera al hilo auxiliar
+                while not self._cerrada and (self.configuracion in (None, self._fallida) or
+                                             (not self._pedidos and
+                                              (self._aparte_en_curso or
+                                               len(self.niveles) >= self.capacidad))):
+                    self._condicion.wait()
+                if self._cerrada:
+                    return
+                configuracion = self._en_curso = self.configuracion
+
+            t0 = time.perf_counter()
+            try:
+                nivel = self.crear(configuracion)
+            except Exception as error:
+                # No se reintenta en bucle: el error llega a los pedidos en espera
+                # y el próximo tomar() vuelve a intentarlo
+                with self._condicion:
+                    if configuracion == self.configuracion:
+                        self._fallida = configuracion
+                        pedido = self._siguiente_pedido()
+                        while pedido is not None:
+                            pedido.set_exception(error)
+                            pedido = self._siguiente_pedido()
+                continue
+            segundos = time.perf_counter() - t0
+
+            with self._condicion:
+                pedido = self._siguiente_pedido() if configuracion == self.configuracion else None
+                if pedido is not None:
+                    pedido.set_result(nivel)
+                    self.reposicion.registrar(segundos)
+                elif configuracion == self.configuracion and len(self.niveles) < self.capacidad:
+                    self.niveles.append(nivel)
+                    self.reposicion.registrar(segundos)
+                else:
+                    self.descartados += 1
+
+
+class RelojPasoFijo:
+    """Acumula tiempo real y lo reparte en pasos de simulación de duración fija"""
+
+    def __init__(self, paso, max_pasos=5):
+        self.paso = paso
+        self.max_pasos = max_pasos  # Tope por llamada para no encadenar retrasos
+        self.acumulado = 0.0
+        self.anterior = None
+
+    def pasos(self, ahora):
+        """Número de pasos que tocan desde la llamada anterior"""
+        if self.anterior is not None:
+            self.acumulado += ahora - self.anterior
+        self.anterior = ahora
+        n = int(self.acumulado // self.paso)
+        self.acumulado -= n * self.paso
+        if n > self.max_pasos:
+            # Tras un bloqueo largo se descarta el atraso en lugar de recuperarlo de golpe
+            n, self.acumulado = self.max_pasos, 0.0
+        return n
+
+
+class MedidorLatencia:
+    """Últimas muestras de una latencia, con percentiles para mostrarlas"""
+
+    def __init__(self, muestras=240):
+        self.valores = deque(maxlen=muestras)
+
+    def registrar(self, segundos):
+        self.valores.append(segundos)
+
+    def percentil(self, p):
+        if not self.valores:
+            return 0.0
+        ordenados = sorted(self.valores)
+        return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+    def maximo(self):
+        return max(self.valores, default=0.0)
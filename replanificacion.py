@@ -0,0 +1,175 @@
+"""Replanificación incremental con D* Lite para agentes que se mueven.
+
+La búsqueda se hace hacia atrás, desde el objetivo, y su estado (g, rhs y la
+cola de prioridad) se conserva entre llamadas. Cuando el agente avanza o se
+cambia una pared, solo se reparan los nodos afectados, así que el costo por
+tick depende de cuánto cambió y no del tamaño del mapa.
+
+Referencia: S. Koenig y M. Likhachev, "D* Lite" (AAAI 2002), versión optimizada.
+"""
+import heapq
+
+import numpy as np
+
+from busqueda import GrafoCuadricula
+from nucleo_laberinto import celdas_con_borde
+
+INF = float('inf')
+
+
+class PlanificadorDStarLite:
+    """Ruta más corta (4 vecinos, costo 1) hacia un objetivo fijo desde un inicio móvil"""
+
+    def __init__(self, laberinto, objetivo):
+        self.alto, self.ancho = np.shape(laberinto)
+        # Grafo propio con borde de paredes: se modifica con cambiar_celda
+        self.grafo = GrafoCuadricula(celdas_con_borde(laberinto), self.ancho)
+        self.w = self.grafo.w
+        self.celdas = self.grafo.celdas
+        self.objetivo = self.grafo.indice(objetivo)
+
+        # Estado plano indexado por celda, como el espacio de trabajo de busqueda
+        n = len(self.celdas)
+        self.g = [INF] * n
+        self.rhs = [INF] * n
+        self.rhs[self.objetivo] = 0
+        self.cola = []             # Heap de (k1, k2, nodo) con borrado perezoso
+        self.en_cola = [None] * n  # nodo -> su entrada vigente en la cola
+        self.km = 0
+        self.inicio = None   # Inicio con el que se calcularon las claves
+        self.expandidos = 0  # Nodos sacados de la cola desde la creación
+
+    def _posicion(self, indice):
+        i, j = divmod(indice, self.w)
+        return (i - 1, j - 1)
+
+    def _h(self, a, b):
+        ai, aj = divmod(a, self.w)
+        bi, bj = divmod(b, self.w)
+        return abs(ai - bi) + abs(aj - bj)
+
+    def _actualizar_vertice(self, nodo):
+        g, rhs = self.g[nodo], self.rhs[nodo]
+        if g != rhs:
+            minimo = min(g, rhs)
+            entrada = (minimo + self._h(self.inicio, nodo) + self.km, minimo, nodo)
+            self.en_cola[nodo] = entrada
+            heapq.heappush(self.cola, entrada)
+        else:
+            self.en_cola[nodo] = None
+
+    def _rhs_desde_sucesores(self, nodo):
+        # Las paredes no tienen aristas (mascara 0), así que quedan en INF
+        g = self.g
+        return 1 + min((g[nodo + d] for d, _, _, _ in self.grafo.aristas[self.grafo.mascara[nodo]]),
+                       default=INF)
+
+    def _calcular_ruta_mas_corta(self):
+        g, rhs, cola, en_cola = self.g, self.rhs, self.cola, self.en_cola
+        mascara, aristas, celdas = self.grafo.mascara, self.grafo.aristas, self.celdas
+        w, km, inicio, objetivo = self.w, self.km, self.inicio, self.objetivo
+        si, sj = divmod(inicio, w)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expandidos = 0
+        while cola:
+            entrada = cola[0]
+            if en_cola[entrada[2]] is not entrada:
+                heappop(cola)  # Obsoleta: el nodo se volvió a encolar o ya es consistente
+                continue
+            k1, k2, u = entrada
+            # Para si la cima no es menor que la clave del inicio (su h es 0) y
+            # el inicio es consistente. Las claves se comparan sin armar tuplas
+            g_s, rhs_s = g[inicio], rhs[inicio]
+            minimo = g_s if g_s < rhs_s else rhs_s
+            if rhs_s <= g_s and (k1 > minimo + km or (k1 == minimo + km and k2 >= minimo)):
+                break
+
+            heappop(cola)
+            expandidos += 1
+            ui, uj = divmod(u, w)
+            g_u, rhs_u = g[u], rhs[u]
+            minimo = g_u if g_u < rhs_u else rhs_u
+            k1_nueva = minimo + abs(ui - si) + abs(uj - sj) + km
+            if k1 < k1_nueva or (k1 == k1_nueva and k2 < minimo):
+                entrada = (k1_nueva, minimo, u)
+                en_cola[u] = entrada
+                heappush(cola, entrada)
+                continue
+
+            en_cola[u] = None
+            if g_u > rhs_u:
+                # Sobreconsistente: se fija g y se propaga a los predecesores
+                # (el objetivo nunca mejora: su rhs es 0)
+                g[u] = rhs_u
+                nuevo = rhs_u + 1
+                for d, di, dj, _ in aristas[mascara[u]]:
+                    p = u + d
+                    if nuevo < rhs[p]:
+                        rhs[p] = nuevo
+                        g_p = g[p]
+                        if g_p != nuevo:
+                            minimo = g_p if g_p < nuevo else nuevo
+                            entrada = (minimo + abs(ui + di - si) + abs(uj + dj - sj) + km, minimo, p)
+                            en_cola[p] = entrada
+                            heappush(cola, entrada)
+                        else:
+                            en_cola[p] = None
+            else:
+                # Subconsistente: se invalida g y se recalculan u y sus predecesores
+                # (u puede ser una pared recién puesta, sin aristas en el grafo)
+                g[u] = INF
+                if u != objetivo:
+                    rhs[u] = self._rhs_desde_sucesores(u)
+                    self._actualizar_vertice(u)
+                for d in self.grafo.desplazamientos:
+                    p = u + d
+                    if p == objetivo or celdas[p]:
+                        continue
+                    if rhs[p] == g_u + 1:
+                        rhs[p] = self._rhs_desde_sucesores(p)
+                    self._actualizar_vertice(p)
+        self.expandidos += expandidos
+
+    def cambiar_celda(self, pos, pared):
+        """Pone (pared=1) o quita (pared=0) una pared y repara el plan"""
+        v = self.grafo.indice(pos)
+        if v == self.objetivo or self.celdas[v] == pared:
+            return
+        self.grafo.poner_pared(pos, pared)
+
+        # Cambian las aristas de v con sus vecinos: se recalcula rhs en ambos extremos
+        for u in (v,) + tuple(v + d for d in self.grafo.desplazamientos):
+            if u == self.objetivo or (self.celdas[u] and u != v):
+                continue
+            self.rhs[u] = self._rhs_desde_sucesores(u)
+            if self.inicio is not None:
+                self._actualizar_vertice(u)
+
+    def ruta(self, inicio):
+        """Camino más corto desde inicio hasta el objetivo ([] si no hay)"""
+        if not (0 <= inicio[0] < self.alto and 0 <= inicio[1] < self.ancho):
+            return []
+        s = self.grafo.indice(inicio)
+        if self.celdas[s] or self.celdas[self.objetivo]:
+            return []
+
+        if self.inicio is None:
+            # Primera llamada: la búsqueda arranca en el objetivo. Con todo g en
+            # INF, es el único nodo con rhs finito y por tanto el único inconsistente
+            self.inicio = s
+            self._actualizar_vertice(self.objetivo)
+        elif s != self.inicio:
+            # km mantiene las claves de la cola como cotas inferiores al mover el inicio
+            self.km += self._h(self.inicio, s)
+            self.inicio = s
+        self._calcular_ruta_mas_corta()
+
+        # Al terminar, rhs(inicio) es la distancia exacta (g puede no estar fijado)
+        if self.rhs[s] == INF:
+            return []
+        g, mascara, aristas = self.g, self.grafo.mascara, self.grafo.aristas
+        camino = [self._posicion(s)]
+        while s != self.objetivo:
+            s = min((s + d for d, _, _, _ in aristas[mascara[s]]), key=g.__getitem__)
+            camino.append(self._posicion(s))
+        return camino
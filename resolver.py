@@ -0,0 +1,216 @@
+"""Resolución sin interfaz: laberintos de archivo y consultas por la entrada estándar.
+
+    python resolver.py nivel.txt otro.lab --motor astar < consultas.txt
+
+Cada línea de la entrada es una consulta y produce una línea JSON en la
+salida, en el mismo orden y en cuanto se resuelve, así que sirve dentro de
+una tubería:
+
+    3 4 10 12            de (3, 4) a (10, 12) en el primer laberinto
+    3 4                  de (3, 4) a la 'O' del archivo
+    otro.lab 0 0 5 5     en el laberinto con ese nombre (ruta o nombre base)
+    {"laberinto": "otro.lab", "inicio": [0, 0], "objetivo": [5, 5]}
+
+    {"consulta": 1, "laberinto": "nivel.txt", "inicio": [3, 4], "objetivo": [10, 12],
+     "camino": [[3, 4], ...], "pasos": 15}
+
+Motores: 'astar' (4 vecinos, el A* de nucleo_laberinto), 'solve' y 'jps'
+(8 vecinos, los de motor_astar que usa "laberinto real.py"; añaden "costo").
+Con --bidireccional, 'astar' y 'solve' buscan desde los dos extremos.
+
+Para que arrancar el proceso sea barato no se importa tkinter ni, salvo para
+abrir un .lab, numpy: los archivos ASCII (mismos símbolos que
+formato_laberinto) se leen con la biblioteca estándar y cada módulo se
+importa solo cuando hace falta.
+"""
+import argparse
+import json
+import os
+import sys
+
+# Como formato_laberinto.SIMBOLOS, que no se importa para no cargar numpy
+PAREDES = str.maketrans({'#': '\x01', '.': '\x00', 'J': '\x00', 'I': '\x00', 'O': '\x00'})
+MOTORES = ('astar', 'solve', 'jps')
+
+
+class MapaPlano:
+    """Cuadrícula aplanada con borde (como celdas_con_borde) y posiciones del archivo"""
+
+    def __init__(self, nombre, alto, ancho, celdas, posiciones):
+        self.nombre = nombre
+        self.alto = alto
+        self.ancho = ancho
+        self.celdas = celdas          # bytes de (alto + 2) * (ancho + 2), 1 = pared
+        self.posiciones = posiciones  # 'J', 'I', 'O' -> (fila, columna)
+        self._filas = None
+        self._grafos = {}
+
+    def filas(self):
+        """Lista de listas 0/1 sin borde, el formato de motor_astar (se crea al usarse)"""
+        if self._filas is None:
+            w = self.ancho + 2
+            self._filas = [list(self.celdas[(i + 1) * w + 1:(i + 1) * w + 1 + self.ancho])
+                           for i in range(self.alto)]
+        return self._filas
+
+    def grafo(self, diagonales=False):
+        """GrafoCuadricula de 4 (u 8) vecinos, compartido por todas las consultas"""
+        if diagonales not in self._grafos:
+            from busqueda import MOVIMIENTOS_4, MOVIMIENTOS_8, GrafoCuadricula
+            self._grafos[diagonales] = GrafoCuadricula(
+                self.celdas, self.ancho, MOVIMIENTOS_8 if diagonales else MOVIMIENTOS_4)
+        return self._grafos[diagonales]
+
+    def pared(self, pos):
+        return self.celdas[(pos[0] + 1) * (self.ancho + 2) + pos[1] + 1]
+
+
+def leer_ascii(ruta):
+    """Lee un laberinto de texto sin numpy; J, I y O son opcionales"""
+    with open(ruta, encoding='utf-8') as f:
+        lineas = [linea.rstrip('\r\n') for linea in f if linea.strip()]
+    if not lineas or len({len(linea) for linea in lineas}) != 1:
+        raise ValueError(f"{ruta}: todas las filas deben tener el mismo largo")
+
+    ancho = len(lineas[0])
+    borde = b'\x01'
+    filas = [borde * (ancho + 2)]
+    posiciones = {}
+    for i, linea in enumerate(lineas):
+        fila = linea.translate(PAREDES)
+        desconocidos = set(fila) - {'\x00', '\x01'}
+        if desconocidos:
+            raise ValueError(f"{ruta}:{i + 1}: símbolo desconocido {min(desconocidos)!r}")
+        for simbolo in 'JIO':
+            j = linea.find(simbolo)
+            if j >= 0:
+                if simbolo in posiciones or linea.find(simbolo, j + 1) >= 0:
+                    raise ValueError(f"{ruta}: '{simbolo}' aparece más de una vez")
+                posiciones[simbolo] = (i, j)
+        filas.append(borde + fila.encode('latin-1') + borde)
+    filas.append(borde * (ancho + 2))
+    return MapaPlano(ruta, len(lineas), ancho, b''.join(filas), posiciones)
+
+
+def leer_lab(ruta):
+    """Lee un .lab; es el único caso que necesita numpy (formato_laberinto)"""
+    from formato_laberinto import abrir
+    from nucleo_laberinto import celdas_con_borde
+
+    archivo = abrir(ruta)
+    posiciones = {simbolo: pos for simbolo, pos in
+                  (('J', archivo.jugador), ('I', archivo.ia), ('O', archivo.objetivo))
+                  if pos is not None}
+    return MapaPlano(ruta, archivo.alto, archivo.ancho,
+                     celdas_con_borde(archivo.region(0, archivo.alto, 0, archivo.ancho)),
+                     posiciones)
+
+
+def leer_mapa(ruta):
+    return leer_lab(ruta) if ruta.endswith('.lab') else leer_ascii(ruta)
+
+
+def leer_consulta(linea, mapas, primero):
+    """(mapa, inicio, objetivo) de una línea de texto o JSON"""
+    if linea.startswith('{'):
+        datos = json.loads(linea)
+        nombre = datos.get('laberinto')
+        inicio = datos['inicio']
+        objetivo = datos.get('objetivo')
+    else:
+        partes = linea.split()
+        nombre = None
+        if partes and not partes[0].lstrip('-').isdigit():
+            nombre, partes = partes[0], partes[1:]
+        if len(partes) not in (2, 4):
+            raise ValueError("se esperaba 'fila columna [fila columna]'")
+        numeros = [int(parte) for parte in partes]
+        inicio, objetivo = numeros[:2], numeros[2:] or None
+
+    mapa = primero if nombre is None else mapas.get(nombre)
+    if mapa is None:
+        raise ValueError(f"laberinto desconocido: {nombre}")
+    if objetivo is None:
+        if 'O' not in mapa.posiciones:
+            raise ValueError(f"{mapa.nombre} no tiene objetivo 'O'")
+        objetivo = mapa.posiciones['O']
+    inicio, objetivo = (int(inicio[0]), int(inicio[1])), (int(objetivo[0]), int(objetivo[1]))
+    for pos in (inicio, objetivo):
+        if not (0 <= pos[0] < mapa.alto and 0 <= pos[1] < mapa.ancho):
+            raise ValueError(f"{pos} está fuera de {mapa.alto}x{mapa.ancho}")
+        if mapa.pared(pos):
+            raise ValueError(f"{pos} es una pared")
+    return mapa, inicio, objetivo
+
+
+def resolver(mapa, inicio, objetivo, motor, bidireccional=False):
+    """Campos de la respuesta JSON para una consulta ya validada"""
+    if motor == 'astar':
+        from busqueda import astar_bidireccional, astar_celdas
+        buscar = astar_bidireccional if bidireccional else astar_celdas
+        camino = buscar(mapa.celdas, mapa.ancho, inicio, objetivo, mapa.grafo())
+        return {'camino': camino, 'pasos': len(camino) - 1 if camino else None}
+
+    from motor_astar import METHODS
+    if motor == 'solve':
+        motor = 'bidirectional' if bidireccional else 'astar'
+    resultado = METHODS[motor](mapa.filas(), inicio, objetivo, graph=mapa.grafo(diagonales=True))
+    return {'camino': resultado.path, 'pasos': len(resultado.path) - 1 if resultado.found else None,
+            'costo': resultado.cost}
+
+
+def procesar(entrada, salida, mapas, primero, motor, bidireccional=False):
+    """Responde cada línea de entrada con una línea JSON; devuelve cuántas fallaron"""
+    errores = consulta = 0
+    for linea in entrada:
+        linea = linea.strip()
+        if not linea or linea.startswith('#'):
+            continue
+        consulta += 1
+        try:
+            mapa, inicio, objetivo = leer_consulta(linea, mapas, primero)
+            respuesta = {'consulta': consulta, 'laberinto': mapa.nombre,
+                         'inicio': inicio, 'objetivo': objetivo}
+            respuesta.update(resolver(mapa, inicio, objetivo, motor, bidireccional))
+        except (ValueError, KeyError, IndexError, TypeError) as error:
+            errores += 1
+            respuesta = {'consulta': consulta, 'error': str(error)}
+        salida.write(json.dumps(respuesta, separators=(',', ':')) + '\n')
+        # Cada respuesta sale al momento: quien lee puede ir enviando consultas
+        salida.flush()
+    return errores
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Resuelve consultas 'fila columna [fila columna]' de stdin y escribe JSON-lines")
+    parser.add_argument('laberintos', nargs='+', help="archivos .txt (ASCII) o .lab")
+    parser.add_argument('--motor', choices=MOTORES, default='astar',
+                        help="astar: 4 vecinos; solve y jps: 8 vecinos (motor_astar)")
+    parser.add_argument('--bidireccional', action='store_true',
+                        help="buscar desde los dos extremos (astar y solve)")
+    args = parser.parse_args(argumentos)
+    if args.bidireccional and args.motor == 'jps':
+        parser.error("--bidireccional no está disponible con --motor jps")
+
+    mapas = {}
+    try:
+        for ruta in args.laberintos:
+            mapas[ruta] = leer_mapa(ruta)
+            mapas.setdefault(os.path.basename(ruta), mapas[ruta])
+    except (OSError, ValueError) as error:
+        parser.exit(2, f"resolver: {error}\n")
+    primero = mapas[args.laberintos[0]]
+
+    try:
+        errores = procesar(sys.stdin, sys.stdout, mapas, primero, args.motor, args.bidireccional)
+    except BrokenPipeError:
+        # El lector cerró la tubería (por ejemplo, head): no es un error, pero
+        # la salida se redirige para que el cierre del intérprete no falle
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
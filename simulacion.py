@@ -0,0 +1,163 @@
+"""Simulación sin interfaz de partidas jugador contra IA.
+
+Reproduce las reglas de JuegoLaberinto (la IA avanza un paso por su ruta A*
+cada cierto número de ticks, el jugador mueve en cada tick y la partida acaba
+cuando alguien llega al objetivo o la IA atrapa al jugador) sin tkinter ni
+relojes reales, para ajustar bloques y velocidad de la IA jugando miles de
+partidas por segundo.
+
+Uso: python simulacion.py --partidas 10000 --bloques 40 --ticks-ia 3
+"""
+import argparse
+import json
+import random
+import time
+
+from nucleo_laberinto import ALTO, ANCHO, DIRECCIONES, GENERADORES, Laberinto
+
+
+def jugador_aleatorio(laberinto, rng):
+    """Elige al azar entre los movimientos que no chocan con una pared"""
+    posibles = [d for d in DIRECCIONES
+                if laberinto.mover(laberinto.jugador, d) != laberinto.jugador]
+    return rng.choice(posibles) if posibles else None
+
+
+def jugador_optimo(laberinto, rng):
+    """Sigue su ruta A* hasta el objetivo, como la ruta verde del juego"""
+    ruta = laberinto.ruta(laberinto.jugador)
+    if len(ruta) < 2:
+        return None
+    paso = (ruta[1][0] - ruta[0][0], ruta[1][1] - ruta[0][1])
+    return next(d for d, delta in DIRECCIONES.items() if delta == paso)
+
+
+JUGADORES = {
+    'aleatorio': jugador_aleatorio,
+    'optimo': jugador_optimo,
+}
+
+
+def fin_de_partida(laberinto):
+    """Mismo orden de comprobaciones que JuegoLaberinto.verificar_fin_juego"""
+    if laberinto.jugador == laberinto.objetivo:
+        return 'jugador'
+    if laberinto.ia == laberinto.objetivo:
+        return 'ia'
+    if laberinto.jugador == laberinto.ia:
+        return 'captura'
+    return None
+
+
+def jugar_partida(laberinto, politica, rng, ticks_ia=3, max_ticks=1000):
+    """Juega una partida y devuelve (resultado, ticks jugados).
+
+    En cada tick mueve el jugador según politica(laberinto, rng), que devuelve
+    una tecla de DIRECCIONES o None; la IA avanza un paso cada ticks_ia ticks.
+    El resultado es 'jugador', 'ia', 'captura' o 'empate' si se agotan los ticks.
+    """
+    for tick in range(1, max_ticks + 1):
+        direccion = politica(laberinto, rng)
+        if direccion is not None:
+            laberinto.jugador = laberinto.mover(laberinto.jugador, direccion)
+            resultado = fin_de_partida(laberinto)
+            if resultado:
+                return resultado, tick
+
+        if tick % ticks_ia == 0:
+            # Se pide la ruta en cada paso; al avanzar por ella sale de la caché
+            laberinto.ruta_ia = laberinto.ruta(laberinto.ia)
+            if len(laberinto.ruta_ia) > 1:
+                laberinto.ia = laberinto.ruta_ia[1]
+                resultado = fin_de_partida(laberinto)
+                if resultado:
+                    return resultado, tick
+
+    return 'empate', max_ticks
+
+
+class EstadisticasSimulacion:
+    """Acumula resultados, duraciones y tiempos de una tanda de partidas"""
+
+    def __init__(self):
+        self.resultados = {'jugador': 0, 'ia': 0, 'captura': 0, 'empate': 0}
+        self.duraciones = []
+        self.segundos_generacion = 0.0
+        self.segundos_juego = 0.0
+        self.aciertos_cache = 0
+        self.consultas_cache = 0
+
+    @property
+    def partidas(self):
+        return len(self.duraciones)
+
+    @property
+    def ticks(self):
+        return sum(self.duraciones)
+
+    def resumen(self):
+        partidas = max(self.partidas, 1)
+        ticks = max(self.ticks, 1)
+        total = self.segundos_generacion + self.segundos_juego
+        return {
+            'partidas': self.partidas,
+            'ticks': self.ticks,
+            'victorias_jugador': self.resultados['jugador'] / partidas,
+            'victorias_ia': (self.resultados['ia'] + self.resultados['captura']) / partidas,
+            'capturas': self.resultados['captura'] / partidas,
+            'empates': self.resultados['empate'] / partidas,
+            'duracion_media': self.ticks / partidas,
+            'duracion_max': max(self.duraciones, default=0),
+            'us_por_tick': self.segundos_juego / ticks * 1e6,
+            'ms_generacion': self.segundos_generacion / partidas * 1e3,
+            'aciertos_cache_rutas': self.aciertos_cache / max(self.consultas_cache, 1),
+            'partidas_por_segundo': self.partidas / total if total else 0.0,
+        }
+
+
+def simular(partidas, num_bloques=10, generador='aleatorio', jugador='aleatorio',
+            ticks_ia=3, max_ticks=1000, semilla=None, alto=ALTO, ancho=ANCHO):
+    """Juega partidas independientes y devuelve sus EstadisticasSimulacion.
+
+    jugador es un nombre de JUGADORES o una función politica(laberinto, rng).
+    Con la misma semilla se obtienen exactamente las mismas partidas.
+    """
+    politica = JUGADORES[jugador] if isinstance(jugador, str) else jugador
+    rng = random.Random(semilla)
+    estadisticas = EstadisticasSimulacion()
+
+    for _ in range(partidas):
+        inicio = time.perf_counter()
+        laberinto = Laberinto(num_bloques, generador, rng, alto, ancho)
+        medio = time.perf_counter()
+        resultado, ticks = jugar_partida(laberinto, politica, rng, ticks_ia, max_ticks)
+        fin = time.perf_counter()
+
+        estadisticas.segundos_generacion += medio - inicio
+        estadisticas.segundos_juego += fin - medio
+        estadisticas.resultados[resultado] += 1
+        estadisticas.duraciones.append(ticks)
+        cache = laberinto.cache_rutas
+        estadisticas.aciertos_cache += cache.aciertos
+        estadisticas.consultas_cache += cache.aciertos + cache.fallos
+
+    return estadisticas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula partidas del laberinto sin interfaz")
+    parser.add_argument('--partidas', type=int, default=1000)
+    parser.add_argument('--bloques', type=int, default=10)
+    parser.add_argument('--generador', choices=GENERADORES, default='aleatorio')
+    parser.add_argument('--jugador', choices=JUGADORES, default='aleatorio')
+    parser.add_argument('--ticks-ia', type=int, default=3,
+                        help="ticks del jugador por cada paso de la IA")
+    parser.add_argument('--max-ticks', type=int, default=1000)
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--alto', type=int, default=ALTO)
+    parser.add_argument('--ancho', type=int, default=ANCHO)
+    args = parser.parse_args()
+
+    estadisticas = simular(args.partidas, args.bloques, args.generador, args.jugador,
+                           args.ticks_ia, args.max_ticks, args.semilla, args.alto, args.ancho)
+    print(json.dumps(estadisticas.resumen(), indent=2))
@@ -0,0 +1,179 @@
+"""Cuadrícula de un bit por celda y búsquedas bit-paralelas sobre ella.
+
+Las celdas libres se guardan en un entero de Python (precisión arbitraria): la
+celda (i, j) es el bit i * (ancho + 1) + j. La columna extra de cada fila
+siempre vale 0 y evita que un desplazamiento pase de una fila a la siguiente.
+Así, moverse a izquierda/derecha es desplazar 1 bit, arriba/abajo es desplazar
+ancho + 1, y expandir toda la frontera de una búsqueda cuesta unas pocas
+operaciones sobre enteros grandes, hechas en C palabra a palabra.
+
+Además, la inundación rellena de una vez los tramos horizontales hacia la
+derecha con una suma: en (libres + frontera) el acarreo recorre cada tramo de
+celdas libres desde la semilla hasta la primera pared.
+"""
+import numpy as np
+
+from busqueda import GrafoCuadricula
+
+# Una vuelta bit-paralela cuesta más o menos lo que visitar una celda en Python
+# por cada BITS_POR_CELDA bits de la ventana; si la región crece menos que eso
+# durante VUELTAS_LENTAS vueltas seguidas, se pasa a la búsqueda celda a celda.
+BITS_POR_CELDA = 4096
+VUELTAS_LENTAS = 8
+
+
+class TableroBits:
+    """Celdas libres de una cuadrícula como bits de un entero"""
+
+    def __init__(self, libres, alto, ancho):
+        self.libres = libres
+        self.alto = alto
+        self.ancho = ancho
+        self.paso = ancho + 1  # Bits por fila (incluye la columna de guarda)
+        self.vueltas = 0
+        self.celda_a_celda = False
+
+    @classmethod
+    def desde_grid(cls, grid):
+        """Construye el tablero desde una matriz (0 = libre, distinto de 0 = pared)"""
+        grid = np.asarray(grid)
+        alto, ancho = grid.shape
+        bits = np.zeros((alto, ancho + 1), dtype=bool)
+        bits[:, :ancho] = grid == 0
+        datos = np.packbits(bits.ravel(), bitorder='little').tobytes()
+        return cls(int.from_bytes(datos, 'little'), alto, ancho)
+
+    @property
+    def nbytes(self):
+        """Bytes que ocupan los bits de la cuadrícula"""
+        return (self.libres.bit_length() + 7) // 8
+
+    def bit(self, pos):
+        return 1 << (pos[0] * self.paso + pos[1])
+
+    def es_libre(self, pos):
+        return (0 <= pos[0] < self.alto and 0 <= pos[1] < self.ancho and
+                bool(self.libres >> (pos[0] * self.paso + pos[1]) & 1))
+
+    def vecinos(self, mascara):
+        """Celdas libres adyacentes (4 vecinos) a alguna celda de mascara, sin incluirla"""
+        paso = self.paso
+        return ((mascara << 1) | (mascara >> 1) | (mascara << paso) | (mascara >> paso)) & self.libres & ~mascara
+
+    def inundar(self, origen, destino=None, grafo=None):
+        """Máscara de las celdas alcanzables desde origen (para antes si llega a destino).
+
+        Cada vuelta expande la región un paso en las cuatro direcciones y
+        rellena los tramos hacia la derecha, operando solo sobre los bits por
+        debajo de la fila siguiente a la región. En pasillos de una celda de
+        ancho la región crece muy poco por vuelta; si eso se mantiene, se
+        termina con una búsqueda celda a celda desde la frontera, sobre grafo
+        (el GrafoCuadricula de 4 vecinos de la misma cuadrícula) si se da.
+        """
+        if not self.es_libre(origen):
+            return 0
+        libres, paso = self.libres, self.paso
+        objetivo = self.bit(destino) if destino is not None else 0
+        region = self.bit(origen)
+        lentas = 0
+        self.vueltas, self.celda_a_celda = 0, False  # Costo de la última inundación
+        while True:
+            self.vueltas += 1
+            ventana = libres & ((1 << (region.bit_length() + paso + 1)) - 1)
+            nueva = (region | (region << 1) | (region >> 1) | (region << paso) | (region >> paso)) & ventana
+            nueva |= ((ventana + nueva) ^ ventana) & ventana
+            if nueva == region or nueva & objetivo:
+                return nueva
+
+            crecimiento = (nueva ^ region).bit_count()
+            lentas = lentas + 1 if crecimiento * BITS_POR_CELDA < ventana.bit_length() else 0
+            if lentas >= VUELTAS_LENTAS:
+                self.celda_a_celda = True
+                return self._completar_celda_a_celda(nueva, nueva ^ region, objetivo, grafo)
+            region = nueva
+
+    def _a_bytes(self, mascara):
+        """Un byte (0 o 1) por bit de la máscara, en el mismo orden"""
+        n = self.alto * self.paso
+        datos = np.frombuffer(mascara.to_bytes((n + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(datos, bitorder='little', count=n)
+
+    def _con_borde(self, mascara):
+        """Como _a_bytes(), pero en el orden de celdas_con_borde() (índices de GrafoCuadricula)"""
+        filas = self._a_bytes(mascara).reshape(self.alto, self.paso)
+        # La columna de guarda hace de borde derecho; faltan el izquierdo, arriba y abajo
+        return np.pad(filas, ((1, 1), (1, 0))).ravel()
+
+    def _completar_celda_a_celda(self, region, frontera, objetivo, grafo=None):
+        """Sigue la inundación con una pila de celdas, partiendo de la frontera"""
+        if grafo is None:
+            grafo = GrafoCuadricula((1 - self._con_borde(self.libres)).tobytes(), self.ancho)
+        visitadas = bytearray(self._con_borde(region).tobytes())
+        destino = grafo.indice(divmod(objetivo.bit_length() - 1, self.paso)) if objetivo else -1
+        pila = np.flatnonzero(self._con_borde(frontera)).tolist()
+        mascara, aristas = grafo.mascara, grafo.aristas
+        while pila:
+            u = pila.pop()
+            for desplazamiento, _, _, _ in aristas[mascara[u]]:
+                v = u + desplazamiento
+                if not visitadas[v]:
+                    visitadas[v] = 1
+                    if v == destino:
+                        pila = []
+                        break
+                    pila.append(v)
+        filas = np.frombuffer(visitadas, dtype=np.uint8).reshape(self.alto + 2, self.paso + 1)[1:-1, 1:]
+        datos = np.packbits(filas, axis=None, bitorder='little')
+        return int.from_bytes(datos.tobytes(), 'little')
+
+    def hay_camino(self, inicio, fin, grafo=None):
+        """Indica si fin es alcanzable desde inicio (grafo, como en inundar())"""
+        return self.es_libre(fin) and bool(self.inundar(inicio, fin, grafo) & self.bit(fin))
+
+    def componente(self, pos):
+        """Máscara de la componente conexa que contiene pos (0 si es pared)"""
+        return self.inundar(pos)
+
+    def componentes(self):
+        """Genera la máscara de cada componente conexa, de la celda más baja a la más alta"""
+        restantes = self.libres
+        while restantes:
+            menor = (restantes & -restantes).bit_length() - 1
+            componente = self.inundar(divmod(menor, self.paso))
+            restantes &= ~componente
+            yield componente
+
+    def capas(self, origen):
+        """Genera las capas de BFS desde origen: la capa d son las celdas a distancia d"""
+        if not self.es_libre(origen):
+            return
+        capa = self.bit(origen)
+        visitadas = capa
+        while capa:
+            yield capa
+            capa = self.vecinos(capa) & ~visitadas
+            visitadas |= capa
+
+    def distancias(self, origen):
+        """Array (alto, ancho) de distancias BFS desde origen; -1 donde no se llega"""
+        distancia = np.full(self.alto * self.paso, -1, dtype=np.int32)
+        for d, capa in enumerate(self.capas(origen)):
+            # Solo se desempaqueta el rango de bits que ocupa la capa
+            inicio = (capa & -capa).bit_length() - 1
+            tramo = capa >> inicio
+            bits = np.unpackbits(np.frombuffer(tramo.to_bytes((tramo.bit_length() + 7) // 8, 'little'),
+                                               dtype=np.uint8), bitorder='little')
+            distancia[inicio + np.flatnonzero(bits)] = d
+        return distancia.reshape(self.alto, self.paso)[:, :self.ancho]
+
+    def callejones(self):
+        """Máscara de las celdas libres con como mucho un vecino libre"""
+        libres, paso = self.libres, self.paso
+        a, b, c, d = libres >> 1, libres << 1, libres >> paso, libres << paso
+        dos_o_mas = (a & b) | (a & c) | (a & d) | (b & c) | (b & d) | (c & d)
+        return libres & ~dos_o_mas
+
+    def a_array(self, mascara):
+        """Convierte una máscara en un array booleano (alto, ancho)"""
+        bits = self._a_bytes(mascara)
+        return bits.reshape(self.alto, self.paso)[:, :self.ancho].astype(bool)
@@ -0,0 +1,115 @@
+"""Terreno con costos enteros pequeños y caminos más cortos con cola de cubetas.
+
+Cada celda libre tiene un costo de entrada de 1 a 255 (uint8, con la forma de
+Laberinto.grid). Como los costos son enteros acotados, la lista abierta puede
+ser un arreglo circular de cubetas indexado por f (algoritmo de Dial) en vez
+de un heap: meter y sacar cuestan O(1) y no se comparan tuplas.
+"""
+import numpy as np
+
+from busqueda import _espacio_busqueda
+from nucleo_laberinto import pesos_con_borde
+
+# Costo de entrar en cada tipo de celda
+TERRENOS = {'camino': 1, 'tierra': 2, 'barro': 5}
+PROPORCIONES = {'camino': 0.2, 'tierra': 0.6, 'barro': 0.2}
+
+
+def generar_terreno(alto, ancho, rng, proporciones=PROPORCIONES, tam_parche=4):
+    """Costos por celda en parches de tam_parche x tam_parche del mismo tipo"""
+    tipos = list(proporciones)
+    probabilidades = np.array([proporciones[t] for t in tipos], dtype=float)
+    costos = np.array([TERRENOS[t] for t in tipos], dtype=np.uint8)
+    generador = np.random.default_rng(rng.getrandbits(64))
+    parches = generador.choice(len(tipos), size=(-(-alto // tam_parche), -(-ancho // tam_parche)),
+                               p=probabilidades / probabilidades.sum())
+    celdas = np.repeat(np.repeat(parches, tam_parche, axis=0), tam_parche, axis=1)
+    return costos[celdas[:alto, :ancho]]
+
+
+def costo_ruta(costos, ruta):
+    """Suma de los costos de las celdas en las que se entra (sin la inicial)"""
+    return int(sum(int(costos[pos]) for pos in ruta[1:]))
+
+
+def dial(laberinto, inicio, objetivo, costos=None, heuristica=True):
+    """Camino de menor costo con cola de cubetas; costos None equivale a todo 1"""
+    if costos is None:
+        costos = np.ones(np.shape(laberinto), dtype=np.uint8)
+    return dial_pesos(pesos_con_borde(laberinto, costos), np.shape(laberinto)[1],
+                      inicio, objetivo, heuristica)
+
+
+def dial_pesos(pesos, ancho, inicio, objetivo, heuristica=True):
+    """Búsqueda con cola de cubetas sobre una cuadrícula aplanada con pesos_con_borde().
+
+    Sin heurística es el algoritmo de Dial (Dijkstra con cubetas). Con ella es
+    A* con h = menor costo * Manhattan: como h es consistente, f nunca baja y
+    cada vecino cae entre f y f + costo máximo + menor costo, así que bastan
+    esas cubetas usadas en círculo. Dentro de una cubeta se saca la última en
+    entrar, que suele ser la más profunda.
+    """
+    w = ancho + 2
+    alto = len(pesos) // w - 2
+    if not (0 <= inicio[0] < alto and 0 <= inicio[1] < ancho and
+            0 <= objetivo[0] < alto and 0 <= objetivo[1] < ancho):
+        return []
+
+    origen = (inicio[0] + 1) * w + inicio[1] + 1
+    destino = (objetivo[0] + 1) * w + objetivo[1] + 1
+    if not pesos[destino]:
+        return []
+    di, dj = divmod(destino, w)
+    costos = set(pesos)
+    costos.discard(0)
+    k = min(costos) if heuristica else 0
+    num_cubetas = max(costos) + k + 1
+
+    espacio = _espacio_busqueda(len(pesos))
+    version, g, padre, sello = espacio.version, espacio.g, espacio.padre, espacio.sello
+
+    f = k * (abs(inicio[0] - objetivo[0]) + abs(inicio[1] - objetivo[1]))
+    sello[origen] = version
+    g[origen] = 0
+    padre[origen] = -1
+    cubetas = [[] for _ in range(num_cubetas)]
+    cubetas[f % num_cubetas].append(origen)
+    pendientes = 1
+
+    while pendientes:
+        cubeta = cubetas[f % num_cubetas]
+        if not cubeta:
+            f += 1
+            continue
+        actual = cubeta.pop()
+        pendientes -= 1
+        i, j = divmod(actual, w)
+        g_actual = g[actual]
+        if g_actual + k * (abs(i - di) + abs(j - dj)) != f:
+            continue  # Entrada obsoleta: el nodo volvió a entrar con un g menor
+
+        if actual == destino:
+            camino = []
+            while actual != -1:
+                i, j = divmod(actual, w)
+                camino.append((i - 1, j - 1))
+                actual = padre[actual]
+            return camino[::-1]
+
+        for vecino, dh in ((actual + 1, -k if j < dj else k),
+                           (actual + w, -k if i < di else k),
+                           (actual - 1, -k if j > dj else k),
+                           (actual - w, -k if i > di else k)):
+            costo = pesos[vecino]
+            if not costo:
+                continue
+            nuevo_g = g_actual + costo
+            if sello[vecino] == version and g[vecino] <= nuevo_g:
+                continue
+            sello[vecino] = version
+            g[vecino] = nuevo_g
+            padre[vecino] = actual
+            cubetas[(f + costo + dh) % num_cubetas].append(vecino)
+            pendientes += 1
+
+    return []
@@ -0,0 +1,64 @@
+"""Cuadrículas aleatorias con semilla y referencias sencillas para las pruebas"""
+import random
+from collections import deque
+
+import numpy as np
+
+from busqueda import astar_celdas
+from nucleo_laberinto import celdas_con_borde
+
+
+def cuadricula(semilla, alto=23, ancho=31, densidad=0.3):
+    """Matriz 0/1 (1 = pared) con paredes al azar"""
+    rng = np.random.default_rng(semilla)
+    return (rng.random((alto, ancho)) < densidad).astype(int)
+
+
+def libres(grid):
+    return [(int(i), int(j)) for i, j in np.argwhere(grid == 0)]
+
+
+def consultas(grid, semilla, n=25):
+    """Pares (inicio, objetivo) de celdas libres al azar"""
+    rng = random.Random(semilla)
+    celdas = libres(grid)
+    return [(rng.choice(celdas), rng.choice(celdas)) for _ in range(n)]
+
+
+def distancias_bfs(grid, origen):
+    """{celda: pasos desde origen} con 4 vecinos, sin nada del repo"""
+    alto, ancho = grid.shape
+    if grid[origen]:
+        return {}
+    distancia = {origen: 0}
+    cola = deque([origen])
+    while cola:
+        i, j = cola.popleft()
+        for v in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+            if 0 <= v[0] < alto and 0 <= v[1] < ancho and not grid[v] and v not in distancia:
+                distancia[v] = distancia[(i, j)] + 1
+                cola.append(v)
+    return distancia
+
+
+def referencia(grid, inicio, objetivo):
+    """Camino de astar_celdas, la referencia de los demás buscadores de 4 vecinos"""
+    return astar_celdas(celdas_con_borde(grid), grid.shape[1], inicio, objetivo)
+
+
+def comprobar(grid, camino, inicio, objetivo, esperado, diagonales=False):
+    """camino va de inicio a objetivo por celdas libres y tiene el largo de esperado.
+
+    Con diagonales solo se comprueba que el camino sea válido.
+    """
+    camino = [tuple(pos) for pos in camino]
+    if not diagonales:
+        assert len(camino) == len(esperado)
+    if not esperado:
+        assert camino == []
+        return
+    assert camino[0] == inicio and camino[-1] == objetivo
+    for (i, j), (k, l) in zip(camino, camino[1:]):
+        assert grid[k, l] == 0
+        di, dj = abs(i - k), abs(j - l)
+        assert di + dj == 1 or (diagonales and di == dj == 1)
@@ -0,0 +1,43 @@
+import pytest
+
+from busqueda import GrafoCuadricula, astar_bidireccional
+from motor_astar import grid_graph, solve, solve_bidirectional
+from nucleo_laberinto import astar, celdas_con_borde
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+SEMILLAS = range(6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('densidad', [0.1, 0.3, 0.45])
+def test_astar_bidireccional(semilla, densidad):
+    grid = cuadricula(semilla, densidad=densidad)
+    celdas, ancho = celdas_con_borde(grid), grid.shape[1]
+    grafo = GrafoCuadricula(celdas, ancho)
+    for inicio, objetivo in consultas(grid, semilla):
+        esperado = referencia(grid, inicio, objetivo)
+        comprobar(grid, astar_bidireccional(celdas, ancho, inicio, objetivo, grafo),
+                  inicio, objetivo, esperado)
+        comprobar(grid, astar(grid, inicio, objetivo, bidireccional=True), inicio, objetivo, esperado)
+
+
+def test_astar_bidireccional_sin_costos():
+    grid = cuadricula(0)
+    with pytest.raises(ValueError):
+        astar(grid, (0, 0), (1, 1), costos=grid + 1, bidireccional=True)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('densidad', [0.1, 0.3, 0.45])
+def test_solve_bidirectional_tiene_el_costo_de_solve(semilla, densidad):
+    grid = cuadricula(semilla, densidad=densidad)
+    maze = grid.tolist()
+    grafo = grid_graph(maze)
+    for inicio, objetivo in consultas(grid, semilla):
+        directo = solve(maze, inicio, objetivo, graph=grafo)
+        resultado = solve_bidirectional(maze, inicio, objetivo, graph=grafo)
+        assert resultado.found == directo.found
+        if directo.found:
+            assert resultado.cost == pytest.approx(directo.cost)
+            comprobar(grid, resultado.path, inicio, objetivo, resultado.path, diagonales=True)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from busqueda import astar_celdas
+from nucleo_laberinto import astar, celdas_con_borde
+
+from .comun import comprobar, consultas, cuadricula, distancias_bfs
+
+SEMILLAS = range(6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_astar_celdas_es_optimo(semilla):
+    grid = cuadricula(semilla)
+    celdas, ancho = celdas_con_borde(grid), grid.shape[1]
+    campos = {}
+    for inicio, objetivo in consultas(grid, semilla):
+        if objetivo not in campos:
+            campos[objetivo] = distancias_bfs(grid, objetivo)
+        pasos = campos[objetivo].get(inicio)
+        camino = astar_celdas(celdas, ancho, inicio, objetivo)
+        if pasos is None:
+            assert camino == []
+        else:
+            assert len(camino) == pasos + 1
+            comprobar(grid, camino, inicio, objetivo, camino)
+        # astar() sobre la matriz da el mismo camino (los empates son deterministas)
+        assert astar(grid, inicio, objetivo) == camino
+
+
+def test_astar_casos_limite():
+    grid = np.array([[0, 1, 0],
+                     [0, 1, 0]])
+    assert astar(grid, (0, 0), (0, 0)) == [(0, 0)]
+    assert astar(grid, (0, 0), (0, 2)) == []   # Separados por una pared
+    assert astar(grid, (0, 0), (0, 1)) == []   # El objetivo es pared
+    assert astar(grid, (0, 0), (5, 0)) == []   # Fuera del mapa
+    assert astar(grid, (0, 0), (1, 0)) == [(0, 0), (1, 0)]
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from cache_rutas import CacheRutas, TramoRuta
+from nucleo_laberinto import Laberinto
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+SEMILLAS = range(6)
+
+
+def test_tramo_ruta_se_usa_como_lista():
+    ruta = [(0, k) for k in range(8)]
+    tramo = TramoRuta(ruta, 3)
+    assert tramo == ruta[3:] and len(tramo) == 5 and list(tramo) == ruta[3:]
+    assert tramo[0] == (0, 3) and tramo[-1] == (0, 7)
+    assert tramo[1:3] == ruta[4:6] and isinstance(tramo[1:3], TramoRuta)
+    assert tramo[::2] == ruta[3::2] and tramo[4:1] == []
+    with pytest.raises(IndexError):
+        tramo[5]
+
+
+def test_desalojo_lru():
+    cache = CacheRutas(max_celdas=10)
+    a, b, c = ([(k, j) for j in range(4)] for k in range(3))
+    cache.guardar(0, a[0], a[-1], a)
+    cache.guardar(0, b[0], b[-1], b)
+    assert cache.buscar(0, a[1], a[-1]) == a[1:]   # a pasa a ser la más reciente
+    cache.guardar(0, c[0], c[-1], c)
+    assert cache.buscar(0, b[0], b[-1]) is None
+    assert cache.buscar(0, a[0], a[-1]) == a and cache.buscar(0, c[2], c[-1]) == c[2:]
+    # Otra versión de la cuadrícula descarta todo
+    assert cache.buscar(1, a[0], a[-1]) is None and cache.celdas == 0
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_laberinto_ruta_con_cache(semilla):
+    grid = cuadricula(semilla)
+    (jugador, objetivo), = consultas(grid, semilla, 1)
+    laberinto = Laberinto.desde_grid(grid, jugador, jugador, objetivo)
+    rng = random.Random(semilla)
+    for inicio, _ in consultas(grid, semilla + 100):
+        esperado = referencia(laberinto.grid, inicio, objetivo)
+        ruta = laberinto.ruta(inicio)
+        comprobar(laberinto.grid, ruta, inicio, objetivo, esperado)
+        # Los aciertos de sufijo devuelven el tramo que queda de la ruta guardada
+        for k in range(1, len(ruta)):
+            assert laberinto.ruta(ruta[k]) == ruta[k:]
+        # Tras un cambio de pared la caché no devuelve rutas viejas
+        if ruta:
+            laberinto.alternar_pared(ruta[len(ruta) // 2])
+        else:
+            laberinto.alternar_pared((rng.randrange(grid.shape[0]), rng.randrange(grid.shape[1])))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import formato_laberinto
+from nucleo_laberinto import etiquetar_componentes
+
+from .comun import cuadricula
+
+
+@pytest.mark.parametrize('alto, ancho', [(23, 31), (8, 16), (1, 1), (40, 9)])
+def test_lab_ida_y_vuelta(tmp_path, alto, ancho):
+    grid = cuadricula(alto * ancho, alto, ancho)
+    jugador, ia, objetivo = (0, 0), (alto - 1, 0), (alto - 1, ancho - 1)
+    ruta = tmp_path / 'nivel.lab'
+    formato_laberinto.guardar(ruta, grid, jugador, ia, objetivo, semilla=42, etiquetas=True)
+
+    archivo = formato_laberinto.abrir(ruta)
+    assert (archivo.alto, archivo.ancho) == (alto, ancho)
+    assert (archivo.jugador, archivo.ia, archivo.objetivo) == (jugador, ia, objetivo)
+    assert archivo.semilla == 42
+    assert archivo.num_bloques == int(grid.sum())
+    np.testing.assert_array_equal(archivo.grid(), grid)
+    np.testing.assert_array_equal(archivo.componentes, etiquetar_componentes(grid))
+    assert [archivo.pared((i, j)) for i in range(alto) for j in range(ancho)] == grid.ravel().tolist()
+    if alto > 2 and ancho > 3:
+        np.testing.assert_array_equal(archivo.region(1, alto - 1, 3, ancho), grid[1:-1, 3:])
+
+
+def test_lab_sin_posiciones_ni_etiquetas(tmp_path):
+    grid = cuadricula(3, 5, 13)
+    ruta = tmp_path / 'mapa.lab'
+    formato_laberinto.guardar(ruta, grid)
+    archivo = formato_laberinto.abrir(ruta)
+    assert (archivo.jugador, archivo.ia, archivo.objetivo, archivo.semilla) == (None,) * 4
+    assert archivo.componentes is None
+    np.testing.assert_array_equal(archivo.grid(), grid)
+
+
+def test_ascii_ida_y_vuelta(tmp_path):
+    grid = cuadricula(5, 9, 14)
+    jugador, ia, objetivo = (0, 0), (8, 0), (8, 13)
+    for pos in (jugador, ia, objetivo):
+        grid[pos] = 0
+    ruta = tmp_path / 'nivel.lab'
+    formato_laberinto.guardar(ruta, grid, jugador, ia, objetivo)
+    laberinto = formato_laberinto.abrir(ruta).laberinto()
+    texto = tmp_path / 'nivel.txt'
+    formato_laberinto.exportar_ascii(texto, laberinto)
+    otra_vez = formato_laberinto.importar_ascii(texto)
+    np.testing.assert_array_equal(otra_vez.grid, grid)
+    assert (otra_vez.jugador, otra_vez.ia, otra_vez.objetivo) == (jugador, ia, objetivo)
@@ -0,0 +1,61 @@
+import math
+import random
+
+import pytest
+
+from busqueda import MOVIMIENTOS_4, MOVIMIENTOS_8, GrafoCuadricula
+from motor_astar import solve, solve_bidirectional
+from nucleo_laberinto import celdas_con_borde
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+SEMILLAS = range(6)
+
+
+def vecinos_libres(grafo, k):
+    """(desplazamiento, costo) de cada vecino libre de k, mirando las celdas"""
+    if grafo.celdas[k]:
+        return []
+    return [(di * grafo.w + dj, math.hypot(di, dj)) for di, dj in grafo.movimientos
+            if not grafo.celdas[k + di * grafo.w + dj]]
+
+
+def comprobar_grafo(grafo):
+    for k in range(grafo.w, len(grafo.celdas) - grafo.w):
+        if k % grafo.w in (0, grafo.w - 1):
+            assert grafo.mascara[k] == 0   # Borde
+            continue
+        aristas = [(d, costo) for d, _, _, costo in grafo.aristas[grafo.mascara[k]]]
+        assert aristas == pytest.approx(vecinos_libres(grafo, k))
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('movimientos', [MOVIMIENTOS_4, MOVIMIENTOS_8])
+def test_mascaras_y_poner_pared(semilla, movimientos):
+    grid = cuadricula(semilla, 17, 21)
+    grafo = GrafoCuadricula(celdas_con_borde(grid), grid.shape[1], movimientos)
+    comprobar_grafo(grafo)
+    rng = random.Random(semilla)
+    for _ in range(40):
+        pos = (rng.randrange(grid.shape[0]), rng.randrange(grid.shape[1]))
+        grid[pos] = 1 - grid[pos]
+        grafo.poner_pared(pos, grid[pos])
+    # Tras los cambios, las mismas máscaras que un grafo nuevo
+    nuevo = GrafoCuadricula(celdas_con_borde(grid), grid.shape[1], movimientos)
+    assert grafo.celdas == nuevo.celdas and grafo.mascara == nuevo.mascara
+    comprobar_grafo(grafo)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_solve_con_grafo_de_4_vecinos(semilla):
+    grid = cuadricula(semilla)
+    maze = grid.tolist()
+    grafo = GrafoCuadricula(celdas_con_borde(grid), grid.shape[1])
+    for inicio, objetivo in consultas(grid, semilla):
+        # Con un grafo de 4 vecinos, solve y solve_bidirectional son A* de 4 vecinos
+        esperado = referencia(grid, inicio, objetivo)
+        for buscar in (solve, solve_bidirectional):
+            resultado = buscar(maze, inicio, objetivo, graph=grafo)
+            comprobar(grid, resultado.path, inicio, objetivo, esperado)
+            if esperado:
+                assert resultado.cost == len(esperado) - 1
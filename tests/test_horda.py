@@ -0,0 +1,109 @@
+import random
+
+import numpy as np
+import pytest
+
+from horda import INALCANZABLE, Horda, campo_distancias
+from nucleo_laberinto import Laberinto, celdas_con_borde
+
+from .comun import cuadricula, distancias_bfs, libres
+
+SEMILLAS = range(5)
+
+
+def laberinto_al_azar(semilla, alto=30, ancho=40, densidad=0.25):
+    grid = cuadricula(semilla, alto, ancho, densidad)
+    rng = random.Random(semilla)
+    jugador, ia, objetivo = rng.sample(libres(grid), 3)
+    return Laberinto.desde_grid(grid, jugador, ia, objetivo, rng=rng)
+
+
+def valor(horda, campo, k):
+    return int(campo[horda.posiciones[k]])
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('densidad', [0.05, 0.3])
+def test_campo_distancias_es_bfs(semilla, densidad):
+    # Con pocas paredes las fronteras pasan de FRONTERA_NUMPY y se usa numpy
+    grid = cuadricula(semilla, 90, 110, densidad)
+    destino = libres(grid)[semilla]
+    campo = campo_distancias(celdas_con_borde(grid), grid.shape[1], destino)
+    esperado = distancias_bfs(grid, destino)
+    w = grid.shape[1] + 2
+    for i in range(grid.shape[0]):
+        for j in range(grid.shape[1]):
+            assert campo[(i + 1) * w + j + 1] == esperado.get((i, j), INALCANZABLE)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_cada_agente_baja_un_escalon(semilla):
+    laberinto = laberinto_al_azar(semilla)
+    horda = Horda(laberinto, 60, 'objetivo', evitar_choques=False)
+    for _ in range(10):
+        campo = horda.campo_actual()
+        antes = [valor(horda, campo, k) for k in range(len(horda))]
+        horda.paso()
+        for k, d in enumerate(antes):
+            # En el destino o sin camino se queda; si no, baja exactamente uno
+            esperado = d if d in (0, INALCANZABLE) else d - 1
+            assert valor(horda, campo, k) == esperado
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('destino', ['jugador', 'objetivo'])
+def test_sin_choques_y_todos_llegan(semilla, destino):
+    laberinto = laberinto_al_azar(semilla)
+    horda = Horda(laberinto, 150, destino)
+    campo = horda.campo_actual()
+    meta = horda._indice(laberinto.jugador if destino == 'jugador' else laberinto.objetivo)
+    inicial = horda.posiciones.copy()
+    alcanzan = campo[inicial] != INALCANZABLE
+    assert len(set(inicial.tolist())) == len(inicial)
+
+    for _ in range(int(campo[inicial[alcanzan]].max()) + len(horda)):
+        horda.paso()
+        fuera = horda.posiciones[horda.posiciones != meta]
+        assert len(np.unique(fuera)) == len(fuera)  # Solo el destino se comparte
+    assert (horda.posiciones[alcanzan] == meta).all()
+    # Los que no tienen camino no se mueven
+    assert (horda.posiciones[~alcanzan] == inicial[~alcanzan]).all()
+
+
+def test_el_campo_sigue_al_jugador():
+    laberinto = laberinto_al_azar(1)
+    horda = Horda(laberinto, 5, 'jugador')
+    campo = horda.campo_actual()
+    assert campo[horda._indice(laberinto.jugador)] == 0
+    laberinto.jugador = next(p for p in libres(laberinto.grid)
+                             if p not in (laberinto.jugador, laberinto.ia, laberinto.objetivo))
+    nuevo = horda.campo_actual()
+    assert nuevo is not campo and nuevo[horda._indice(laberinto.jugador)] == 0
+
+
+def test_campo_calculado_fuera():
+    laberinto = laberinto_al_azar(2)
+    horda = Horda(laberinto, 40, 'jugador', rng=random.Random(2))
+    copia = Horda(laberinto, 40, 'jugador', rng=random.Random(2))
+    anterior = laberinto.jugador
+    campo = campo_distancias(laberinto.celdas_aplanadas(), laberinto.ancho, anterior)
+    horda.usar_campo(anterior, campo)
+    assert horda.campo_al_dia() and horda.campo_de_estas_paredes()
+
+    # Con el jugador movido el campo sigue valiendo para las paredes, no para el destino
+    laberinto.jugador = next(p for p in libres(laberinto.grid)
+                             if p not in (anterior, laberinto.ia, laberinto.objetivo))
+    assert not horda.campo_al_dia() and horda.campo_de_estas_paredes()
+    horda.paso(horda.campo)
+    copia.paso(campo)
+    np.testing.assert_array_equal(horda.posiciones, copia.posiciones)
+
+    # Con otra pared ya no sirve
+    laberinto.alternar_pared(next(p for p in libres(laberinto.grid)
+                                  if p not in (laberinto.jugador, laberinto.ia, laberinto.objetivo)))
+    assert not horda.campo_de_estas_paredes()
+
+
+def test_destino_desconocido():
+    with pytest.raises(ValueError):
+        Horda(laberinto_al_azar(0), 3, 'salida')
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from jerarquico import MapaJerarquico
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+SEMILLAS = range(6)
+
+
+def comprobar_casi_optimo(grid, camino, inicio, objetivo):
+    """HPA* encuentra camino justo cuando existe, válido y nunca más corto que el óptimo"""
+    esperado = referencia(grid, inicio, objetivo)
+    assert bool(camino) == bool(esperado)
+    if esperado:
+        assert len(camino) >= len(esperado)
+        comprobar(grid, camino, inicio, objetivo, camino)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_ruta_casi_optima(semilla):
+    grid = cuadricula(semilla, 70, 90)
+    mapa = MapaJerarquico(grid, tam_cluster=8)
+    for inicio, objetivo in consultas(grid, semilla):
+        comprobar_casi_optimo(grid, mapa.ruta(inicio, objetivo), inicio, objetivo)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_cambiar_celda(semilla):
+    grid = cuadricula(semilla, 30, 40, densidad=0.25)
+    rng = random.Random(semilla)
+    mapa = MapaJerarquico(grid, tam_cluster=6)
+    pares = consultas(grid, semilla, 40)
+    for inicio, objetivo in pares:
+        mapa.ruta(inicio, objetivo)   # deja aristas internas y tramos en caché
+    for k in range(40):
+        pos = (rng.randrange(grid.shape[0]), rng.randrange(grid.shape[1]))
+        grid[pos] = 1 - grid[pos]
+        mapa.cambiar_celda(pos, int(grid[pos]))
+        # Tras cada cambio, lo mismo que un mapa construido desde cero
+        nuevo = MapaJerarquico(grid, tam_cluster=6)
+        for inicio, objetivo in pares[k % 4::4]:
+            if grid[inicio] or grid[objetivo]:
+                assert mapa.ruta(inicio, objetivo) == []
+                continue
+            camino = list(mapa.refinar(mapa.ruta_abstracta(inicio, objetivo)))
+            comprobar_casi_optimo(grid, camino, inicio, objetivo)
+            assert len(camino) == len(nuevo.ruta(inicio, objetivo))
@@ -0,0 +1,15 @@
+import pytest
+
+from lote import resolver_lote
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+
+@pytest.mark.parametrize('procesos', [1, 2])
+def test_resolver_lote(procesos):
+    grid = cuadricula(7, 60, 45)
+    pares = consultas(grid, 7, 80)
+    resultados = dict(resolver_lote(grid, pares, procesos=procesos, tam_bloque=16))
+    assert sorted(resultados) == list(range(len(pares)))
+    for indice, (inicio, objetivo) in enumerate(pares):
+        comprobar(grid, resultados[indice], inicio, objetivo, referencia(grid, inicio, objetivo))
@@ -0,0 +1,22 @@
+import pytest
+
+from motor_astar import grid_graph, solve, solve_jps
+
+from .comun import comprobar, consultas, cuadricula
+
+SEMILLAS = range(6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('densidad', [0.1, 0.3])
+def test_jps_tiene_el_costo_de_astar(semilla, densidad):
+    grid = cuadricula(semilla, densidad=densidad)
+    maze = grid.tolist()
+    grafo = grid_graph(maze)
+    for inicio, objetivo in consultas(grid, semilla):
+        astar = solve(maze, inicio, objetivo, graph=grafo)
+        jps = solve_jps(maze, inicio, objetivo)
+        assert jps.found == astar.found
+        if astar.found:
+            assert jps.cost == pytest.approx(astar.cost)
+            comprobar(grid, jps.path, inicio, objetivo, jps.path, diagonales=True)
@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from horda import campo_distancias
+from nucleo_laberinto import celdas_con_borde
+from planificacion import PlanificadorAsincrono, ReservaNiveles
+
+from .comun import cuadricula, libres
+
+
+class CrearLento:
+    """crear() de prueba: tarda lo que diga la configuración y cuenta las llamadas simultáneas"""
+
+    def __init__(self):
+        self.simultaneas = self.maximo = 0
+        self.llamadas = []
+        self.cerrojo = threading.Lock()
+
+    def __call__(self, segundos):
+        if segundos < 0:
+            raise ValueError(segundos)
+        with self.cerrojo:
+            self.llamadas.append(segundos)
+            self.simultaneas += 1
+            self.maximo = max(self.maximo, self.simultaneas)
+        time.sleep(segundos)
+        with self.cerrojo:
+            self.simultaneas -= 1
+        return segundos
+
+
+def test_acierto_y_reposicion():
+    crear = CrearLento()
+    reserva = ReservaNiveles(crear, capacidad=2)
+    reserva.preparar(0.01)
+    assert reserva.tomar(0.01).result(timeout=5) == 0.01
+    time.sleep(0.2)
+    pedido = reserva.tomar(0.01)
+    assert pedido.done() and reserva.estadisticas()['aciertos'] == 1
+    reserva.cerrar()
+
+
+def test_cambios_rapidos_no_acumulan_generaciones():
+    # Como cambiar el tamaño 2000 -> 1000 -> 2000 -> 500 mientras se genera el primero
+    crear = CrearLento()
+    reserva = ReservaNiveles(crear, capacidad=1)
+    primero = reserva.tomar(0.6)
+    time.sleep(0.05)
+    pedidos = [reserva.tomar(c) for c in (0.4, 0.6, 0.3, 0.5, 0.02)]
+    final = pedidos[-1]
+    assert final.result(timeout=5) == 0.02
+    # Solo el hilo de reposición y el auxiliar: nunca más de dos a la vez
+    assert crear.maximo <= 2
+    assert all(p.cancelled() or p.done() for p in pedidos[:-1])
+    assert sum(not p.cancelled() for p in pedidos[:-1]) <= 1   # El que llegó a empezar
+    assert primero.cancelled()
+    reserva.cerrar()
+    assert crear.simultaneas == 0
+
+
+def test_el_error_de_crear_llega_al_pedido():
+    reserva = ReservaNiveles(CrearLento())
+    with pytest.raises(ValueError):
+        reserva.tomar(-0.01).result(timeout=5)
+    reserva.cerrar()
+
+
+def test_campo_de_la_horda_en_el_hilo():
+    grid = cuadricula(4, 40, 50)
+    rng = random.Random(4)
+    planificador = PlanificadorAsincrono()
+    planificador.reiniciar(grid, libres(grid)[0])
+    for _ in range(6):
+        # Cambios de pared y varios pedidos seguidos: llega el campo del último
+        for _ in range(3):
+            pos = (rng.randrange(grid.shape[0]), rng.randrange(grid.shape[1]))
+            grid[pos] = 1 - grid[pos]
+            planificador.cambiar_celda(pos, int(grid[pos]))
+        destinos = rng.sample(libres(grid), 3)
+        for destino in destinos:
+            planificador.pedir_campo(destino)
+        planes = []
+        limite = time.monotonic() + 5
+        while not planes or planes[-1].inicio != destinos[-1]:
+            assert time.monotonic() < limite
+            planes += [p for p in planificador.planes_listos() if p.agente == 'horda']
+            time.sleep(0.01)
+        plan = planes[-1]
+        assert planificador.vigente(plan)
+        np.testing.assert_array_equal(plan.ruta, campo_distancias(celdas_con_borde(grid), grid.shape[1],
+                                                                   destinos[-1]))
+    planificador.cerrar()
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from busqueda import GrafoCuadricula, astar_heuristica
+from nucleo_laberinto import celdas_con_borde
+from referencias import OBJETIVOS_EN_CACHE, Referencias
+
+from .comun import comprobar, consultas, cuadricula, distancias_bfs, referencia
+
+SEMILLAS = range(6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_heuristica_admisible_y_consistente(semilla):
+    grid = cuadricula(semilla)
+    ancho, w = grid.shape[1], grid.shape[1] + 2
+    referencias = Referencias(celdas_con_borde(grid), ancho, 4, random.Random(semilla))
+    for _, objetivo in consultas(grid, semilla, 5):
+        h = referencias.heuristica(objetivo)
+        assert h.itemsize == 2   # array('H'), no una lista
+        distancias = distancias_bfs(grid, objetivo)
+        for (i, j), d in distancias.items():
+            k = (i + 1) * w + j + 1
+            assert h[k] <= d
+            # Consistente: entre vecinas alcanzables h cambia como mucho en 1
+            for vecina, paso in (((i, j + 1), 1), ((i + 1, j), w)):
+                if vecina in distancias:
+                    assert abs(h[k] - h[k + paso]) <= 1
+    assert referencias.estadisticas()['objetivos_en_cache'] == min(5, OBJETIVOS_EN_CACHE)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_astar_heuristica_es_optimo(semilla):
+    grid = cuadricula(semilla)
+    celdas, ancho = celdas_con_borde(grid), grid.shape[1]
+    grafo = GrafoCuadricula(celdas, ancho)
+    referencias = Referencias(celdas, ancho, 4, random.Random(semilla))
+    for inicio, objetivo in consultas(grid, semilla):
+        camino = astar_heuristica(celdas, ancho, inicio, objetivo, referencias.heuristica(objetivo), grafo)
+        comprobar(grid, camino, inicio, objetivo, referencia(grid, inicio, objetivo))
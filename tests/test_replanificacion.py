@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from replanificacion import PlanificadorDStarLite
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+SEMILLAS = range(6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('densidad', [0.1, 0.3])
+def test_dstar_lite_con_cambios(semilla, densidad):
+    grid = cuadricula(semilla, densidad=densidad)
+    rng = random.Random(semilla)
+    pares = consultas(grid, semilla)
+    objetivo = pares[0][1]
+    planificador = PlanificadorDStarLite(grid, objetivo)
+    for inicio, _ in pares:
+        # Entre consulta y consulta cambian unas paredes (nunca la del objetivo)
+        for _ in range(3):
+            pos = (rng.randrange(grid.shape[0]), rng.randrange(grid.shape[1]))
+            if pos != objetivo:
+                grid[pos] = 1 - grid[pos]
+                planificador.cambiar_celda(pos, int(grid[pos]))
+        esperado = referencia(grid, inicio, objetivo) if grid[inicio] == 0 else []
+        comprobar(grid, planificador.ruta(inicio), inicio, objetivo, esperado)
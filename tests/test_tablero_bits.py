@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import tablero_bits
+from busqueda import GrafoCuadricula
+from nucleo_laberinto import celdas_con_borde, etiquetar_componentes
+from tablero_bits import TableroBits
+
+from .comun import consultas, cuadricula, distancias_bfs
+
+SEMILLAS = range(6)
+
+
+@pytest.fixture(params=['bits', 'celda_a_celda'])
+def modo(request, monkeypatch):
+    """Sin paso a celda a celda, o pasando a celda a celda tras VUELTAS_LENTAS vueltas"""
+    monkeypatch.setattr(tablero_bits, 'BITS_POR_CELDA', 10 ** 9 if request.param == 'bits' else 0)
+    return request.param
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('densidad', [0.3, 0.45])
+def test_hay_camino_y_componentes(semilla, densidad, modo):
+    grid = cuadricula(semilla, 40, 50, densidad)
+    tablero = TableroBits.desde_grid(grid)
+    grafo = GrafoCuadricula(celdas_con_borde(grid), grid.shape[1])
+    etiquetas = etiquetar_componentes(grid)
+
+    vueltas = []
+    for inicio, fin in consultas(grid, semilla, 60):
+        for g in (None, grafo):
+            assert tablero.hay_camino(inicio, fin, g) == (etiquetas[inicio] == etiquetas[fin])
+            vueltas.append(tablero.celda_a_celda)
+        assert not tablero.hay_camino(inicio, (0, -1))
+    # Las inundaciones largas terminan celda a celda solo si se fuerza
+    assert any(vueltas) == (modo == 'celda_a_celda')
+
+    componentes = [tablero.a_array(mascara) for mascara in tablero.componentes()]
+    assert sum(int(c.sum()) for c in componentes) == int((grid == 0).sum())
+    for componente in componentes:
+        # Cada máscara es exactamente una etiqueta de etiquetar_componentes
+        assert len(set(etiquetas[componente].tolist())) == 1
+        np.testing.assert_array_equal(componente, etiquetas == etiquetas[componente][0])
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_distancias_son_bfs(semilla):
+    grid = cuadricula(semilla, 30, 70)
+    tablero = TableroBits.desde_grid(grid)
+    for origen, _ in consultas(grid, semilla, 5):
+        esperado = np.full(grid.shape, -1)
+        for pos, d in distancias_bfs(grid, origen).items():
+            esperado[pos] = d
+        np.testing.assert_array_equal(tablero.distancias(origen), esperado)
+    assert (tablero.distancias((0, grid.shape[1])) == -1).all()
@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from busqueda import astar_pesos
+from nucleo_laberinto import pesos_con_borde
+from terreno import costo_ruta, dial, dial_pesos, generar_terreno
+
+from .comun import comprobar, consultas, cuadricula, referencia
+
+SEMILLAS = range(6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('heuristica', [True, False])
+def test_dial_tiene_el_costo_de_astar_pesos(semilla, heuristica):
+    grid = cuadricula(semilla, densidad=0.25)
+    alto, ancho = grid.shape
+    costos = generar_terreno(alto, ancho, random.Random(semilla), tam_parche=3)
+    pesos = pesos_con_borde(grid, costos)
+    for inicio, objetivo in consultas(grid, semilla):
+        esperado = astar_pesos(pesos, ancho, inicio, objetivo)
+        for camino in (dial_pesos(pesos, ancho, inicio, objetivo, heuristica),
+                       dial(grid, inicio, objetivo, costos, heuristica)):
+            assert bool(camino) == bool(esperado)
+            if esperado:
+                comprobar(grid, camino, inicio, objetivo, camino)
+                assert costo_ruta(costos, camino) == costo_ruta(costos, esperado)
+
+
+@pytest.mark.parametrize('heuristica', [True, False])
+def test_dial_sin_costos_es_bfs(heuristica):
+    grid = cuadricula(9)
+    for inicio, objetivo in consultas(grid, 9):
+        comprobar(grid, dial(grid, inicio, objetivo, heuristica=heuristica), inicio, objetivo,
+                  referencia(grid, inicio, objetivo))
+    assert dial(grid, (0, 0), (0, grid.shape[1])) == []
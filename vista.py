@@ -0,0 +1,123 @@
+"""Geometría de la vista del juego: cámara, zoom y teselas visibles.
+
+No depende de tkinter. Las coordenadas "de mundo" son píxeles del mapa
+completo al zoom actual: la celda (i, j) ocupa [j*tam, (j+1)*tam) x
+[i*tam, (i+1)*tam). La cámara (x, y) es la esquina superior izquierda de la
+vista en esas coordenadas, y el mapa se parte en teselas cuadradas de
+celdas_tesela celdas de lado para dibujar solo las que tocan la vista.
+"""
+ZOOMS = (2, 4, 6, 10, 16, 24, 40)  # Píxeles por celda disponibles
+PIXELES_TESELA = 256  # Lado aproximado de una tesela, en píxeles
+MARGEN_SEGUIR = 0.25  # Fracción de la vista en cada borde que hace mover la cámara
+
+
+class Vista:
+    """Parte visible de un mapa de alto x ancho celdas en una ventana de ancho_px x alto_px"""
+
+    def __init__(self, alto, ancho, ancho_px, alto_px, tam=ZOOMS[-1]):
+        self.alto = alto
+        self.ancho = ancho
+        self.ancho_px = ancho_px
+        self.alto_px = alto_px
+        self.tam = tam  # Píxeles por celda
+        self.x = 0
+        self.y = 0
+
+    @property
+    def celdas_tesela(self):
+        return max(1, PIXELES_TESELA // self.tam)
+
+    def cambiar_mapa(self, alto, ancho):
+        self.alto, self.ancho = alto, ancho
+        self.x = self.y = 0
+
+    def redimensionar(self, ancho_px, alto_px):
+        """Cambia el tamaño de la ventana; indica si la cámara se movió"""
+        self.ancho_px, self.alto_px = ancho_px, alto_px
+        return self._limitar()
+
+    def acercar(self, pasos):
+        """Sube (pasos > 0) o baja el zoom manteniendo la celda central; indica si cambió"""
+        actual = ZOOMS.index(self.tam) if self.tam in ZOOMS else len(ZOOMS) - 1
+        tam = ZOOMS[max(0, min(len(ZOOMS) - 1, actual + pasos))]
+        if tam == self.tam:
+            return False
+        centro_i = (self.y + self.alto_px / 2) / self.tam
+        centro_j = (self.x + self.ancho_px / 2) / self.tam
+        self.tam = tam
+        self.x = round(centro_j * tam - self.ancho_px / 2)
+        self.y = round(centro_i * tam - self.alto_px / 2)
+        self._limitar()
+        return True
+
+    def seguir(self, pos):
+        """Mueve la cámara lo justo para que pos quede fuera de los márgenes; indica si se movió"""
+        x, y = self.x, self.y
+        self.x = self._seguir_eje(self.x, pos[1], self.ancho_px)
+        self.y = self._seguir_eje(self.y, pos[0], self.alto_px)
+        self._limitar()
+        return (x, y) != (self.x, self.y)
+
+    def _seguir_eje(self, camara, celda, lado):
+        margen = int(lado * MARGEN_SEGUIR)
+        inicio = celda * self.tam
+        if inicio < camara + margen:
+            return inicio - margen
+        if inicio + self.tam > camara + lado - margen:
+            return inicio + self.tam - lado + margen
+        return camara
+
+    def _limitar(self):
+        x, y = self.x, self.y
+        self.x = max(0, min(self.x, self.ancho * self.tam - self.ancho_px))
+        self.y = max(0, min(self.y, self.alto * self.tam - self.alto_px))
+        return (x, y) != (self.x, self.y)
+
+    def rango_celdas(self, margen=0):
+        """(i0, i1, j0, j1): celdas visibles, ampliadas en margen celdas"""
+        return (max(0, self.y // self.tam - margen),
+                min(self.alto, -(-(self.y + self.alto_px) // self.tam) + margen),
+                max(0, self.x // self.tam - margen),
+                min(self.ancho, -(-(self.x + self.ancho_px) // self.tam) + margen))
+
+    def visible(self, pos, margen=0):
+        i0, i1, j0, j1 = self.rango_celdas(margen)
+        return i0 <= pos[0] < i1 and j0 <= pos[1] < j1
+
+    def teselas_visibles(self):
+        """Claves (ti, tj) de las teselas que tocan la vista"""
+        n = self.celdas_tesela
+        i0, i1, j0, j1 = self.rango_celdas()
+        return {(ti, tj) for ti in range(i0 // n, -(-i1 // n))
+                for tj in range(j0 // n, -(-j1 // n))}
+
+    def tesela_de(self, pos):
+        n = self.celdas_tesela
+        return (pos[0] // n, pos[1] // n)
+
+    def celdas_de_tesela(self, clave):
+        """(i0, i1, j0, j1) de la tesela, recortada al borde del mapa"""
+        n = self.celdas_tesela
+        ti, tj = clave
+        return ti * n, min(self.alto, (ti + 1) * n), tj * n, min(self.ancho, (tj + 1) * n)
+
+    def tramo_visible(self, ruta, margen=1):
+        """Primer tramo seguido de ruta dentro de la vista (ampliada en margen celdas).
+
+        Dibujar solo ese tramo acota el trabajo por frame aunque la ruta cruce
+        todo el mapa; si la ruta sale y vuelve a entrar, lo que sigue se omite.
+        Fuera de la vista se salta de a varias celdas: cada paso de la ruta (4
+        vecinos) acerca a la vista como mucho una celda en Manhattan.
+        """
+        i0, i1, j0, j1 = self.rango_celdas(margen)
+        inicio = 0
+        while inicio < len(ruta):
+            i, j = ruta[inicio]
+            distancia = max(i0 - i, i - i1 + 1, 0) + max(j0 - j, j - j1 + 1, 0)
+            if not distancia:
+                break
+            inicio += distancia
+        fin = inicio
+        while fin < len(ruta) and i0 <= ruta[fin][0] < i1 and j0 <= ruta[fin][1] < j1:
+            fin += 1
+        return ruta[inicio:fin]